@@ -3,26 +3,30 @@
 FastAPI에서 재사용할 공용 의존성 모듈.
 - Settings: 환경 변수 관리
 - SQLAlchemy Engine
-- OpenAI Embeddings / Chat LLM
+- Embeddings (OpenAI / 로컬 HuggingFace) / Chat LLM
 - PGVector VectorStore / Retriever
-모두 lazy singleton으로 초기화됩니다.
+모두 lazy singleton으로 초기화됩니다 (시작 시 미리 올리는 작업은 app/warmup.py).
+프로바이더 SDK(openai, langchain_postgres, OCR 프로바이더 등)는 실제로 쓰일 때 import합니다.
 """
 from __future__ import annotations
 from functools import lru_cache
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from langchain_openai import OpenAIEmbeddings
-from langchain_postgres.vectorstores import PGVector
+from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
 from langchain_core.retrievers import BaseRetriever
 
+if TYPE_CHECKING:
+  from openai import AsyncOpenAI
+  from langchain_postgres.vectorstores import PGVector
+  from services.ocr.base import BaseOCRService
+
 load_dotenv()
 
 
@@ -43,17 +47,44 @@ def get_engine() -> Engine:
 
 
 # ---------- Embeddings ----------
-_embeddings: Optional[OpenAIEmbeddings] = None
+_embeddings: Optional[Embeddings] = None
+
+def embedding_dimensions() -> Optional[int]:
+  """
+  임베딩 API에 요청할 차원 수.
+  text-embedding-3 계열은 앞쪽 embed_dim 차원만 받아도 된다(Matryoshka). 그 외 모델은 고정 차원이라 None.
+  """
+  cfg = get_settings()
+  if cfg.embed_provider == "openai" and cfg.embed_model.startswith("text-embedding-3"):
+    return cfg.embed_dim
+  return None
 
-def get_embeddings() -> OpenAIEmbeddings:
-  """OpenAI 임베딩 인스턴스."""
+def get_embeddings() -> Embeddings:
+  """임베딩 인스턴스 (embed_provider: openai | huggingface)."""
   global _embeddings
   if _embeddings is None:
     cfg = get_settings()
-    _embeddings = OpenAIEmbeddings(
-        model=cfg.embed_model,
-        api_key=cfg.openai_api_key
-    )
+    if cfg.embed_provider == "huggingface":
+      from services.local_embedding_service import LocalEmbeddings
+      _embeddings = LocalEmbeddings(
+          model_name=cfg.embed_model,
+          backend=cfg.embed_local_backend,
+          device=cfg.embed_local_device,
+          onnx_file=cfg.embed_local_onnx_file,
+          query_prefix=cfg.embed_query_prefix,
+          document_prefix=cfg.embed_document_prefix,
+          max_batch=cfg.embed_batch_max,
+          window_ms=cfg.embed_batch_window_ms,
+      )
+    elif cfg.embed_provider == "openai":
+      from langchain_openai import OpenAIEmbeddings
+      _embeddings = OpenAIEmbeddings(
+          model=cfg.embed_model,
+          dimensions=embedding_dimensions(),
+          api_key=cfg.openai_api_key
+      )
+    else:
+      raise ValueError(f"Unknown embed_provider: {cfg.embed_provider}")
   return _embeddings
 
 
@@ -61,9 +92,13 @@ def get_embeddings() -> OpenAIEmbeddings:
 _vectorstore: Optional[VectorStore] = None
 
 def get_vectorstore() -> PGVector:
-  """PGVector VectorStore. 필요 시 pgvector 확장을 생성(create_extension=True)."""
+  """
+  PGVector VectorStore.
+  개발 환경에서는 pgvector 확장을 자동 생성하고, production에서는 DDL을 건너뛴다 (확장은 배포 시 준비).
+  """
   global _vectorstore
   if _vectorstore is None:
+    from langchain_postgres.vectorstores import PGVector
     cfg = get_settings()
     _vectorstore = PGVector(
         embeddings=get_embeddings(),
@@ -72,7 +107,7 @@ def get_vectorstore() -> PGVector:
         async_mode=True,
         embedding_length=cfg.embed_dim,  # 인덱스 차원 명시
         use_jsonb=cfg.use_jsonb,
-        create_extension=True,           # pgvector 확장 자동 생성
+        create_extension=cfg.app_env != "production",
     )
   return _vectorstore
 
@@ -167,9 +202,8 @@ def get_gemini_llm() -> BaseChatModel:
 
 
 # ---------- OCR Service ----------
-from services.ocr.base import BaseOCRService
-from services.ocr.factory import get_ocr_service as factory_get_ocr_service
-
 @lru_cache()
 def get_ocr_service_provider() -> BaseOCRService:
+    # 설정된 OCR 프로바이더 모듈만 import (채팅 경로에서는 불러오지 않음)
+    from services.ocr.factory import get_ocr_service as factory_get_ocr_service
     return factory_get_ocr_service()
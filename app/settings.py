@@ -11,13 +11,28 @@ class Settings(BaseSettings):
   gemini_api_key: str
   upstage_api_key: str
 
+  # 실행 환경: production이면 시작 시 DDL(pgvector 확장, 신청 기간 인덱스 생성)을 건너뛴다
+  app_env: str = "development"
+  warmup_enabled: bool = True      # 시작 시 DB 풀 / 벡터 스토어 / LLM·임베딩 클라이언트를 병렬로 미리 준비
+  warmup_timeout: float = 30.0     # 초과하면 남은 준비는 첫 요청에서 lazy하게
+
   # DB / Vector
   pg_conn: str
   collection_name: str = "uos_announcement"
+  embed_provider: str = "openai"  # openai | huggingface(로컬 sentence-transformers, requirements-local-embed.txt 설치, embed_model/embed_dim도 맞춰 설정)
   embed_model: str = "text-embedding-3-small"
-  embed_dim: int = 1536
-  chunk_size: int = 1024
-  chunk_overlap: int = 128
+  embed_dim: int = 1536  # text-embedding-3 계열은 더 작게 잘라 받을 수 있음 (Matryoshka, 변경 시 재임베딩 필요)
+  embed_local_backend: str = "torch"   # huggingface 전용: torch | onnx | openvino
+  embed_local_onnx_file: str = ""      # 양자화 ONNX 파일 (예: onnx/model_qint8_avx512.onnx)
+  embed_local_device: str = "cpu"
+  embed_query_prefix: str = ""         # e5 계열: "query: "
+  embed_document_prefix: str = ""      # e5 계열: "passage: "
+  embed_batch_max: int = 32            # 동시 질의 임베딩을 모으는 최대 배치 (1이면 배치 안 함, openai/로컬 공통)
+  embed_batch_window_ms: float = 5.0   # 배치를 모으는 시간 창 (부하가 낮을 때 질의당 추가 지연 상한)
+  chunker: str = "notice"         # notice(구조 기반, 토큰 단위) | recursive(문자 단위, 이전 방식)
+  chunk_tokens: int = 350         # notice 청커의 청크당 최대 토큰
+  chunk_size: int = 1024          # recursive 청커 전용
+  chunk_overlap: int = 128        # recursive 청커 전용
   use_jsonb: bool = True
 
   # LLM
@@ -31,16 +46,98 @@ class Settings(BaseSettings):
   temperature: float = 0.0
   llm_timeout: int = 60              # seconds
   small_llm_timeout: int = 5
+  prompt_cache_key_enabled: bool = True  # openai: 프롬프트별 prompt_cache_key로 같은 프리픽스 요청을 같은 캐시에 라우팅
+
+  # CPU 바운드 작업(HTML 정제, 청킹) 프로세스 풀
+  cpu_pool_workers: int = 4          # 0이면 이벤트 루프에서 직접 실행
+  cpu_pool_batch_size: int = 16      # 프로세스 풀에 한 번에 넘기는 작업 수
 
   # OCR
   ocr_provider: str = "gemini"
   ocr_timeout: float = 120.0
+  # OCR 전 이미지 선별
+  ocr_min_image_bytes: int = 2048            # 이보다 작은 이미지(아이콘, 스페이서)는 제외
+  ocr_min_image_side: int = 64               # 가로/세로 중 짧은 변(px) 기준
+  ocr_skip_extensions: list[str] = [".svg", ".ico"]
+  ocr_boilerplate_hashes: list[str] = []     # 제외할 이미지 해시 (SHA-1 40자리 또는 dHash 16자리 hex)
+  ocr_boilerplate_min_notices: int = 5       # 이 수 이상의 공지에 나온 동일 이미지 중 아래 조건이면 상용구로 보고 제외
+  ocr_boilerplate_max_side: int = 400        # 긴 변(px)이 이 이하인 작은 이미지 (로고, 아이콘)
+  ocr_boilerplate_max_chars: int = 20        # 또는 OCR 텍스트가 이보다 짧았던 이미지 (그 외는 OCR 결과 캐시 재사용)
+  ocr_boilerplate_track_size: int = 8192     # 상용구 판정을 위해 추적하는 이미지 해시 수 (LRU)
+  ocr_phash_distance: int = 2                # ocr_boilerplate_hashes의 dHash와 이 해밍 거리 이하면 상용구로 간주 (공지 내 중복은 SHA-1만)
+  ocr_cache_size: int = 2048                 # 내용 해시 → OCR 결과 캐시 크기
+  # 이미지 다운로드 / OCR 전 축소
+  image_max_bytes: int = 15_000_000          # 이보다 큰 응답은 다운로드 중단
+  image_download_concurrency: int = 32       # 공유 HTTP 세션의 동시 연결 수
+  ocr_downscale: bool = True
+  ocr_max_image_side: int = 2048             # 긴 변 기준 (한글 포스터가 읽히는 해상도)
+  ocr_recompress_min_bytes: int = 1_000_000  # 해상도가 작아도 이보다 크면 JPEG 재압축
+  ocr_jpeg_quality: int = 85
+  # OCR 스케줄러 (프로바이더별 초당 요청 수 / 버스트 / 최대 동시성)
+  ocr_max_inflight: int = 16                 # 프로세스 전역 동시 OCR 요청 상한
+  ocr_gemini_rps: float = 5.0
+  ocr_gemini_burst: int = 10
+  ocr_gemini_max_concurrency: int = 12
+  ocr_upstage_rps: float = 2.0
+  ocr_upstage_burst: int = 4
+  ocr_upstage_max_concurrency: int = 4
+  ocr_target_latency: float = 30.0           # 이보다 느린 응답이면 동시성 축소 (seconds)
+  ocr_backoff_seconds: float = 5.0           # 429 이후 요청 중단 및 연속 축소 방지 간격
+  # Gemini 배치 OCR (한 요청에 같은 공지의 이미지 여러 개)
+  ocr_batch_max_images: int = 6              # 1이면 배치 사용 안 함
+  ocr_batch_max_bytes: int = 6_000_000       # 요청당 이미지 총 bytes (inline 요청 크기 제한 고려)
+
+  # 구조화 정보 추출 (parse 단계)
+  # 파싱은 이 수의 공지씩 원본 조회 → OCR → 저장 → 구조화 추출 → 저장 (원본 HTML을 한꺼번에 올리지 않음)
+  parse_chunk_size: int = 200
+  extraction_enabled: bool = True
+  extraction_concurrency: int = 8            # 온라인 추출 동시 요청 수
+  extraction_max_tokens: int = 4000          # 추출 입력(본문+OCR) 토큰 상한
+  extraction_batch_api: bool = False         # 기간 백필에서 OpenAI Batch API 사용
+  extraction_batch_min_rows: int = 50        # 묶음(parse_chunk_size)의 추출 대상이 이 수 이상일 때만 Batch API 사용
+  extraction_batch_poll_seconds: float = 30.0
+  extraction_batch_timeout: float = 3600.0   # 초과 시 Batch 취소 후 온라인 추출로 대체
 
   # Retriever 기본값
   retriever_k: int = 6
   retriever_fetch_k: int = 40
   retriever_mmr: bool = False  # MMR 활성화 (중복 제거)
   retriever_lambda_mult: float = 0.5  # MMR lambda: 0=다양성 우선, 1=유사도 우선
+  query_embedding_cache_size: int = 1024  # 최근 질의 임베딩 LRU (0이면 캐시 안 함)
+  # 검색 깊이: 후보 거리 분포로 청크 수 결정 (false면 고정 k=6, 재시도마다 +4)
+  retrieval_adaptive: bool = True
+  retrieval_policy_path: str = "data/retrieval_policy.json"  # bench/retrieval_depth.py 보정 결과 (없으면 기본값)
+
+  # 인메모리 벡터 인덱스 (PGVector 복제본, 검색을 프로세스 안에서 처리)
+  vector_index_enabled: bool = False
+  vector_index_path: str = "data/vector_index"  # 스냅샷 디렉터리 (memmap)
+  # float32 | int8(메모리 1/4) | binary(메모리 1/32, 해밍 거리) | float16(메모리 1/2, 검색은 느림)
+  vector_index_dtype: str = "float32"
+  vector_index_rescore: int = 4  # 압축 dtype: 1차 검색 k*배수 후보를 float32 원본으로 재채점 (0이면 안 함)
+  vector_index_reload_seconds: float = 5.0  # 다른 워커가 쓴 새 스냅샷을 확인하는 주기 (0이면 확인 안 함)
+
+  # /chat 수락 제어 (부하가 몰리면 빠르게 거절하거나 degraded로 처리)
+  chat_max_inflight: int = 32            # 동시에 처리하는 요청 수
+  chat_max_queue: int = 64               # 처리 슬롯을 기다리는 요청 수 상한 (넘으면 즉시 503)
+  chat_queue_timeout: float = 5.0        # 대기열에서 기다리는 최대 시간 (넘으면 503)
+  chat_degrade_load: float = 0.8         # 처리 중+대기 요청이 max_inflight의 이 비율 이상이면 validate/재시도 생략
+  chat_deadline_seconds: float = 30.0    # 요청 전체 마감 (대기 시간 포함, 넘으면 504)
+  chat_optional_min_seconds: float = 8.0 # 남은 시간이 이보다 적으면 validate/재시도 생략
+
+  # 답변 검증 생략 (검색 점수 / 답변-근거 겹침 / 답변 불가 문구로 계산한 신뢰도 기준)
+  validation_fast_path: bool = True     # false면 모든 답변을 응답 전에 검증
+  validation_skip_threshold: float = 0.75
+  validation_sample_rate: float = 0.1   # 생략한 답변 중 응답 후 백그라운드로 검증해 품질을 재는 비율
+
+  # 대화 기록 압축 (긴 대화에서도 프롬프트 / 체크포인트 크기 일정)
+  history_recent_messages: int = 6      # 원문으로 유지할 최근 메시지 수 (그 이전은 요약으로 접고 state에서 삭제)
+  history_answer_tokens: int = 200      # 최근 AI 답변을 프롬프트에 넣을 때 토큰 상한
+  history_summary_tokens: int = 300     # 누적 요약 토큰 상한 (넘으면 오래된 줄부터 버림)
+
+  # 프롬프트 컨텍스트 토큰 예산
+  tokenizer_encoding: str = "o200k_base"  # gpt-4o 계열
+  context_token_budget: int = 3000        # generate 참고 공지
+  validate_token_budget: int = 1200       # validate 문서 요약
 
   class Config:
     env_file = ".env"
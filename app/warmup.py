@@ -0,0 +1,103 @@
+# app/warmup.py
+"""
+애플리케이션 시작 시 미리 준비(warm-up).
+첫 /chat 요청이 DB 커넥션, PGVector 초기화(컬렉션 조회/DDL), 클라이언트 생성, 임베딩 API 연결 수립을
+떠안지 않도록 lifespan에서 한 번 실행한다.
+
+1. 클라이언트 생성 (한 스레드에서 순서대로: import가 대부분이라 병렬 이득이 없고 싱글톤 경쟁을 피함)
+2. 네트워크 준비를 병렬로: DB 풀 연결, PGVector 비동기 초기화 + 검색 1회, 임베딩 1회, 인메모리 인덱스 적재
+실패한 단계는 경고만 남기고 넘어간다 (해당 리소스는 첫 사용 시 lazy하게 다시 초기화).
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy import text
+
+from app.deps import get_chat_llm, get_embeddings, get_engine, get_small_llm, get_vectorstore
+from app.settings import get_settings
+from services.metrics_service import STARTUP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["warm_up"]
+
+
+def _build_clients(timings: Dict[str, float]) -> None:
+  from services.token_service import count_tokens
+
+  for name, build in (
+      ("embeddings_client", get_embeddings),
+      ("vectorstore_client", get_vectorstore),
+      ("chat_llm_client", get_chat_llm),
+      ("small_llm_client", get_small_llm),
+      ("tokenizer", lambda: count_tokens("warmup")),
+  ):
+    t0 = time.perf_counter()
+    try:
+      build()
+    except Exception as e:
+      logger.warning(f"Warm-up '{name}' failed (will initialise lazily): {e}")
+    timings[name] = time.perf_counter() - t0
+
+
+def _ping_db() -> None:
+  with get_engine().connect() as conn:
+    conn.execute(text("SELECT 1"))
+
+
+async def _warm_vectorstore() -> None:
+  # 첫 비동기 호출에서 PGVector가 테이블/컬렉션을 확인하므로, 트래픽 전에 한 번 실행해 둔다
+  dim = get_settings().embed_dim
+  await get_vectorstore().asimilarity_search_with_score_by_vector([1.0] + [0.0] * (dim - 1), k=1)
+
+
+async def _warm_embedding() -> None:
+  # 임베딩 API 연결(TLS) 수립 / 로컬 모델 첫 추론
+  from services.retriever_service import embed_query
+  await embed_query("warmup")
+
+
+async def _warm_vector_index() -> None:
+  from services.vector_index_service import load_vector_index
+  await load_vector_index()
+
+
+async def _timed(name: str, fn: Callable[[], Awaitable[None]], timings: Dict[str, float]) -> None:
+  t0 = time.perf_counter()
+  try:
+    await fn()
+  except Exception as e:
+    logger.warning(f"Warm-up '{name}' failed (will initialise lazily): {e}")
+  finally:
+    timings[name] = time.perf_counter() - t0
+
+
+async def warm_up() -> Dict[str, float]:
+  """시작 시 준비를 실행하고 단계별 소요 시간(초)을 돌려준다 (app_startup_seconds 게이지에도 기록)."""
+  cfg = get_settings()
+  timings: Dict[str, float] = {}
+  t0 = time.perf_counter()
+
+  await asyncio.to_thread(_build_clients, timings)
+
+  steps = {
+      "db": lambda: asyncio.to_thread(_ping_db),
+      "vectorstore": _warm_vectorstore,
+      "embedding": _warm_embedding,
+      "vector_index": _warm_vector_index,
+  }
+  try:
+    await asyncio.wait_for(
+        asyncio.gather(*(_timed(name, fn, timings) for name, fn in steps.items())),
+        timeout=cfg.warmup_timeout,
+    )
+  except asyncio.TimeoutError:
+    logger.warning(f"Warm-up timed out after {cfg.warmup_timeout}s; remaining resources initialise lazily")
+
+  timings["total"] = time.perf_counter() - t0
+  for name, seconds in timings.items():
+    STARTUP_SECONDS.labels(phase=name).set(seconds)
+  logger.info("Warm-up finished: " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+  return timings
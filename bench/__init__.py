@@ -0,0 +1,20 @@
+# bench package
+"""
+오프라인 성능 측정 패키지
+
+- fakes: 결정적(deterministic) 가짜 LLM / 임베딩 / 벡터 스토어 백엔드
+- stats: 백분위수 등 집계 헬퍼
+- replay: 기록된 채팅 트래픽을 chat_graph_app에 재생하는 벤치마크 CLI
+- compare: 두 벤치마크 실행 결과 비교 CLI
+- chunking: 청커 비교 (청크 수, 토큰, 검색 적중률)
+- html_cleaning: HTML 정제 마이크로 벤치마크
+- ocr_batching: Gemini 이미지별 OCR vs 배치 OCR 비교 (지연시간, 토큰)
+- vector_index: 인메모리 벡터 인덱스 검색 지연시간 / dtype별 recall
+- embedding_recall: 임베딩 차원 축소 / 양자화 조합별 recall@k (전체 차원 float32 기준)
+- microbatch: 질의 임베딩 건별 호출 vs 마이크로 배치 (API 호출 수, 처리량, 지연시간)
+- retrieval_depth: chat_logs로 검색 깊이 정책(간격/평평함 기준 청크 수) 보정
+- validation_skip: chat_logs로 답변 신뢰도 임계값별 검증 생략 비율 / 놓치는 재시도 비율 평가
+- prompt_cache: 이전/현재 프롬프트 배치의 프리픽스 캐시 적중 토큰 / 입력 비용 비교 (--live: 실제 지연시간)
+- overload: 용량이 제한된 가짜 LLM에 고정 도착률로 /chat 부하 (수락 제어 켜짐·꺼짐의 성공/503/504, goodput)
+- startup: 콜드 스타트 시간 / 첫 요청 지연시간 (warm-up 켜짐·꺼짐 비교, 상한 검사)
+"""
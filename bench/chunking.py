@@ -0,0 +1,147 @@
+# bench/chunking.py
+"""
+청커 비교 벤치마크 (recursive vs notice).
+
+청크 수, 임베딩 토큰 수, 인덱스 크기와 라벨링된 질문 세트에 대한 검색 적중률(hit@k, MRR)을 비교한다.
+
+입력:
+- 공지 row: --rows rows.jsonl ({"announcement_id", "title", "cleaned_text", "ocr_text", ...})
+            또는 --from-date/--to-date 로 announcement_parsed에서 조회 (--dump-rows로 저장 가능)
+- 질문 세트: --questions labelled.jsonl ({"question": "...", "announcement_ids": [123, ...]})
+
+사용 예:
+    python -m bench.chunking --rows rows.jsonl --questions labelled.jsonl
+    python -m bench.chunking --from-date 2025-03-01 --to-date 2025-06-30 --dump-rows rows.jsonl \\
+        --questions labelled.jsonl --embeddings openai
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bench.fakes import ensure_offline_env, HashingEmbeddings, BenchVectorStore
+from bench.stats import format_table
+
+
+def load_rows(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                if isinstance(row.get("written_at"), str):
+                    row["written_at"] = datetime.fromisoformat(row["written_at"])
+                rows.append(row)
+    return rows
+
+
+def fetch_rows(from_date: str, to_date: str) -> List[Dict[str, Any]]:
+    from services.database_service import fetch_parsed_records_by_date_range
+    return [dict(r) for r in fetch_parsed_records_by_date_range(from_date, to_date)]
+
+
+def dump_rows(rows: List[Dict[str, Any]], path: str) -> None:
+    keys = ("announcement_id", "title", "written_at", "cleaned_text", "ocr_text", "board", "author", "major", "url")
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            rec = {k: row.get(k) for k in keys}
+            if rec["written_at"] is not None:
+                rec["written_at"] = rec["written_at"].isoformat()
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+def load_questions(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def evaluate(chunker: str, rows, questions, embeddings, dim: int, k: int) -> Dict[str, Any]:
+    from ingest.chunk_embed import build_documents_from_parsed
+    from services.token_service import count_tokens
+
+    docs = build_documents_from_parsed(rows, chunker=chunker)
+    tokens = sum(count_tokens(d.page_content) for d in docs)
+    text_bytes = sum(len(d.page_content.encode("utf-8")) for d in docs)
+
+    result: Dict[str, Any] = {
+        "chunker": chunker,
+        "chunks": len(docs),
+        "chunks_per_notice": len(docs) / max(1, len(rows)),
+        "embedded_tokens": tokens,
+        "tokens_per_chunk": tokens / max(1, len(docs)),
+        # 벡터(float32) + 본문 텍스트 크기 추정
+        "index_mb": (len(docs) * dim * 4 + text_bytes) / 1024 / 1024,
+    }
+    if not questions:
+        return result
+
+    store = BenchVectorStore(embedding=embeddings)
+    await store.aadd_documents(docs)
+
+    hits, rr = 0, 0.0
+    for q in questions:
+        labels = set(q["announcement_ids"])
+        found = await store.asimilarity_search_with_score(q["question"], k)
+        ranked_ids = []
+        for doc, _ in found:
+            aid = doc.metadata.get("announcement_id")
+            if aid not in ranked_ids:
+                ranked_ids.append(aid)
+        rank = next((i for i, aid in enumerate(ranked_ids, 1) if aid in labels), None)
+        if rank:
+            hits += 1
+            rr += 1 / rank
+    result[f"hit@{k}"] = hits / len(questions)
+    result[f"mrr@{k}"] = rr / len(questions)
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="청커 비교 벤치마크")
+    p.add_argument("--rows", help="공지 row JSONL")
+    p.add_argument("--from-date")
+    p.add_argument("--to-date")
+    p.add_argument("--dump-rows", help="DB에서 조회한 row를 JSONL로 저장")
+    p.add_argument("--questions", help="라벨링된 질문 JSONL")
+    p.add_argument("--chunkers", default="recursive,notice")
+    p.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    p.add_argument("--embed-dim", type=int, default=256, help="hashing 임베딩 차원")
+    p.add_argument("-k", type=int, default=6)
+    args = p.parse_args(argv)
+    if not args.rows and not (args.from_date and args.to_date):
+        p.error("--rows 또는 --from-date/--to-date 가 필요합니다")
+    return args
+
+
+async def amain(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    rows = load_rows(args.rows) if args.rows else fetch_rows(args.from_date, args.to_date)
+    if args.dump_rows:
+        dump_rows(rows, args.dump_rows)
+    questions = load_questions(args.questions) if args.questions else []
+
+    if args.embeddings == "openai":
+        from app.deps import get_embeddings, get_settings
+        embeddings, dim = get_embeddings(), get_settings().embed_dim
+    else:
+        embeddings, dim = HashingEmbeddings(dim=args.embed_dim), args.embed_dim
+
+    return [
+        await evaluate(chunker, rows, questions, embeddings, dim, args.k)
+        for chunker in args.chunkers.split(",")
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ensure_offline_env()
+    args = parse_args(argv)
+    results = asyncio.run(amain(args))
+    keys = [k for k in results[0].keys() if k != "chunker"]
+    table = [["metric"] + [r["chunker"] for r in results]]
+    for key in keys:
+        table.append([key] + [f"{r[key]:.3f}" if isinstance(r[key], float) else str(r[key]) for r in results])
+    print(format_table(table))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# bench/compare.py
+"""
+두 벤치마크 결과(JSON) 비교.
+
+사용 예:
+    python -m bench.compare runs/base.json runs/head.json
+    python -m bench.compare runs/base.json runs/head.json --fail-on-regression 10
+"""
+import argparse
+import json
+import math
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.stats import format_table
+
+
+def _metrics(summary: Dict[str, Any]) -> List[Tuple[str, float, bool]]:
+    """(지표 이름, 값, 클수록 좋은가) 목록."""
+    rows = [
+        ("throughput_rps", summary.get("throughput_rps", math.nan), True),
+        ("retry_rate", summary.get("retry_rate", math.nan), False),
+        ("mean_attempts", summary.get("mean_attempts", math.nan), False),
+        ("errors", summary.get("errors", math.nan), False),
+    ]
+    for q in ("p50", "p95", "p99"):
+        rows.append((f"total.{q}_ms", summary["latency_ms"].get(q, math.nan), False))
+    for node, s in summary.get("nodes_ms", {}).items():
+        rows.append((f"{node}.calls", s.get("count", math.nan), False))
+        for q in ("p50", "p95", "p99"):
+            rows.append((f"{node}.{q}_ms", s.get(q, math.nan), False))
+    return rows
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """지표별 base/head 값과 변화율(%), 악화 여부."""
+    base_metrics = {name: (value, higher) for name, value, higher in _metrics(base["summary"])}
+    head_metrics = {name: (value, higher) for name, value, higher in _metrics(head["summary"])}
+    rows = []
+    for name in list(base_metrics) + [n for n in head_metrics if n not in base_metrics]:
+        b, higher = base_metrics.get(name, (math.nan, False))
+        h, higher = head_metrics.get(name, (math.nan, higher))
+        if b and not math.isnan(b) and not math.isnan(h):
+            delta = (h - b) / abs(b) * 100
+        else:
+            delta = math.nan
+        regression = not math.isnan(delta) and (delta < 0 if higher else delta > 0)
+        rows.append({"metric": name, "base": b, "head": h, "delta_pct": delta, "regression": regression})
+    return rows
+
+
+def _fmt(v: float) -> str:
+    if isinstance(v, float) and math.isnan(v):
+        return "-"
+    return f"{v:.3f}" if isinstance(v, float) and abs(v) < 10 else f"{v:.1f}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="벤치마크 실행 결과 비교")
+    p.add_argument("base")
+    p.add_argument("head")
+    p.add_argument("--fail-on-regression", type=float, default=None,
+                   help="지연시간/처리량 지표가 이 비율(%%) 이상 악화되면 종료 코드 1")
+    args = p.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    rows = compare(base, head)
+    table = [["metric", "base", "head", "delta"]]
+    for r in rows:
+        delta = "-" if math.isnan(r["delta_pct"]) else f"{r['delta_pct']:+.1f}%"
+        table.append([r["metric"], _fmt(float(r["base"])), _fmt(float(r["head"])), delta + (" !" if r["regression"] else "")])
+    print(f"base: {base['meta'].get('label') or args.base}  head: {head['meta'].get('label') or args.head}")
+    print(format_table(table))
+
+    if args.fail_on_regression is not None:
+        failed = [r for r in rows if r["regression"] and abs(r["delta_pct"]) >= args.fail_on_regression
+                  and (r["metric"].endswith("_ms") or r["metric"] == "throughput_rps")]
+        if failed:
+            print(f"{len(failed)} metric(s) regressed by >= {args.fail_on_regression}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
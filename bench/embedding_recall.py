@@ -0,0 +1,147 @@
+# bench/embedding_recall.py
+"""
+임베딩 차원 축소 / 양자화 recall 측정.
+
+저장된 전체 차원 float32 벡터의 정확 검색을 기준(ground truth)으로,
+(Matryoshka 차원 × 저장 dtype × 재채점 여부) 조합별 recall@k, 벡터당 바이트, 검색 지연시간을 잰다.
+text-embedding-3 계열은 앞쪽 d차원만 잘라 다시 정규화한 벡터가 API의 dimensions=d 결과와 같으므로
+재임베딩 없이 기존 컬렉션으로 비교할 수 있다 (컬렉션이 전체 차원으로 저장돼 있어야 함).
+
+질의:
+- --queries FILE: chat_logs.jsonl(재작성 질의 우선) 또는 한 줄에 질문 하나인 텍스트 → 임베딩 API로 임베딩
+- 생략 시: 코퍼스 청크 벡터에 잡음을 섞어 질의로 사용
+
+사용 예:
+    python -m bench.embedding_recall --queries chat_logs.jsonl --k 6 --target 0.95
+    python -m bench.embedding_recall --synthetic --chunks 20000 --dims 1536,512 --dtypes float32,int8,binary
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from bench.stats import summarize, format_table
+from services.vector_index_service import VectorIndex
+
+
+def load_questions(path: str, limit: int) -> List[str]:
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                query = json.loads(line).get("query") or {}
+                text = query.get("rewritten") or query.get("raw")
+            else:
+                text = line
+            if text:
+                questions.append(text)
+            if len(questions) >= limit:
+                break
+    return questions
+
+
+def _embed_questions(questions: List[str]) -> np.ndarray:
+    from app.deps import get_embeddings
+    return np.asarray(asyncio.run(get_embeddings().aembed_documents(questions)), dtype=np.float32)
+
+
+def _truncate(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """앞쪽 dim 차원만 남기고 다시 정규화 (Matryoshka)."""
+    v = vectors[:, :dim]
+    norms = np.linalg.norm(v, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return v / norms
+
+
+def _bytes_per_vector(dim: int, dtype: str) -> float:
+    return {"float32": 4 * dim, "float16": 2 * dim, "int8": dim + 4, "binary": dim / 8}[dtype]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="임베딩 차원 축소 / 양자화 recall 측정")
+    p.add_argument("--queries", help="chat_logs.jsonl 또는 질문 텍스트 파일")
+    p.add_argument("--num-queries", type=int, default=200)
+    p.add_argument("--synthetic", action="store_true", help="DB 대신 합성 코퍼스 사용 (dtype 비교용)")
+    p.add_argument("--chunks", type=int, default=20000, help="--synthetic 코퍼스 크기")
+    p.add_argument("--dims", default="1536,1024,768,512,256")
+    p.add_argument("--dtypes", default="float32,float16,int8,binary")
+    p.add_argument("--rescore", type=int, default=4, help="압축 dtype 재채점 후보 배수 (0 결과도 함께 출력)")
+    p.add_argument("--k", type=int, default=6)
+    p.add_argument("--target", type=float, default=0.95, help="권장 설정을 고를 최소 recall")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    if args.synthetic:
+        from bench.vector_index import synthetic_corpus
+        full_dim = max(int(d) for d in args.dims.split(","))
+        _, _, _, corpus, _ = synthetic_corpus(args.chunks, full_dim, 8, args.seed)
+    else:
+        from app.settings import get_settings
+        from services.database_service import fetch_collection_embeddings
+        rows = fetch_collection_embeddings(get_settings().collection_name)
+        corpus = np.stack([np.fromstring(r["embedding"].strip("[]"), sep=",", dtype=np.float32) for r in rows])
+    full_dim = corpus.shape[1]
+
+    if args.queries:
+        queries = _embed_questions(load_questions(args.queries, args.num_queries))
+        if queries.shape[1] != full_dim:
+            p.error(f"질의 임베딩 차원({queries.shape[1]})이 코퍼스({full_dim})와 다릅니다")
+    else:
+        picks = rng.integers(0, len(corpus), size=args.num_queries)
+        queries = corpus[picks] + 0.5 * corpus.std() * rng.standard_normal((len(picks), full_dim)).astype(np.float32)
+
+    n = len(corpus)
+    ids = [str(i) for i in range(n)]
+    contents = [""] * n
+    metadatas = [{} for _ in range(n)]
+
+    truth_index = VectorIndex(dim=full_dim)
+    truth_index.add(ids, contents, metadatas, corpus)
+    truth = [{d.id for d, _ in truth_index.search(q, args.k)} for q in queries]
+
+    table = [["dim", "dtype", "rescore", "bytes/vec", "MB", f"recall@{args.k}", "p50 ms", "p95 ms"]]
+    results = []
+    for dim in (int(d) for d in args.dims.split(",")):
+        if dim > full_dim:
+            continue
+        vectors, qs = _truncate(corpus, dim), _truncate(queries, dim)
+        for dtype in args.dtypes.split(","):
+            index = VectorIndex(dim=dim, dtype=dtype)
+            index.add(ids, contents, metadatas, vectors)
+            for rescore in ([0] if dtype == "float32" else sorted({0, args.rescore})):
+                index.rescore = rescore
+                hits, latencies = 0, []
+                for q, expected in zip(qs, truth):
+                    t0 = time.perf_counter()
+                    got = index.search(q, args.k)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    hits += len(expected & {d.id for d, _ in got})
+                recall = hits / max(1, sum(len(t) for t in truth))
+                bpv = _bytes_per_vector(dim, dtype)
+                s = summarize(latencies)
+                results.append((bpv, dim, dtype, rescore, recall))
+                table.append([
+                    dim, dtype, rescore or "-", f"{bpv:.0f}", f"{bpv * n / 1e6:.1f}",
+                    f"{recall:.3f}", f"{s['p50']:.2f}", f"{s['p95']:.2f}",
+                ])
+    print(format_table(table))
+
+    ok = [r for r in results if r[4] >= args.target]
+    if ok:
+        bpv, dim, dtype, rescore, recall = min(ok, key=lambda r: (r[0], -r[4]))
+        print(f"smallest setting with recall@{args.k} >= {args.target}: "
+              f"embed_dim={dim} vector_index_dtype={dtype} vector_index_rescore={rescore} "
+              f"({bpv:.0f} B/vector, recall {recall:.3f})")
+    else:
+        print(f"no setting reached recall@{args.k} >= {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# bench/html_cleaning.py
+"""
+HTML 정제 마이크로 벤치마크.
+
+이전 구현(BeautifulSoup 2회 파싱 + 비컴파일 정규식, 아래 legacy_*)과
+extract_html(lxml 1회 파싱 + 단일 순회)을 같은 공지 HTML 코퍼스에서 비교하고,
+정제 텍스트가 이전 구현과 같은지 확인한다.
+
+입력:
+- --html-dir DIR: *.html 파일 디렉터리
+- --from-date/--to-date: announcement_detail.html 조회 (--dump-dir로 파일 저장 가능)
+
+사용 예:
+    python -m bench.html_cleaning --html-dir samples/html --repeat 5
+"""
+import argparse
+import os
+import re
+import time
+import unicodedata
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from bench.stats import summarize, format_table
+from services.html_processing_service import extract_html
+
+
+# ========== 이전 구현 (기준선) ==========
+
+def _legacy_clean_text(s: str) -> str:
+    s = s.replace("\r\n", "\n").replace("\r", "\n")
+    s = re.sub(r"\n{2,}", "\n", s)
+    s = re.sub(r"[ \t]{2,}", " ", s)
+    lines = [line.strip() for line in s.splitlines() if line.strip()]
+    return "\n".join(lines)
+
+
+def legacy_html_to_text(html: str) -> str:
+    soup = BeautifulSoup(html or "", "lxml")
+    for t in soup(["script", "style"]):
+        t.decompose()
+    for tag in soup.find_all(["br", "p", "div"]):
+        tag.insert_before("\n")
+    text = soup.get_text()
+    text = unicodedata.normalize("NFC", text)
+    text = re.sub(r"[\u200b\u200c\u200d\uFEFF]", "", text)
+    text = text.replace("\xa0", " ")
+    text = re.sub(r"(?<=\s)\?(?=\s)", " ", text)
+    text = re.sub(r"\s*\?\s*", " ", text)
+    text = re.sub(r"\?{2,}", "?", text)
+    return _legacy_clean_text(text)
+
+
+def legacy_get_plain_text(html: str) -> str:
+    s = legacy_html_to_text(html)
+    s = re.sub(r"\n\s*:\s*\n", ": ", s)
+    s = re.sub(r"\s*:\s*\n", ": ", s)
+    s = re.sub(r"\n\s*:\s*", ": ", s)
+    s = re.sub(r"(\w)\n(\w)", r"\1 \2", s)
+    return _legacy_clean_text(s)
+
+
+def legacy_extract_image_urls(html: str) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    return [src for src in ((img.get("src") or "").strip() for img in soup.find_all("img")) if src]
+
+
+# ========== 코퍼스 ==========
+
+def load_html_dir(path: str) -> List[Tuple[str, str]]:
+    docs = []
+    for name in sorted(os.listdir(path)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(path, name), encoding="utf-8", errors="replace") as f:
+                docs.append((name, f.read()))
+    return docs
+
+
+def fetch_html(from_date: str, to_date: str, dump_dir: Optional[str]) -> List[Tuple[str, str]]:
+    from services.database_service import fetch_rows_by_date_range
+    docs = [(f"{r['id']}.html", r["html"] or "") for r in fetch_rows_by_date_range(from_date, to_date)]
+    if dump_dir:
+        os.makedirs(dump_dir, exist_ok=True)
+        for name, html in docs:
+            with open(os.path.join(dump_dir, name), "w", encoding="utf-8") as f:
+                f.write(html)
+    return docs
+
+
+# ========== 측정 ==========
+
+def _time_per_doc(fn, docs: List[Tuple[str, str]], repeat: int) -> List[float]:
+    """문서별 최솟값(µs) — 반복 측정으로 스케줄링 잡음을 줄인다."""
+    per_doc = []
+    for _, html in docs:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn(html)
+            best = min(best, time.perf_counter() - t0)
+        per_doc.append(best * 1_000_000)
+    return per_doc
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="HTML 정제 마이크로 벤치마크")
+    p.add_argument("--html-dir")
+    p.add_argument("--from-date")
+    p.add_argument("--to-date")
+    p.add_argument("--dump-dir")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+
+    if args.html_dir:
+        docs = load_html_dir(args.html_dir)
+    elif args.from_date and args.to_date:
+        docs = fetch_html(args.from_date, args.to_date, args.dump_dir)
+    else:
+        p.error("--html-dir 또는 --from-date/--to-date 가 필요합니다")
+
+    legacy = _time_per_doc(lambda h: (legacy_get_plain_text(h), legacy_extract_image_urls(h)), docs, args.repeat)
+    current = _time_per_doc(lambda h: extract_html(h), docs, args.repeat)
+
+    mismatches = [name for name, html in docs if legacy_get_plain_text(html) != extract_html(html).text]
+
+    ls, cs = summarize(legacy), summarize(current)
+    table = [["impl", "docs", "mean µs", "p50 µs", "p95 µs", "max µs"]]
+    for label, s in (("legacy", ls), ("extract_html", cs)):
+        table.append([label, s["count"], f"{s['mean']:.0f}", f"{s['p50']:.0f}", f"{s['p95']:.0f}", f"{s['max']:.0f}"])
+    print(format_table(table))
+    print(f"speedup (mean): {ls['mean'] / cs['mean']:.2f}x")
+    print(f"text mismatches: {len(mismatches)}/{len(docs)}" + (f" e.g. {mismatches[:5]}" if mismatches else ""))
+
+
+if __name__ == "__main__":
+    main()
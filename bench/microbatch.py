@@ -0,0 +1,86 @@
+# bench/microbatch.py
+"""
+질의 임베딩 마이크로 배치 벤치마크.
+
+요청당 고정 지연(왕복 오버헤드) + 항목당 지연이 있고 동시 요청 수가 제한된(레이트 리밋) 가짜 임베딩 API에
+동시 질의를 보내, 건별 호출과 MicroBatcher(창/최대 배치 조합)를 비교한다.
+API 호출 수, 처리량, 질의별 지연시간 p50/p95를 출력한다.
+
+사용 예:
+    python -m bench.microbatch --requests 500 --concurrency 64 --windows 0,2,5,10
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from bench.stats import summarize, format_table
+from services.batching_service import MicroBatcher
+
+
+class FakeEmbeddingAPI:
+    """call_ms + item_ms*항목수 만큼 걸리고 동시에 max_inflight개까지만 처리하는 API."""
+
+    def __init__(self, call_ms: float, item_ms: float, max_inflight: int):
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self._slots = asyncio.Semaphore(max_inflight)
+        self.calls = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        async with self._slots:
+            self.calls += 1
+            await asyncio.sleep((self.call_ms + self.item_ms * len(texts)) / 1000)
+            return [[float(len(t))] for t in texts]
+
+
+async def _run(api: FakeEmbeddingAPI, submit, requests: int, concurrency: int):
+    latencies: List[float] = []
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            i = queue.pop()
+            t0 = time.perf_counter()
+            await submit(f"query {i}")
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - t0
+
+
+async def amain(args: argparse.Namespace) -> None:
+    table = [["mode", "api calls", "req/s", "p50 ms", "p95 ms"]]
+
+    def row(label: str, api: FakeEmbeddingAPI, latencies: List[float], wall: float) -> None:
+        s = summarize(latencies)
+        table.append([label, api.calls, f"{len(latencies) / wall:.0f}", f"{s['p50']:.1f}", f"{s['p95']:.1f}"])
+
+    api = FakeEmbeddingAPI(args.call_ms, args.item_ms, args.max_inflight)
+    latencies, wall = await _run(api, lambda q: api.embed([q]), args.requests, args.concurrency)
+    row("single", api, latencies, wall)
+
+    for window in (float(w) for w in args.windows.split(",")):
+        api = FakeEmbeddingAPI(args.call_ms, args.item_ms, args.max_inflight)
+        batcher = MicroBatcher(api.embed, max_batch=args.max_batch, window_ms=window, name="bench")
+        latencies, wall = await _run(api, batcher.submit, args.requests, args.concurrency)
+        row(f"batch window={window:g}ms max={args.max_batch}", api, latencies, wall)
+
+    print(format_table(table))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="질의 임베딩 마이크로 배치 벤치마크")
+    p.add_argument("--requests", type=int, default=500)
+    p.add_argument("--concurrency", type=int, default=64, help="동시에 질의를 보내는 요청 수")
+    p.add_argument("--call-ms", type=float, default=120.0, help="API 호출당 고정 지연")
+    p.add_argument("--item-ms", type=float, default=0.5, help="항목당 추가 지연")
+    p.add_argument("--max-inflight", type=int, default=16, help="API 동시 처리 한도 (레이트 리밋 모사)")
+    p.add_argument("--max-batch", type=int, default=32)
+    p.add_argument("--windows", default="0,2,5,10", help="비교할 배치 창(ms) 목록")
+    asyncio.run(amain(p.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
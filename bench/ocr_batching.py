@@ -0,0 +1,158 @@
+# bench/ocr_batching.py
+"""
+Gemini OCR 배치 비교 벤치마크 (이미지별 요청 vs 배치 요청).
+
+같은 공지의 이미지 묶음마다 두 경로를 실행해 이미지당 지연시간, 이미지당 토큰,
+요청 수(배치 실패 시 단건 대체 포함)를 비교한다. 실제 Gemini를 호출하므로 GEMINI_API_KEY가 필요하다.
+이미지 선별/캐시 단계는 거치지 않는다.
+
+입력:
+- --image-dir DIR: 하위 디렉터리 하나 = 공지 하나 (하위 디렉터리가 없으면 DIR 전체가 공지 하나)
+- --urls FILE: JSONL ({"announcement_id": 123, "urls": ["https://...", ...]})
+
+사용 예:
+    python -m bench.ocr_batching --image-dir samples/notice_images --batch-max-images 6
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import REGISTRY
+
+from bench.stats import summarize, format_table
+
+_IMAGE_EXT = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp")
+
+
+def _read_images(path: str) -> List[bytes]:
+    images = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith(_IMAGE_EXT):
+            with open(os.path.join(path, name), "rb") as f:
+                images.append(f.read())
+    return images
+
+
+def load_image_dir(path: str) -> List[Tuple[str, List[bytes]]]:
+    subdirs = sorted(d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)))
+    if not subdirs:
+        return [(os.path.basename(path.rstrip("/")), _read_images(path))]
+    return [(d, _read_images(os.path.join(path, d))) for d in subdirs]
+
+
+async def load_urls(path: str) -> List[Tuple[str, List[bytes]]]:
+    from services.image_download_service import download_image
+    groups = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                images = await asyncio.gather(*(download_image(u) for u in rec["urls"]))
+                groups.append((str(rec.get("announcement_id", len(groups))), list(images)))
+    return groups
+
+
+def _counter_total(name: str, **labels: str) -> float:
+    """라벨 조건에 맞는 샘플 값의 합 (Prometheus 기본 레지스트리)."""
+    total = 0.0
+    for metric in REGISTRY.collect():
+        for sample in metric.samples:
+            if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items()):
+                total += sample.value
+    return total
+
+
+def _snapshot() -> Dict[str, float]:
+    return {
+        "tokens_in": _counter_total("llm_tokens_total", node="ocr", type="input"),
+        "tokens_out": _counter_total("llm_tokens_total", node="ocr", type="output"),
+        "single_requests": _counter_total("ocr_request_seconds_count", provider="gemini"),
+        "batch_requests": _counter_total("ocr_request_seconds_count", provider="gemini_batch"),
+    }
+
+
+async def run_mode(service, groups, batched: bool) -> Dict[str, object]:
+    from services.ocr.base import BaseOCRService
+
+    per_image_ms: List[float] = []
+    failures = 0
+    before = _snapshot()
+    for _, images in groups:
+        if not images:
+            continue
+        t0 = time.perf_counter()
+        if batched:
+            results = await service.extract_text_from_images(images)
+        else:
+            results = await BaseOCRService.extract_text_from_images(service, images)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        per_image_ms.extend([elapsed_ms / len(images)] * len(images))
+        failures += sum(1 for r in results if isinstance(r, BaseException))
+    after = _snapshot()
+
+    n = len(per_image_ms)
+    delta = {k: after[k] - before[k] for k in before}
+    return {
+        "images": n,
+        "failures": failures,
+        "latency": summarize(per_image_ms),
+        "tokens_in_per_image": delta["tokens_in"] / n if n else 0.0,
+        "tokens_out_per_image": delta["tokens_out"] / n if n else 0.0,
+        "single_requests": int(delta["single_requests"]),
+        "batch_requests": int(delta["batch_requests"]),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Gemini OCR 배치 비교 벤치마크")
+    p.add_argument("--image-dir")
+    p.add_argument("--urls")
+    p.add_argument("--batch-max-images", type=int)
+    p.add_argument("--batch-max-bytes", type=int)
+    p.add_argument("--out", help="결과 JSON 저장 경로")
+    args = p.parse_args(argv)
+
+    from app.settings import get_settings
+    cfg = get_settings()
+    if args.batch_max_images is not None:
+        cfg.ocr_batch_max_images = args.batch_max_images
+    if args.batch_max_bytes is not None:
+        cfg.ocr_batch_max_bytes = args.batch_max_bytes
+
+    async def run() -> Dict[str, object]:
+        if args.image_dir:
+            groups = load_image_dir(args.image_dir)
+        elif args.urls:
+            groups = await load_urls(args.urls)
+        else:
+            p.error("--image-dir 또는 --urls 가 필요합니다")
+
+        from services.ocr.gemini_ocr_service import GeminiOCRService
+        service = GeminiOCRService()
+        return {
+            "single": await run_mode(service, groups, batched=False),
+            "batch": await run_mode(service, groups, batched=True),
+        }
+
+    results = asyncio.run(run())
+
+    table = [["mode", "images", "fail", "ms/img p50", "ms/img mean", "in tok/img", "out tok/img", "requests"]]
+    for mode, r in results.items():
+        lat = r["latency"]
+        table.append([
+            mode, r["images"], r["failures"], f"{lat['p50']:.0f}", f"{lat['mean']:.0f}",
+            f"{r['tokens_in_per_image']:.0f}", f"{r['tokens_out_per_image']:.0f}",
+            f"{r['single_requests']} single + {r['batch_requests']} batch",
+        ])
+    print(format_table(table))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# bench/overload.py
+"""
+/chat 과부하 벤치마크 (수락 제어 켜짐 vs 꺼짐).
+
+동시 처리 용량이 제한된 가짜 LLM(용량을 넘으면 프로바이더 안에서 줄을 서 지연이 늘어남)을 두고
+고정 도착률(--rps)로 /chat 핸들러를 호출해 성공 / 503(거절) / 504(마감 초과) 수,
+성공 요청 지연시간 p50/p95, goodput(마감 안에 성공한 초당 요청 수)을 비교한다.
+
+- unbounded: 수락 제어 없이 모두 받고 마감만 llm_timeout 수준 (이전 동작)
+- admission: 현재 설정의 동시 처리 상한 / 대기열 / degraded / 요청 마감
+
+사용 예:
+    python -m bench.overload --rps 40 --duration 20 --llm-capacity 16 --chat-latency-ms 1500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from bench.fakes import ensure_offline_env, FakeChatModel
+from bench.stats import summarize, format_table
+
+
+class CapacityChatModel(FakeChatModel):
+    """동시에 capacity개까지만 응답을 만드는 가짜 LLM (나머지는 프로바이더 안에서 대기)."""
+
+    capacity: int = 16
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if getattr(self, "_slot_loop", None) is not loop:
+            object.__setattr__(self, "_slot_loop", loop)
+            object.__setattr__(self, "_slot_sem", asyncio.Semaphore(self.capacity))
+        return self._slot_sem
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, fake_schema: Optional[str] = None, **kwargs):
+        async with self._slots():
+            return await super()._agenerate(messages, stop, run_manager, fake_schema=fake_schema, **kwargs)
+
+
+def _configure(mode: str, args: argparse.Namespace) -> None:
+    from app.settings import get_settings
+    from services.admission_service import get_admission_controller
+
+    cfg = get_settings()
+    if mode == "unbounded":
+        cfg.chat_max_inflight, cfg.chat_max_queue = 1_000_000, 0
+        cfg.chat_degrade_load, cfg.chat_deadline_seconds = float("inf"), float(cfg.llm_timeout)
+        cfg.chat_optional_min_seconds = 0.0
+    else:
+        for name, value in args.defaults.items():
+            setattr(cfg, name, value)
+    get_admission_controller.cache_clear()
+
+
+async def _run(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from fastapi import HTTPException
+    import main
+    from models import ChatRequest
+
+    _configure(mode, args)
+    outcomes: Dict[str, int] = {"ok": 0, "503": 0, "504": 0, "error": 0}
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        t0 = time.perf_counter()
+        try:
+            await main.chat(ChatRequest(question=f"수강신청 일정 {i % 50}", conversation_id=f"{mode}-{i}"))
+        except HTTPException as e:
+            outcomes[str(e.status_code)] = outcomes.get(str(e.status_code), 0) + 1
+            return
+        except Exception:
+            outcomes["error"] += 1
+            return
+        outcomes["ok"] += 1
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    tasks = []
+    start = time.perf_counter()
+    total = int(args.rps * args.duration)
+    for i in range(total):
+        # 고정 도착률 (응답을 기다리지 않는 open-loop 부하)
+        await asyncio.sleep(max(0.0, start + i / args.rps - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(i)))
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - start
+    return {"outcomes": outcomes, "latency": summarize(latencies), "goodput": outcomes["ok"] / wall}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="/chat 과부하 벤치마크 (수락 제어 켜짐 vs 꺼짐)")
+    p.add_argument("--rps", type=float, default=40.0, help="초당 도착 요청 수")
+    p.add_argument("--duration", type=float, default=20.0, help="부하를 거는 시간(초)")
+    p.add_argument("--llm-capacity", type=int, default=16, help="가짜 LLM의 동시 처리 용량")
+    p.add_argument("--chat-latency-ms", type=float, default=1500.0)
+    p.add_argument("--small-latency-ms", type=float, default=300.0)
+    p.add_argument("--modes", default="unbounded,admission")
+    args = p.parse_args(argv)
+
+    ensure_offline_env()
+    os.chdir(tempfile.mkdtemp(prefix="bench-overload-"))  # chat_logs.jsonl을 임시 디렉터리에
+
+    import app.deps as deps
+    from app.settings import get_settings
+    from bench.replay import install_fake_backends, parse_args as replay_args
+
+    install_fake_backends(replay_args(["-", "--embed-latency-ms", "20", "--jitter-ms", "0", "--retry-rate", "0.2"]))
+    deps._chat_llm = CapacityChatModel(model_name="fake-chat", latency_ms=args.chat_latency_ms,
+                                       capacity=args.llm_capacity)
+    deps._small_llm = CapacityChatModel(model_name="fake-small", latency_ms=args.small_latency_ms,
+                                        capacity=args.llm_capacity * 2, retry_rate=0.2)
+
+    cfg = get_settings()
+    args.defaults = {name: getattr(cfg, name) for name in (
+        "chat_max_inflight", "chat_max_queue", "chat_degrade_load", "chat_deadline_seconds",
+        "chat_optional_min_seconds",
+    )}
+
+    table = [["mode", "ok", "503", "504", "goodput rps", "p50 ms", "p95 ms"]]
+    for mode in args.modes.split(","):
+        r = asyncio.run(_run(mode, args))
+        o = r["outcomes"]
+        table.append([mode, o["ok"], o["503"], o["504"], f"{r['goodput']:.1f}",
+                      f"{r['latency']['p50']:.0f}", f"{r['latency']['p95']:.0f}"])
+    print(format_table(table))
+
+
+if __name__ == "__main__":
+    main()
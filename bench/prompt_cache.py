@@ -0,0 +1,199 @@
+# bench/prompt_cache.py
+"""
+프롬프트 캐시 친화 배치 벤치마크 (이전 배치 v1 vs 현재 배치).
+
+chat_logs.jsonl의 질문/재작성 질의/참고 청크/답변으로 각 요청이 보냈을 generate / rewrite / guardrail 프롬프트를
+다시 만들고, OpenAI 방식의 프리픽스 캐시(앞부분이 바이트 단위로 같고 min-prefix 토큰 이상이면
+increment 토큰 단위로 적중)를 모사해 호출당 캐시 적중 토큰과 입력 비용을 비교한다.
+--live: 실제 chat LLM에 generate 프롬프트를 보내 지연시간과 usage_metadata의 cache_read 토큰을 잰다 (OpenAI 키 필요).
+
+사용 예:
+    python -m bench.prompt_cache chat_logs.jsonl
+    python -m bench.prompt_cache chat_logs.jsonl --live --live-calls 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from bench.stats import summarize, format_table
+
+# ========== 이전 배치 (v1: 대화 기록/질문이 고정 지침·참고 공지보다 앞) ==========
+
+LEGACY_GEN_USER_TMPL = """이전 대화:
+{chat_history}
+
+질문: {question}
+
+재작성된 질의: {rewrite_result}
+
+참고할 공지:
+{context}
+
+이 질문에 대해 정확한 답변을 작성하세요."""
+
+_REWRITE_GUIDE_HEADER = "\n지침:\n"
+
+
+def _legacy_prompts() -> Dict[str, ChatPromptTemplate]:
+    from chat.nodes.generate import GEN_SYS
+    from chat.nodes.rewrite import REWRITE_SYS
+
+    # v1은 재작성 지침이 user 메시지 끝에 있었다
+    rewrite_sys, guide = REWRITE_SYS.split(_REWRITE_GUIDE_HEADER, 1)
+    rewrite_user = "대화 기록:\n{{ chat_history }}\n\n원 질문:\n{{ question }}\n" + _REWRITE_GUIDE_HEADER + guide
+    return {
+        "generate": ChatPromptTemplate.from_messages([("system", GEN_SYS), ("user", LEGACY_GEN_USER_TMPL)]),
+        "rewrite": ChatPromptTemplate.from_messages(
+            [("system", rewrite_sys + "\n"), ("user", rewrite_user)], template_format="jinja2",
+        ),
+    }
+
+
+def _current_prompts() -> Dict[str, ChatPromptTemplate]:
+    from chat.nodes.generate import gen_prompt
+    from chat.nodes.rewrite import rewrite_prompt
+    return {"generate": gen_prompt, "rewrite": rewrite_prompt}
+
+
+# ========== 요청 재구성 ==========
+
+def load_requests(path: str, recent_messages: int) -> List[Dict[str, Any]]:
+    """chat_logs 레코드 → 프롬프트 입력 (대화 기록은 같은 request_id의 이전 턴으로 복원)."""
+    from services.history_service import format_history
+
+    histories: Dict[str, List[BaseMessage]] = defaultdict(list)
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if "query" not in rec:
+                continue
+            conv_id = (rec.get("metadata") or {}).get("request_id") or ""
+            results = (rec.get("retrieval") or {}).get("results") or []
+            docs = []
+            for i, ctx in enumerate(rec.get("context_used") or []):
+                meta = results[i] if i < len(results) else {}
+                docs.append(Document(page_content=ctx.get("page_content") or "", metadata={
+                    "announcement_id": ctx.get("doc_id"), "chunk_index": i,
+                    "title": meta.get("title"), "url": meta.get("url"),
+                }))
+            history = histories[conv_id]
+            requests.append({
+                "question": rec["query"]["raw"],
+                "rewritten": rec["query"].get("rewritten") or "",
+                "docs": docs,
+                "chat_history": format_history("", history[-recent_messages:] if recent_messages else [], 200),
+            })
+            answer = (rec.get("generation") or {}).get("final_answer") or ""
+            history.extend([HumanMessage(content=rec["query"]["raw"]), AIMessage(content=answer)])
+    return requests
+
+
+def build_messages(prompts: Dict[str, ChatPromptTemplate], name: str, req: Dict[str, Any]) -> List[BaseMessage]:
+    from app.settings import get_settings
+    from services.context_service import pack_context
+
+    if name == "generate":
+        return prompts[name].format_messages(
+            context=pack_context(req["docs"], get_settings().context_token_budget),
+            chat_history=req["chat_history"],
+            question=req["question"],
+            rewrite_result=req["rewritten"],
+        )
+    return prompts[name].format_messages(question=req["question"], chat_history=req["chat_history"])
+
+
+def _serialize(messages: List[BaseMessage]) -> str:
+    return "".join(f"<|{m.type}|>{m.content}" for m in messages)
+
+
+# ========== 프리픽스 캐시 모사 ==========
+
+def simulate(prompts: List[str], min_prefix: int, increment: int) -> List[Tuple[int, int]]:
+    """호출별 (입력 토큰, 캐시 적중 토큰). 이전 호출 중 가장 긴 공통 프리픽스를 캐시로 본다."""
+    from services.token_service import count_tokens
+
+    seen: List[str] = []
+    results = []
+    for text in prompts:
+        prefix = max((len(os.path.commonprefix([text, prev])) for prev in seen), default=0)
+        prefix_tokens = count_tokens(text[:prefix]) if prefix else 0
+        cached = (prefix_tokens // increment) * increment if prefix_tokens >= min_prefix else 0
+        results.append((count_tokens(text), cached))
+        seen.append(text)
+    return results
+
+
+# ========== 실제 호출 ==========
+
+async def live_generate(messages: List[List[BaseMessage]], cache_key: str) -> Dict[str, Any]:
+    from app.deps import get_chat_llm
+
+    llm = get_chat_llm().bind(max_tokens=1, prompt_cache_key=cache_key)
+    latencies, cached, total = [], 0, 0
+    for msgs in messages:
+        t0 = time.perf_counter()
+        out = await llm.ainvoke(msgs)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        usage = out.usage_metadata or {}
+        total += usage.get("input_tokens") or 0
+        cached += (usage.get("input_token_details") or {}).get("cache_read") or 0
+    return {"latency": summarize(latencies), "cached_share": cached / total if total else 0.0}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="프롬프트 캐시 친화 배치 벤치마크")
+    p.add_argument("logs", help="chat_logs.jsonl")
+    p.add_argument("--recent-messages", type=int, default=6, help="복원할 대화 기록 메시지 수")
+    p.add_argument("--min-prefix", type=int, default=1024, help="캐시가 적용되는 최소 프리픽스 토큰")
+    p.add_argument("--increment", type=int, default=128, help="캐시 적중 토큰 단위")
+    p.add_argument("--input-price", type=float, default=0.15, help="입력 토큰 100만 개당 가격 (USD)")
+    p.add_argument("--cached-discount", type=float, default=0.5, help="캐시 적중 입력 토큰 할인율")
+    p.add_argument("--live", action="store_true", help="실제 chat LLM으로 generate 프롬프트 전송")
+    p.add_argument("--live-calls", type=int, default=30)
+    args = p.parse_args(argv)
+
+    from chat.prompts import PROMPT_VERSION
+
+    requests = load_requests(args.logs, args.recent_messages)
+    print(f"requests: {len(requests)}")
+    if not requests:
+        return
+    layouts = {"v1": _legacy_prompts(), f"v{PROMPT_VERSION}": _current_prompts()}
+
+    table = [["prompt", "layout", "calls", "input tok/call", "cached share", "USD / 1k calls"]]
+    generate_messages: Dict[str, List[List[BaseMessage]]] = {}
+    for name in ("generate", "rewrite"):
+        for layout, prompts in layouts.items():
+            messages = [build_messages(prompts, name, req) for req in requests]
+            if name == "generate":
+                generate_messages[layout] = messages
+            sim = simulate([_serialize(m) for m in messages], args.min_prefix, args.increment)
+            total = sum(t for t, _ in sim)
+            cached = sum(c for _, c in sim)
+            cost = (total - cached * args.cached_discount) * args.input_price / 1e6 / len(sim) * 1000
+            table.append([name, layout, len(sim), f"{total / len(sim):.0f}", f"{cached / total:.3f}", f"{cost:.4f}"])
+    print(format_table(table))
+
+    if args.live:
+        live = [["layout", "calls", "p50 ms", "p95 ms", "cached share"]]
+        for layout, messages in generate_messages.items():
+            r = asyncio.run(live_generate(messages[:args.live_calls], f"bench-prompt-cache:{layout}"))
+            live.append([layout, r["latency"]["count"], f"{r['latency']['p50']:.0f}",
+                         f"{r['latency']['p95']:.0f}", f"{r['cached_share']:.3f}"])
+        print(format_table(live))
+
+
+if __name__ == "__main__":
+    main()
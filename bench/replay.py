@@ -0,0 +1,300 @@
+# bench/replay.py
+"""
+기록된 채팅 트래픽을 chat_graph_app에 재생하는 오프라인 벤치마크.
+
+입력 JSONL 한 줄은 다음 중 하나:
+- {"question": "...", "conversation_id": "..."}
+- {"conversation_id": "...", "conversation": ["질문1", "질문2", ...]}
+- chat_logs.jsonl 레코드 ({"metadata": {"request_id"}, "query": {"raw"}, ...})
+
+같은 conversation_id의 질문은 순서대로, 서로 다른 대화는 --concurrency 만큼 동시에 재생한다.
+
+사용 예:
+    python -m bench.replay chat_logs.jsonl --out runs/base.json
+    python -m bench.replay questions.jsonl --corpus corpus.jsonl --chat-latency-ms 800 --out runs/head.json
+    python -m bench.compare runs/base.json runs/head.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+
+from bench.fakes import ensure_offline_env, FakeChatModel, HashingEmbeddings, BenchVectorStore
+from bench.stats import summarize, format_table
+
+logger = logging.getLogger(__name__)
+
+
+# ========== 입력 로딩 ==========
+
+def load_conversations(path: str) -> List[Tuple[str, List[str]]]:
+    """JSONL을 (conversation_id, [질문...]) 목록으로 변환 (등장 순서 유지)."""
+    conversations: "OrderedDict[str, List[str]]" = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if "conversation" in rec:
+                conv_id = rec.get("conversation_id") or str(uuid.uuid4())
+                conversations.setdefault(conv_id, []).extend(rec["conversation"])
+            elif "query" in rec:
+                conv_id = (rec.get("metadata") or {}).get("request_id") or str(uuid.uuid4())
+                conversations.setdefault(conv_id, []).append(rec["query"]["raw"])
+            else:
+                conv_id = rec.get("conversation_id") or str(uuid.uuid4())
+                conversations.setdefault(conv_id, []).append(rec["question"])
+    return list(conversations.items())
+
+
+def load_corpus(path: str) -> List[Document]:
+    """
+    코퍼스 JSONL 로딩.
+    - {"page_content": "...", "metadata": {...}} 형식의 문서
+    - chat_logs.jsonl 레코드: context_used와 retrieval 메타데이터로 문서를 복원 (중복 제거)
+    """
+    docs: List[Document] = []
+    seen = set()
+    chunk_counts: Dict[Any, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if "page_content" in rec:
+                docs.append(Document(page_content=rec["page_content"], metadata=rec.get("metadata") or {}))
+                continue
+            results = (rec.get("retrieval") or {}).get("results") or []
+            for i, ctx in enumerate(rec.get("context_used") or []):
+                key = (ctx.get("doc_id"), ctx.get("page_content"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                md = dict(results[i]) if i < len(results) else {}
+                md.pop("score", None)
+                doc_id = ctx.get("doc_id")
+                md["announcement_id"] = doc_id
+                md["chunk_index"] = chunk_counts.get(doc_id, 0)
+                chunk_counts[doc_id] = md["chunk_index"] + 1
+                docs.append(Document(page_content=ctx["page_content"], metadata=md))
+    return docs
+
+
+# ========== 노드 타이밍 ==========
+
+class NodeTimingCallbackHandler(BaseCallbackHandler):
+    """LangGraph 노드 실행(on_chain_start/end)을 잡아 노드별 소요 시간을 기록."""
+
+    run_inline = True
+
+    def __init__(self):
+        super().__init__()
+        self._starts: Dict[UUID, Tuple[str, float]] = {}
+        self.timings: List[Tuple[str, float]] = []
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._starts[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> None:
+        started = self._starts.pop(run_id, None)
+        if started:
+            node, t0 = started
+            self.timings.append((node, (time.perf_counter() - t0) * 1000))
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+
+# ========== 백엔드 구성 ==========
+
+def install_fake_backends(args: argparse.Namespace) -> None:
+    """app.deps의 lazy singleton에 가짜 백엔드를 주입한다."""
+    import app.deps as deps
+
+    deps._chat_llm = FakeChatModel(
+        model_name="fake-chat", latency_ms=args.chat_latency_ms, jitter_ms=args.jitter_ms,
+    )
+    deps._small_llm = FakeChatModel(
+        model_name="fake-small", latency_ms=args.small_latency_ms, jitter_ms=args.jitter_ms,
+        retry_rate=args.retry_rate,
+    )
+    embeddings = HashingEmbeddings(dim=args.embed_dim, latency_ms=args.embed_latency_ms)
+    deps._embeddings = embeddings
+
+    if args.store == "memory":
+        store = BenchVectorStore(embedding=embeddings)
+    else:
+        from langchain_postgres.vectorstores import PGVector
+        store = PGVector(
+            embeddings=embeddings,
+            connection=args.pg_conn,
+            collection_name=args.collection,
+            async_mode=True,
+            embedding_length=args.embed_dim,
+            use_jsonb=True,
+            create_extension=True,
+            pre_delete_collection=True,
+        )
+    deps._vectorstore = store
+
+
+async def load_store(corpus: List[Document]) -> None:
+    import app.deps as deps
+    if corpus:
+        await deps._vectorstore.aadd_documents(corpus)
+
+
+# ========== 재생 ==========
+
+async def _replay_conversation(graph, conv_id: str, questions: List[str], max_retries: int) -> List[Dict[str, Any]]:
+    from chat.chat_graph import build_turn_input
+
+    thread_id = f"bench-{conv_id}"
+    records = []
+    for turn, question in enumerate(questions):
+        timing = NodeTimingCallbackHandler()
+        record: Dict[str, Any] = {"conversation_id": conv_id, "turn": turn, "question": question}
+        t0 = time.perf_counter()
+        try:
+            state = await graph.ainvoke(
+                build_turn_input(question),
+                config={
+                    "configurable": {"thread_id": thread_id, "max_retries": max_retries},
+                    "callbacks": [timing],
+                },
+            )
+            record["attempts"] = state.get("attempt", 0)
+            record["doc_count"] = len(state.get("docs") or [])
+        except Exception as e:
+            logger.exception(f"Replay failed for {conv_id}#{turn}")
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency_ms"] = (time.perf_counter() - t0) * 1000
+        nodes: Dict[str, List[float]] = {}
+        for node, ms in timing.timings:
+            nodes.setdefault(node, []).append(ms)
+        record["nodes"] = nodes
+        records.append(record)
+    return records
+
+
+async def run_replay(conversations: List[Tuple[str, List[str]]], concurrency: int, max_retries: int) -> Tuple[List[Dict[str, Any]], float]:
+    from chat.chat_graph import app as graph
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(conv_id: str, questions: List[str]):
+        async with semaphore:
+            return await _replay_conversation(graph, conv_id, questions, max_retries)
+
+    t0 = time.perf_counter()
+    per_conv = await asyncio.gather(*(bounded(cid, qs) for cid, qs in conversations))
+    wall_s = time.perf_counter() - t0
+    return [r for conv in per_conv for r in conv], wall_s
+
+
+def build_summary(records: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    ok = [r for r in records if "error" not in r]
+    node_ms: Dict[str, List[float]] = {}
+    for r in ok:
+        for node, values in r["nodes"].items():
+            node_ms.setdefault(node, []).extend(values)
+    attempts = [r["attempts"] for r in ok]
+    return {
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "wall_s": wall_s,
+        "throughput_rps": len(ok) / wall_s if wall_s else 0.0,
+        "latency_ms": summarize([r["latency_ms"] for r in ok]),
+        "nodes_ms": {node: summarize(values) for node, values in sorted(node_ms.items())},
+        "retry_rate": sum(1 for a in attempts if a > 0) / len(attempts) if attempts else 0.0,
+        "mean_attempts": sum(attempts) / len(attempts) if attempts else 0.0,
+    }
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(f"requests={summary['requests']} errors={summary['errors']} "
+          f"wall={summary['wall_s']:.2f}s throughput={summary['throughput_rps']:.2f} req/s "
+          f"retry_rate={summary['retry_rate']:.1%} mean_attempts={summary['mean_attempts']:.2f}")
+    rows = [["scope", "count", "p50 ms", "p95 ms", "p99 ms", "max ms"]]
+    lat = summary["latency_ms"]
+    rows.append(["total", lat["count"], f"{lat['p50']:.1f}", f"{lat['p95']:.1f}", f"{lat['p99']:.1f}", f"{lat['max']:.1f}"])
+    for node, s in summary["nodes_ms"].items():
+        rows.append([node, s["count"], f"{s['p50']:.1f}", f"{s['p95']:.1f}", f"{s['p99']:.1f}", f"{s['max']:.1f}"])
+    print(format_table(rows))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="chat_graph_app 오프라인 재생 벤치마크")
+    p.add_argument("traffic", help="재생할 질문/대화 JSONL (chat_logs.jsonl 형식 지원)")
+    p.add_argument("--corpus", help="벡터 스토어에 적재할 문서 JSONL (기본: traffic 파일의 context_used)")
+    p.add_argument("--out", help="결과 JSON 저장 경로")
+    p.add_argument("--concurrency", type=int, default=8, help="동시에 재생할 대화 수")
+    p.add_argument("--max-retries", type=int, default=3)
+    p.add_argument("--chat-latency-ms", type=float, default=800.0)
+    p.add_argument("--small-latency-ms", type=float, default=250.0)
+    p.add_argument("--embed-latency-ms", type=float, default=80.0)
+    p.add_argument("--jitter-ms", type=float, default=50.0)
+    p.add_argument("--retry-rate", type=float, default=0.2, help="validate가 RETRY를 반환할 비율")
+    p.add_argument("--embed-dim", type=int, default=256)
+    p.add_argument("--store", choices=["memory", "pgvector"], default="memory")
+    p.add_argument("--pg-conn", help="--store pgvector 일 때 사용할 로컬 Postgres+pgvector 접속 문자열")
+    p.add_argument("--collection", default="bench_replay", help="--store pgvector 일 때 사용할 컬렉션 (실행마다 초기화)")
+    p.add_argument("--label", default="", help="결과에 기록할 실행 이름")
+    args = p.parse_args(argv)
+    if args.store == "pgvector" and not args.pg_conn:
+        p.error("--store pgvector requires --pg-conn")
+    return args
+
+
+async def amain(args: argparse.Namespace) -> Dict[str, Any]:
+    conversations = load_conversations(args.traffic)
+    corpus = load_corpus(args.corpus or args.traffic)
+    logger.info(f"Loaded {sum(len(q) for _, q in conversations)} questions in {len(conversations)} conversations, "
+                f"{len(corpus)} corpus documents")
+
+    install_fake_backends(args)
+    await load_store(corpus)
+
+    records, wall_s = await run_replay(conversations, args.concurrency, args.max_retries)
+    summary = build_summary(records, wall_s)
+    return {
+        "meta": {
+            "label": args.label,
+            "timestamp": datetime.now().isoformat(),
+            "args": {k: v for k, v in vars(args).items() if k != "pg_conn"},
+        },
+        "summary": summary,
+        "requests": records,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    ensure_offline_env()
+    args = parse_args(argv)
+    result = asyncio.run(amain(args))
+    print_summary(result["summary"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Saved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
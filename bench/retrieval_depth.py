@@ -0,0 +1,129 @@
+# bench/retrieval_depth.py
+"""
+검색 깊이 정책 오프라인 보정.
+
+chat_logs.jsonl의 첫 검색 후보 거리(retrieval.candidate_distances)와 검증 결과로 각 턴에 필요한 청크 수를
+추정하고, 정책 파라미터 격자에서 "필요한 청크를 포함한 턴 비율(recall)이 목표 이상이면서 평균 청크 수가
+가장 적은" 조합을 고른다.
+
+필요한 청크 수(라벨) 추정:
+- 첫 시도에 PASS: 답변과 어휘가 충분히 겹치는 청크(답변 근거로 본다) 중 가장 낮은 순위까지
+- 재시도한 턴: 첫 검색 깊이로는 부족했으므로 그보다 step개 더
+기간 조건 질문(기간 인덱스 결과가 앞에 붙음)과 후보 거리가 없는 이전 로그는 제외한다.
+
+사용 예:
+    python -m bench.retrieval_depth chat_logs.jsonl
+    python -m bench.retrieval_depth chat_logs.jsonl --target-recall 0.97 --out data/retrieval_policy.json
+"""
+import argparse
+import itertools
+import json
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.stats import format_table
+from services.context_service import char_bigrams
+from services.retrieval_depth_service import DepthPolicy, choose_depth, save_depth_policy
+
+_INF = float("inf")
+
+
+def _needed_depth(rec: Dict[str, Any], step: int, min_overlap: float, relative: float) -> Optional[int]:
+    retrieval = rec.get("retrieval") or {}
+    validation = rec.get("validation") or {}
+    distances = retrieval.get("candidate_distances") or []
+    if not distances or retrieval.get("temporal") or validation.get("decision") is None:
+        return None
+
+    if validation.get("attempt", 0) > 0 or validation.get("decision") == "RETRY":
+        return min(retrieval.get("depth", 0) + step, len(distances))
+
+    answer = char_bigrams((rec.get("generation") or {}).get("final_answer") or "")
+    if not answer:
+        return None
+    coverage = [
+        len(answer & char_bigrams(ctx.get("page_content") or "")) / len(answer)
+        for ctx in rec.get("context_used") or []
+    ]
+    if not coverage:
+        return None
+    threshold = max(min_overlap, relative * max(coverage))
+    used = [i for i, c in enumerate(coverage) if c >= threshold]
+    return used[-1] + 1 if used else None
+
+
+def load_samples(path: str, step: int, min_overlap: float, relative: float) -> Tuple[List[Tuple[List[float], int]], int]:
+    """(후보 거리, 필요한 청크 수) 목록과 건너뛴 레코드 수."""
+    samples, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            needed = _needed_depth(rec, step, min_overlap, relative)
+            if needed is None:
+                skipped += 1
+                continue
+            samples.append((rec["retrieval"]["candidate_distances"], needed))
+    return samples, skipped
+
+
+def evaluate(policy: DepthPolicy, samples: List[Tuple[List[float], int]]) -> Dict[str, float]:
+    depths = [choose_depth(distances, policy)[0] for distances, _ in samples]
+    hits = sum(1 for n, (_, needed) in zip(depths, samples) if n >= needed)
+    return {"recall": hits / len(samples), "mean_depth": sum(depths) / len(samples)}
+
+
+def calibrate(samples: List[Tuple[List[float], int]], base: DepthPolicy, target_recall: float) -> Tuple[DepthPolicy, Dict[str, float]]:
+    """recall >= target_recall 중 평균 청크 수 최소 (없으면 recall 최대) 조합."""
+    grid = itertools.product(
+        (0.02, 0.03, 0.05, 0.08, 0.12, _INF),   # gap
+        (0.08, 0.1, 0.15, 0.2, _INF),           # margin
+        (-1.0, 0.01, 0.02, 0.03, 0.05),         # flat_spread (-1: 넓히지 않음)
+        (4, 5, 6, 8),                           # base_k
+        (10, 12, 16),                           # flat_k
+    )
+    best: Optional[Tuple[Tuple[float, float], DepthPolicy, Dict[str, float]]] = None
+    for gap, margin, flat_spread, base_k, flat_k in grid:
+        policy = replace(base, gap=gap, margin=margin, flat_spread=flat_spread, base_k=base_k, flat_k=flat_k)
+        result = evaluate(policy, samples)
+        if result["recall"] >= target_recall:
+            key = (0.0, result["mean_depth"] - result["recall"] * 1e-6)
+        else:
+            key = (1.0, -result["recall"])
+        if best is None or key < best[0]:
+            best = (key, policy, result)
+    return best[1], best[2]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="검색 깊이 정책 오프라인 보정")
+    p.add_argument("logs", help="chat_logs.jsonl")
+    p.add_argument("--target-recall", type=float, default=0.95, help="필요한 청크를 포함해야 하는 턴 비율")
+    p.add_argument("--min-overlap", type=float, default=0.2, help="답변 바이그램 중 청크에 있는 비율 하한")
+    p.add_argument("--relative", type=float, default=0.6, help="가장 많이 겹치는 청크 대비 비율 하한")
+    p.add_argument("--out", help="보정 결과 JSON 경로 (예: data/retrieval_policy.json)")
+    args = p.parse_args(argv)
+
+    base = DepthPolicy()
+    samples, skipped = load_samples(args.logs, base.step, args.min_overlap, args.relative)
+    print(f"samples: {len(samples)} (skipped {skipped})")
+    if not samples:
+        return
+
+    best, result = calibrate(samples, base, args.target_recall)
+    table = [["policy", "recall", "mean depth", "gap", "margin", "flat_spread", "base_k", "flat_k"]]
+    for label, policy in (("fixed", DepthPolicy.fixed()), ("default", base), ("calibrated", best)):
+        r = result if policy is best else evaluate(policy, samples)
+        table.append([label, f"{r['recall']:.3f}", f"{r['mean_depth']:.2f}", policy.gap, policy.margin,
+                      policy.flat_spread, policy.base_k, policy.flat_k])
+    print(format_table(table))
+
+    if args.out:
+        save_depth_policy(best, args.out)
+        print(f"saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# bench/startup.py
+"""
+시작 시간 / 첫 요청 지연시간 벤치마크.
+
+새 프로세스에서 main을 import하고 FastAPI lifespan(warm-up)을 실행한 뒤 /chat 처리 함수를 두 번 호출해
+다음을 잰다 (각 실행은 독립된 콜드 스타트):
+- process: 인터프리터 시작 ~ 첫 응답 완료 (부모 프로세스 기준 벽시계)
+- import: import main
+- warmup: lifespan 시작 구간
+- first / second: 첫 요청 / 두 번째 요청 처리 시간 (first - second ≈ 첫 요청이 떠안는 초기화 비용)
+
+warm-up 켜짐/꺼짐(WARMUP_ENABLED=false)을 함께 측정하고, --max-startup-s / --max-first-request-ms 상한을
+넘으면 종료 코드 1로 끝난다 (CI에서 회귀 감지용).
+--fake: 가짜 LLM/임베딩/인메모리 벡터 스토어로 외부 서비스 없이 측정 (우리 코드의 import/초기화 비용만).
+
+사용 예:
+    python -m bench.startup --fake --runs 3
+    python -m bench.startup --runs 5 --max-startup-s 8 --max-first-request-ms 3000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from bench.stats import summarize, format_table
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_QUESTION = "2025학년도 2학기 국가장학금 신청 기간"
+
+
+# ========== 자식 프로세스 (1회 콜드 스타트) ==========
+
+async def _child(fake: bool) -> Dict[str, float]:
+    result: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    import main
+    result["import"] = time.perf_counter() - t0
+
+    if fake:
+        from bench.replay import install_fake_backends, parse_args as replay_args
+        install_fake_backends(replay_args(["-", "--chat-latency-ms", "0", "--small-latency-ms", "0",
+                                           "--embed-latency-ms", "0", "--jitter-ms", "0", "--retry-rate", "0"]))
+
+    from models import ChatRequest
+
+    t0 = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        result["warmup"] = time.perf_counter() - t0
+        for label in ("first", "second"):
+            t0 = time.perf_counter()
+            await main._chat(ChatRequest(question=_QUESTION, conversation_id=f"startup-{label}"))
+            result[label] = time.perf_counter() - t0
+    return result
+
+
+# ========== 부모 프로세스 ==========
+
+def _run_once(fake: bool, warmup: bool) -> Dict[str, float]:
+    if fake:
+        from bench.fakes import ensure_offline_env
+        ensure_offline_env()
+    env = dict(os.environ, WARMUP_ENABLED="true" if warmup else "false",
+               PYTHONPATH=_REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    cmd = [sys.executable, "-m", "bench.startup", "--child"] + (["--fake"] if fake else [])
+
+    # chat_logs.jsonl이 작업 디렉터리에 쌓이지 않도록 임시 디렉터리에서 실행
+    with tempfile.TemporaryDirectory() as cwd:
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup child failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process"] = wall
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="시작 시간 / 첫 요청 지연시간 벤치마크")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--fake", action="store_true", help="가짜 백엔드로 외부 서비스 없이 측정")
+    p.add_argument("--max-startup-s", type=float, help="warm-up 켜짐: import+warmup 상한(초)")
+    p.add_argument("--max-first-request-ms", type=float, help="warm-up 켜짐: 첫 요청 상한(ms)")
+    p.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.fake))))
+        return
+
+    runs: Dict[str, List[Dict[str, Any]]] = {"warmup": [], "lazy": []}
+    for _ in range(args.runs):
+        runs["warmup"].append(_run_once(args.fake, warmup=True))
+        runs["lazy"].append(_run_once(args.fake, warmup=False))
+
+    table = [["mode", "metric", "p50 ms", "max ms"]]
+    for mode, results in runs.items():
+        for metric in ("process", "import", "warmup", "first", "second"):
+            s = summarize([r[metric] * 1000 for r in results])
+            table.append([mode, metric, f"{s['p50']:.0f}", f"{s['max']:.0f}"])
+    print(format_table(table))
+
+    warm = runs["warmup"]
+    startup = max(r["import"] + r["warmup"] for r in warm)
+    first_ms = max(r["first"] for r in warm) * 1000
+    failed = []
+    if args.max_startup_s is not None and startup > args.max_startup_s:
+        failed.append(f"startup {startup:.2f}s > {args.max_startup_s}s")
+    if args.max_first_request_ms is not None and first_ms > args.max_first_request_ms:
+        failed.append(f"first request {first_ms:.0f}ms > {args.max_first_request_ms}ms")
+    if failed:
+        print("FAILED: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
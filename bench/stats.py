@@ -0,0 +1,46 @@
+# bench/stats.py
+"""벤치마크 결과 집계 헬퍼."""
+import math
+from typing import Dict, Iterable, List
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """선형 보간 백분위수 (q: 0~100). 값이 없으면 NaN."""
+    data = sorted(values)
+    if not data:
+        return math.nan
+    if len(data) == 1:
+        return data[0]
+    pos = (len(data) - 1) * q / 100
+    lower = math.floor(pos)
+    upper = math.ceil(pos)
+    if lower == upper:
+        return data[lower]
+    return data[lower] + (data[upper] - data[lower]) * (pos - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """count / mean / p50 / p95 / p99 / max 요약."""
+    if not values:
+        return {"count": 0, "mean": math.nan, "p50": math.nan, "p95": math.nan, "p99": math.nan, "max": math.nan}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def format_table(rows: List[List[str]]) -> str:
+    """고정폭 텍스트 표."""
+    if not rows:
+        return ""
+    widths = [max(len(str(r[i])) for r in rows) for i in range(len(rows[0]))]
+    lines = []
+    for n, row in enumerate(rows):
+        lines.append("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+        if n == 0:
+            lines.append("  ".join("-" * w for w in widths))
+    return "\n".join(lines)
@@ -0,0 +1,67 @@
+# bench/validation_skip.py
+"""
+검증 생략 임계값 오프라인 평가.
+
+chat_logs.jsonl의 validation.trail(시도별 답변 신뢰도와 validate 판정)로, 신뢰도 임계값마다
+- skip share: 검증을 생략하게 되는 답변 비율 (validate 호출이 줄어드는 비율)
+- missed retry: 생략한 답변 중 validate가 RETRY를 냈을 비율 (놓치는 재시도)
+를 계산한다. 판정이 있는 시도만 쓰므로, 보정용 로그는 VALIDATION_FAST_PATH=false(모든 답변 검증)로
+모으거나 운영 중 sample 검증(rag_validation_shadow_total)과 함께 본다.
+
+사용 예:
+    python -m bench.validation_skip chat_logs.jsonl
+    python -m bench.validation_skip chat_logs.jsonl --thresholds 0.6,0.7,0.75,0.8,0.9 --max-missed 0.02
+"""
+import argparse
+import json
+from typing import List, Optional, Tuple
+
+from bench.stats import format_table
+
+
+def load_trail(path: str) -> List[Tuple[float, str]]:
+    """(신뢰도, validate 판정) 목록 (판정이 없는 시도는 제외)."""
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            for step in (rec.get("validation") or {}).get("trail") or []:
+                if step.get("decision") and step.get("confidence") is not None:
+                    samples.append((step["confidence"], step["decision"]))
+    return samples
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="검증 생략 임계값 오프라인 평가")
+    p.add_argument("logs", help="chat_logs.jsonl")
+    p.add_argument("--thresholds", default="0.5,0.6,0.7,0.75,0.8,0.85,0.9,0.95")
+    p.add_argument("--max-missed", type=float, default=0.02, help="허용할 missed retry 비율 (추천 임계값 기준)")
+    args = p.parse_args(argv)
+
+    samples = load_trail(args.logs)
+    if not samples:
+        print("no validated answers with confidence in logs")
+        return
+    retries = sum(1 for _, d in samples if d == "RETRY")
+    print(f"validated answers: {len(samples)}, RETRY rate {retries / len(samples):.3f}")
+
+    table = [["threshold", "skip share", "missed retry", "retries kept"]]
+    recommended = None
+    for threshold in sorted(float(t) for t in args.thresholds.split(",")):
+        skipped = [d for c, d in samples if c >= threshold]
+        missed = sum(1 for d in skipped if d == "RETRY")
+        missed_rate = missed / len(skipped) if skipped else 0.0
+        kept = (retries - missed) / retries if retries else 1.0
+        table.append([f"{threshold:g}", f"{len(skipped) / len(samples):.3f}", f"{missed_rate:.3f}", f"{kept:.3f}"])
+        if recommended is None and missed_rate <= args.max_missed:
+            recommended = threshold
+    print(format_table(table))
+    if recommended is not None:
+        print(f"lowest threshold with missed retry <= {args.max_missed}: VALIDATION_SKIP_THRESHOLD={recommended:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# bench/vector_index.py
+"""
+인메모리 벡터 인덱스 검색 벤치마크.
+
+합성 코퍼스(공지별로 모인 군집 벡터)나 실제 PGVector 컬렉션을 VectorIndex에 올리고
+dtype(float32 / float16 / int8 / binary, 압축 형식은 재채점 포함)별 검색 지연시간과
+float32 정확 검색 대비 recall@k를 잰다.
+필터 검색(announcement_id $in, 기간 검색과 같은 형태)도 함께 측정한다.
+
+사용 예:
+    python -m bench.vector_index --chunks 30000 --dim 1536 --queries 200
+    python -m bench.vector_index --from-db --queries 200
+"""
+import argparse
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from bench.stats import summarize, format_table
+from services.vector_index_service import VectorIndex
+
+
+def synthetic_corpus(chunks: int, dim: int, per_notice: int, seed: int):
+    """(ids, contents, metadatas, embeddings). 같은 공지의 청크는 공지 중심 벡터 주변에 모인다."""
+    rng = np.random.default_rng(seed)
+    notices = max(1, chunks // per_notice)
+    centers = rng.standard_normal((notices, dim)).astype(np.float32)
+    owner = rng.integers(0, notices, size=chunks)
+    embeddings = centers[owner] + 0.6 * rng.standard_normal((chunks, dim)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(chunks)]
+    metadatas = [{"announcement_id": int(a), "chunk_index": i} for i, a in enumerate(owner)]
+    contents = [f"notice {a} chunk {i}" for i, a in enumerate(owner)]
+    return ids, contents, metadatas, embeddings, centers
+
+
+def _time_queries(index: VectorIndex, queries: np.ndarray, k: int, filters: List[Optional[dict]]) -> List[float]:
+    # 첫 호출(페이지 폴트, BLAS 초기화)은 제외
+    index.search(queries[0], k, filter=filters[0])
+    per_query = []
+    for q, f in zip(queries, filters):
+        t0 = time.perf_counter()
+        index.search(q, k, filter=f)
+        per_query.append((time.perf_counter() - t0) * 1000)
+    return per_query
+
+
+def _recall(index: VectorIndex, exact: VectorIndex, queries: np.ndarray, k: int) -> float:
+    hit = total = 0
+    for q in queries:
+        truth = {d.id for d, _ in exact.search(q, k)}
+        got = {d.id for d, _ in index.search(q, k)}
+        hit += len(truth & got)
+        total += len(truth)
+    return hit / total if total else float("nan")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="인메모리 벡터 인덱스 검색 벤치마크")
+    p.add_argument("--chunks", type=int, default=30000)
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--per-notice", type=int, default=8, help="합성 코퍼스의 공지당 청크 수")
+    p.add_argument("--from-db", action="store_true", help="설정의 PGVector 컬렉션을 그대로 적재")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--k", type=int, default=6)
+    p.add_argument("--filter-ids", type=int, default=20, help="필터 검색에서 $in으로 넘길 공지 수")
+    p.add_argument("--dtypes", default="float32,float16,int8,binary")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed + 1)
+    if args.from_db:
+        from app.settings import get_settings
+        from services.database_service import fetch_collection_embeddings
+        cfg = get_settings()
+        rows = fetch_collection_embeddings(cfg.collection_name)
+        exact = VectorIndex.from_rows(rows, dim=cfg.embed_dim)
+        corpus = None
+        # 코퍼스 청크를 약간 흔든 벡터를 질의로 사용
+        picks = rng.integers(0, len(exact), size=args.queries)
+        base = np.concatenate([s.matrix for s in exact._segments])
+        queries = base[picks] + 0.05 * rng.standard_normal((args.queries, cfg.embed_dim)).astype(np.float32)
+        ann_ids = sorted({int(a) for a in exact._announcement_ids if a >= 0})
+    else:
+        ids, contents, metadatas, embeddings, centers = synthetic_corpus(
+            args.chunks, args.dim, args.per_notice, args.seed
+        )
+        corpus = (ids, contents, metadatas, embeddings)
+        exact = VectorIndex(dim=args.dim)
+        exact.add(*corpus)
+        picks = rng.integers(0, len(centers), size=args.queries)
+        queries = centers[picks] + 0.3 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+        ann_ids = list(range(len(centers)))
+
+    filters = [
+        {"announcement_id": {"$in": [int(a) for a in rng.choice(ann_ids, size=min(args.filter_ids, len(ann_ids)), replace=False)]}}
+        for _ in range(args.queries)
+    ]
+
+    table = [["dtype", "chunks", "MB", "p50 ms", "p95 ms", "filtered p50", "filtered p95", f"recall@{args.k}"]]
+    for dtype in args.dtypes.split(","):
+        if dtype == "float32":
+            index = exact
+        elif corpus is not None:
+            index = VectorIndex(dim=args.dim, dtype=dtype)
+            index.add(*corpus)
+        else:
+            index = VectorIndex.from_rows(rows, dim=exact.dim, dtype=dtype)
+
+        plain = summarize(_time_queries(index, queries, args.k, [None] * len(queries)))
+        filtered = summarize(_time_queries(index, queries, args.k, filters))
+        size_mb = sum(s.matrix.nbytes for s in index._segments) / 1e6
+        table.append([
+            dtype, len(index), f"{size_mb:.0f}",
+            f"{plain['p50']:.2f}", f"{plain['p95']:.2f}",
+            f"{filtered['p50']:.2f}", f"{filtered['p95']:.2f}",
+            f"{_recall(index, exact, queries, args.k):.3f}",
+        ])
+    print(format_table(table))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,81 @@
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import HumanMessage
 
 from chat.schema import RAGState
+from chat.nodes.compact import compact_node
 from chat.nodes.guardrail import guardrail_node
 from chat.nodes.rewrite import rewrite_node
 from chat.nodes.retrieve import retrieve_node
 from chat.nodes.generate import generate_node
+from chat.nodes.confidence import confidence_node
 from chat.nodes.validate import validate_node
 from chat.nodes.refine_query import refine_query_node
+from services.admission_service import should_skip_optional
+from services.retriever_service import cancel_query_embedding_prefetch
+from services.metrics_service import instrument_node
 
 graph = StateGraph(RAGState)
 
-graph.add_node("guardrail", guardrail_node)
-graph.add_node("rewrite", rewrite_node)
-graph.add_node("retrieve", retrieve_node)
-graph.add_node("generate", generate_node)
-graph.add_node("validate", validate_node)
-graph.add_node("refine_query", refine_query_node)
+graph.add_node("compact", instrument_node("compact", compact_node))
+graph.add_node("guardrail", instrument_node("guardrail", guardrail_node))
+graph.add_node("rewrite", instrument_node("rewrite", rewrite_node))
+graph.add_node("retrieve", instrument_node("retrieve", retrieve_node))
+graph.add_node("generate", instrument_node("generate", generate_node))
+graph.add_node("confidence", instrument_node("confidence", confidence_node))
+graph.add_node("validate", instrument_node("validate", validate_node))
+graph.add_node("refine_query", instrument_node("refine_query", refine_query_node))
 
-graph.add_edge(START, "guardrail")
+# 가드레일과 재작성은 서로 의존하지 않으므로 병렬 실행하고, 둘 다 끝나면 gate에서 판정을 본다.
+# (차단될 질문에도 재작성 호출이 나가지만, 대부분의 PASS 요청에서 소형 LLM 왕복 하나가 줄어든다)
+async def gate_node(state: RAGState) -> dict:
+    if state.guardrail and state.guardrail.policy == "BLOCK" and state.rewrite:
+        # 차단된 질문의 검색 임베딩은 쓰지 않으므로 아직 진행 중이면 취소
+        cancel_query_embedding_prefetch(state.rewrite.query)
+    return {}
+
+graph.add_node("gate", gate_node)
+
+# 대화 기록은 턴마다 한 번 압축해 가드레일/재작성/생성이 공유한다 (LLM 호출 없음)
+graph.add_edge(START, "compact")
+graph.add_edge("compact", "guardrail")
+graph.add_edge("compact", "rewrite")
+graph.add_edge(["guardrail", "rewrite"], "gate")
 
 def guardrail_router(state: RAGState):
     if state.guardrail and state.guardrail.policy == "BLOCK":
         return END
-    return "rewrite"
+    return "retrieve"
 
-graph.add_conditional_edges("guardrail", guardrail_router, ["rewrite", END])
-graph.add_edge("rewrite", "retrieve")
-graph.add_edge("retrieve", "generate")
-graph.add_edge("generate", "validate")
+graph.add_conditional_edges("gate", guardrail_router, ["retrieve", END])
+
+def retrieve_router(state: RAGState):
+    # 재시도에서 새 문서를 하나도 찾지 못하면 같은 답변/검증을 반복하지 않고 종료
+    if state.attempt > 0 and state.new_doc_count == 0:
+        return END
+    return "generate"
+
+graph.add_conditional_edges("retrieve", retrieve_router, ["generate", END])
+graph.add_edge("generate", "confidence")
+
+def confidence_router(state: RAGState):
+    # 신뢰도가 높은 답변은 검증(소형 LLM 호출)을 건너뛰고 바로 응답 (sample은 응답 후 백그라운드 검증)
+    if state.validation_mode == "full":
+        return "validate"
+    return END
+
+graph.add_conditional_edges("confidence", confidence_router, ["validate", END])
 
 def validate_router(state: RAGState, config: RunnableConfig):
     max_retries = config.get("configurable", {}).get("max_retries", 3)
-    
+
+    # 기간 조건 질문은 기간 인덱스로 후보를 확정했으므로 질의를 바꿔 재검색하지 않는다
+    if state.temporal_ids:
+        return END
+    # 과부하이거나 마감이 가까우면 재검색하지 않고 현재 답변으로 응답
+    if should_skip_optional(config):
+        return END
     if state.validation and state.validation.decision == "RETRY" and state.attempt < max_retries:
         return "refine_query"
     return END
@@ -42,3 +84,29 @@ graph.add_conditional_edges("validate", validate_router, ["refine_query", END])
 graph.add_edge("refine_query", "retrieve")
 
 app = graph.compile(checkpointer=MemorySaver())
+
+
+def build_turn_input(question: str) -> dict:
+    """
+    한 턴의 그래프 입력. 체크포인트에 남은 이전 턴의 상태(docs, attempt 등)를 초기화한다.
+    (messages와 history_summary는 대화 기록이므로 유지)
+    """
+    return {
+        "messages": [HumanMessage(content=question)],
+        "chat_history": "",
+        "docs": [],
+        "answer": None,
+        "rewrite": None,
+        "validation": None,
+        "guardrail": None,
+        "attempt": 0,
+        "embedded_query": None,
+        "retrieved_k": 0,
+        "new_doc_count": 0,
+        "temporal_ids": [],
+        "candidate_distances": [],
+        "depth": 0,
+        "depth_reason": None,
+        "confidence": None,
+        "validation_mode": None,
+    }
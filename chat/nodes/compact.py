@@ -0,0 +1,30 @@
+import logging
+from langchain_core.messages import RemoveMessage
+from app.deps import get_settings
+from chat.schema import RAGState
+from services.history_service import fold_summary, format_history
+
+logger = logging.getLogger(__name__)
+
+def compact_node(state: RAGState) -> dict:
+    """
+    턴마다 한 번 대화 기록을 압축해 가드레일/재작성/생성이 같은 chat_history를 쓰게 한다.
+    최근 history_recent_messages개보다 오래된 메시지는 요약으로 접고 messages에서도 지운다.
+    """
+    cfg = get_settings()
+    # 마지막 메시지는 이번 질문
+    history = state.messages[:-1]
+    keep = max(0, cfg.history_recent_messages)
+    split = max(0, len(history) - keep)
+    old, recent = history[:split], history[split:]
+
+    summary = state.history_summary
+    result = {}
+    if old:
+        summary = fold_summary(summary, old, cfg.history_summary_tokens)
+        result["history_summary"] = summary
+        result["messages"] = [RemoveMessage(id=m.id) for m in old]
+        logger.info(f"Compacted {len(old)} messages into history summary")
+
+    result["chat_history"] = format_history(summary, recent, cfg.history_answer_tokens)
+    return result
@@ -0,0 +1,39 @@
+import logging
+from langchain_core.runnables import RunnableConfig
+from app.deps import get_settings
+from chat.schema import RAGState
+from services.admission_service import should_skip_optional
+from services.confidence_service import choose_validation_mode, score_confidence
+from services.metrics_service import ANSWER_CONFIDENCE, VALIDATION_MODE
+
+logger = logging.getLogger(__name__)
+
+def confidence_node(state: RAGState, config: RunnableConfig) -> dict:
+    """검색 점수 / 답변-근거 겹침 / 답변 불가 문구로 validate 실행 방식을 정한다 (LLM 호출 없음)."""
+    cfg = get_settings()
+    max_retries = config.get("configurable", {}).get("max_retries", 3)
+
+    confidence = score_confidence(state.answer, state.docs)
+    ANSWER_CONFIDENCE.observe(confidence.score)
+
+    # 기간 조건 질문이거나 재시도 한도에 닿았으면 검증 결과와 무관하게 종료하므로 응답 전에 검증할 이유가 없다
+    can_retry = not state.temporal_ids and state.attempt < max_retries
+    if should_skip_optional(config):
+        # 과부하(degraded) 또는 마감 임박: 응답을 우선한다
+        mode = "skip"
+    elif not cfg.validation_fast_path:
+        mode = "full"
+    else:
+        score = confidence.score if can_retry else 1.0
+        mode = choose_validation_mode(score, cfg.validation_skip_threshold, cfg.validation_sample_rate)
+    VALIDATION_MODE.labels(mode=mode).inc()
+
+    logger.info(
+        f"Answer confidence {confidence.score:.2f} (distance={confidence.best_distance}, "
+        f"overlap={confidence.overlap:.2f}, refusal={confidence.refusal}) → validation {mode}"
+    )
+    result = {"confidence": confidence.score, "validation_mode": mode}
+    if mode != "full":
+        # 이전 시도의 검증 결과가 이번 답변의 판정으로 남지 않게
+        result["validation"] = None
+    return result
@@ -1,9 +1,13 @@
+import asyncio
 from typing import List
 from langchain_core.documents import Document
 from langchain_core.runnables import RunnableConfig
 from langchain_core.prompts import ChatPromptTemplate
-from app.deps import get_chat_llm
+from app.deps import get_chat_llm, get_settings
+from chat.prompts import prompt_cache_kwargs
 from chat.schema import RAGState
+from services.admission_service import call_timeout
+from services.context_service import pack_context
 
 GEN_SYS = """당신은 서울시립대학교 공지사항 Q&A 도우미입니다.
 
@@ -16,46 +20,45 @@ GEN_SYS = """당신은 서울시립대학교 공지사항 Q&A 도우미입니다
 6. 질문에 직접적인 답만 포함하세요. 인사말, 마무리 멘트, 잡담은 포함하지 마세요.
 """
 
-GEN_USER_TMPL = """이전 대화:
+# 여러 요청/재시도가 공유하는 참고 공지를 먼저, 요청마다 바뀌는 대화 기록과 질문은 뒤에 (prompts.py 참고)
+GEN_USER_TMPL = """참고할 공지:
+{context}
+
+이전 대화:
 {chat_history}
 
 질문: {question}
 
 재작성된 질의: {rewrite_result}
 
-참고할 공지:
-{context}
-
 이 질문에 대해 정확한 답변을 작성하세요."""
 
 gen_prompt = ChatPromptTemplate.from_messages([("system", GEN_SYS), ("user", GEN_USER_TMPL)])
 
 def format_context(docs: List[Document]) -> str:
-    lines = []
-    for d in docs:
-        md = d.metadata or {}
-        lines.append(
-            f"  Doc Id: {md.get('announcement_id')}\n"
-            f"  Doc: {d.page_content}"
-        )
-    return "\n".join(lines)
+    """공지별로 청크를 병합해 토큰 예산(context_token_budget) 안에 맞춘 컨텍스트."""
+    return pack_context(docs, get_settings().context_token_budget)
 
 async def generate_node(state: RAGState, config: RunnableConfig) -> dict:
     context = format_context(state.docs)
 
     question = state.question
 
-    messages = state.messages
-    history_msgs = messages[:-1]
-    history_str = "\n".join([f"- {m.type}: {m.content}" for m in history_msgs[-6:]])
+    # compact 노드가 턴마다 한 번 만든 요약 + 최근 대화
+    history_str = state.chat_history
 
     msgs = gen_prompt.format_messages(
         question=question,
         chat_history=history_str,
-        rewrite_result=state.rewrite or {},
+        rewrite_result=state.rewrite.query if state.rewrite else "",
         context=context,
     )
 
-    out = await get_chat_llm().ainvoke(msgs, config=config)
+    cfg = get_settings()
+    # 요청 마감까지 남은 시간을 넘기지 않도록 (넘으면 TimeoutError → /chat 504)
+    out = await asyncio.wait_for(
+        get_chat_llm().ainvoke(msgs, config=config, **prompt_cache_kwargs("generate", cfg.chat_model_provider)),
+        timeout=call_timeout(config, cfg.llm_timeout),
+    )
 
     return {"messages": [out], "answer": out.content}
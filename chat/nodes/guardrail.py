@@ -1,9 +1,12 @@
 
+import asyncio
 import logging
 from langchain_core.runnables import RunnableConfig
 from langchain_core.prompts import ChatPromptTemplate
-from app.deps import get_small_llm
+from app.deps import get_small_llm, get_settings
+from chat.prompts import prompt_cache_kwargs
 from chat.schema import RAGState, GuardrailResult
+from services.admission_service import call_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +29,28 @@ guard_prompt = ChatPromptTemplate.from_messages(
     template_format="jinja2",
 )
 
-def guardrail_node(state: RAGState, config: RunnableConfig) -> dict:
+async def guardrail_node(state: RAGState, config: RunnableConfig) -> dict:
     # Messages
     messages = state.messages
     question = messages[-1].content if messages else ""
     
-    # History (everything except the last message)
-    history_msgs = messages[:-1]
-    history_str = "\n".join([f"- {m.type}: {m.content}" for m in history_msgs[-6:]])
+    # History: compact 노드가 턴마다 한 번 만든 요약 + 최근 대화
+    history_str = state.chat_history
 
     msgs = guard_prompt.format_messages(
         question=question,
         chat_history=history_str
     )
 
-    structured_llm = get_small_llm().with_structured_output(GuardrailResult)
+    cfg = get_settings()
+    structured_llm = get_small_llm().with_structured_output(
+        GuardrailResult, **prompt_cache_kwargs("guardrail", cfg.small_model_provider)
+    )
 
-    result: GuardrailResult = structured_llm.invoke(msgs, config=config)
+    result: GuardrailResult = await asyncio.wait_for(
+        structured_llm.ainvoke(msgs, config=config),
+        timeout=call_timeout(config, cfg.small_llm_timeout),
+    )
     
     return {
         "guardrail": result,
@@ -1,11 +1,17 @@
 
 import logging
 from chat.schema import RAGState, RewriteResult
+from services.metrics_service import RETRY_LOOPS
 
 logger = logging.getLogger(__name__)
 
 def refine_query_node(state: RAGState) -> dict:
-    query = f"{state.question} | {state.rewrite.query} | {state.validation.critic_query}"
+    RETRY_LOOPS.inc()
+
+    # 질의를 이어붙이지 않고 교체한다. critic_query가 없으면 같은 질의(임베딩 재사용)로 더 깊이 검색.
+    query = state.rewrite.query
+    if state.validation and state.validation.critic_query:
+        query = state.validation.critic_query.strip() or query
 
     return {
         "rewrite": RewriteResult(query=query),
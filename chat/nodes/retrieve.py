@@ -1,20 +1,101 @@
+import asyncio
 import logging
-from services.retriever_service import retriever_search
+from typing import List
+from langchain_core.documents import Document
+from services.retriever_service import embed_query, period_search, retriever_search_by_vector
+from services.retrieval_depth_service import choose_depth, get_depth_policy
+from services.temporal_service import parse_temporal_intent
 from chat.schema import RAGState
+from services.metrics_service import RETRIEVAL_CANDIDATES, RETRIEVAL_DEPTH
 
 logger = logging.getLogger(__name__)
 
-BASE_K = 6
-K_STEP = 4
-K_MAX = 20
+
+def doc_key(doc: Document) -> tuple:
+    """청크 식별 키 (announcement_id, chunk_index). 메타데이터가 없으면 본문으로 구분."""
+    md = doc.metadata or {}
+    if md.get("announcement_id") is not None and md.get("chunk_index") is not None:
+        return md["announcement_id"], md["chunk_index"]
+    return None, doc.page_content
+
+
+def merge_docs(previous: List[Document], candidates: List[Document], limit: int) -> List[Document]:
+    """이전 시도의 문서를 유지하고, 처음 보는 후보만 limit까지 뒤에 덧붙인다."""
+    merged = list(previous)
+    seen = {doc_key(d) for d in previous}
+    for doc in candidates:
+        if len(merged) >= limit:
+            break
+        key = doc_key(doc)
+        if key not in seen:
+            seen.add(key)
+            merged.append(doc)
+    return merged
+
 
 async def retrieve_node(state: RAGState) -> dict:
     query = state.question
     if state.rewrite and state.rewrite.query:
         query = state.rewrite.query
 
-    k = min(BASE_K + state.attempt * K_STEP, K_MAX)
+    policy = get_depth_policy()
+    # 임베딩은 체크포인트 상태에 두지 않고 질의 임베딩 LRU에서 다시 꺼낸다
+    embedding = await embed_query(query)
+    reuse = state.embedded_query == query
+    if reuse:
+        # 같은 질의로 재시도: 이미 쓴 후보 다음 순위까지만 더 가져온다
+        k = min(state.retrieved_k + policy.step, policy.max_k)
+    else:
+        # 새 질의: 후보를 넉넉히 가져와 거리 분포로 남길 청크 수를 정한다
+        k = policy.fetch_k
+
+    # 첫 시도에서 신청/마감 기간을 묻는 질문이면 기간 인덱스 검색을 벡터 검색과 함께 실행
+    intent = parse_temporal_intent(state.question) if state.attempt == 0 else None
+
+    async def vector_candidates() -> List[Document]:
+        # 같은 질의로 이미 max_k까지 가져왔다면 더 볼 후보가 없다
+        if reuse and k <= state.retrieved_k:
+            return []
+        return await retriever_search_by_vector(embedding, k)
+
+    temporal_ids: List[int] = []
+    if intent:
+        (temporal_ids, period_docs), candidates = await asyncio.gather(
+            period_search(intent, embedding, policy.base_k), vector_candidates()
+        )
+        logger.info(f"Temporal query ({intent.mode}, {intent.label}): {len(temporal_ids)} announcements")
+    else:
+        period_docs, candidates = [], await vector_candidates()
+
+    distances = [d.metadata.get("score") for d in candidates]
+    if reuse:
+        depth, reason = len(candidates), "retry"
+    else:
+        depth, reason = choose_depth(distances, policy)
+        candidates = candidates[:depth]
+    RETRIEVAL_DEPTH.labels(reason=reason).observe(depth)
+    # 기간 조건에 맞는 공지를 먼저, 그 다음 일반 벡터 검색 결과
+    candidates = period_docs + candidates
+    RETRIEVAL_CANDIDATES.observe(len(candidates))
+
+    previous = state.docs if state.attempt > 0 else []
+    docs = merge_docs(previous, candidates, policy.max_k)
+    new_doc_count = len(docs) - len(previous)
 
-    docs = await retriever_search(query, k)
+    if state.attempt > 0:
+        logger.info(f"Retry {state.attempt}: {new_doc_count} new docs (total {len(docs)})")
+    else:
+        logger.info(f"Retrieval depth {depth} ({reason}) of {len(distances)} candidates")
 
-    return {"docs": docs}
+    result = {
+        "docs": docs,
+        "embedded_query": query,
+        "retrieved_k": k if reuse else depth,
+        "new_doc_count": new_doc_count,
+    }
+    if state.attempt == 0:
+        result["temporal_ids"] = temporal_ids
+        result["candidate_distances"] = [d for d in distances if d is not None]
+        result["depth"] = depth
+        result["depth_reason"] = reason
+    return result
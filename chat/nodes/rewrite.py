@@ -1,8 +1,12 @@
+import asyncio
 import logging
 from langchain_core.runnables import RunnableConfig
 from langchain_core.prompts import ChatPromptTemplate
-from app.deps import get_small_llm
+from app.deps import get_small_llm, get_settings
+from chat.prompts import prompt_cache_kwargs
 from chat.schema import RAGState, RewriteResult
+from services.admission_service import call_timeout
+from services.retriever_service import prefetch_query_embedding
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +25,6 @@ REWRITE_SYS = """당신은 '대학 공지사항 RAG 시스템'을 위한 질의
 2. 대학/학사 맥락(학교명, 학년도, 학기, 전공/학부, 프로그램명 등)이 드러나면 검색 품질이 높아지므로, 질문에 언급된 정보는 가능한 한 유지·명시합니다.
 3. 모호한 대명사(이것, 저것, 거기, 그때 등)는 chat_history를 참고해 가능한 한 구체적인 명사(과목명, 프로그램명, 행사명 등)로 치환합니다.
 4. 새로운 사실을 지어내거나, 질문에 없는 구체적인 날짜·조건을 임의로 추가하지 않습니다.
-"""
-
-REWRITE_USER_TMPL = """대화 기록:
-{{ chat_history }}
-
-원 질문:
-{{ question }}
 
 지침:
 - 사용자의 질문과 이전 대화 맥락의 의미를 보존하면서, 공지 제목/검색어처럼 간결하게 재작성합니다.
@@ -39,26 +36,44 @@ REWRITE_USER_TMPL = """대화 기록:
  예: "2025학년도 2학기 시대튜터링 학습도우미 지원 자격 및 평점 기준 안내"
 """
 
+# 고정 지침은 모두 system에 두고, user에는 요청마다 바뀌는 대화 기록과 질문만 (prompts.py 참고)
+REWRITE_USER_TMPL = """대화 기록:
+{{ chat_history }}
+
+원 질문:
+{{ question }}
+"""
+
 rewrite_prompt = ChatPromptTemplate.from_messages(
     [("system", REWRITE_SYS), ("user", REWRITE_USER_TMPL)],
     template_format="jinja2",
 )
 
 
-def rewrite_node(state: RAGState, config: RunnableConfig) -> dict:
-    question = state.question
-
+async def rewrite_node(state: RAGState, config: RunnableConfig) -> dict:
+    # 가드레일과 병렬로 실행되므로 state.question 대신 마지막 메시지에서 직접 읽는다
     messages = state.messages
-    history_msgs = messages[:-1]
-    history_str = "\n".join([f"- {m.type}: {m.content}" for m in history_msgs[-6:]])
+    question = messages[-1].content if messages else ""
+
+    # compact 노드가 턴마다 한 번 만든 요약 + 최근 대화
+    history_str = state.chat_history
 
     msgs = rewrite_prompt.format_messages(
         question=question,
         chat_history=history_str
     )
 
-    structured_llm = get_small_llm().with_structured_output(RewriteResult)
+    cfg = get_settings()
+    structured_llm = get_small_llm().with_structured_output(
+        RewriteResult, **prompt_cache_kwargs("rewrite", cfg.small_model_provider)
+    )
+
+    result: RewriteResult = await asyncio.wait_for(
+        structured_llm.ainvoke(msgs, config=config),
+        timeout=call_timeout(config, cfg.small_llm_timeout),
+    )
 
-    result: RewriteResult = structured_llm.invoke(msgs, config=config)
+    # 가드레일 판정을 기다리는 동안 검색 질의 임베딩을 미리 시작
+    prefetch_query_embedding(result.query)
 
     return {"rewrite": result, "attempt": state.attempt}
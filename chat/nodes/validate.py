@@ -1,8 +1,13 @@
+import asyncio
 import logging
 from langchain_core.runnables import RunnableConfig
 from langchain_core.prompts import ChatPromptTemplate
-from app.deps import get_small_llm
+from app.deps import get_small_llm, get_settings
+from chat.prompts import prompt_cache_kwargs
 from chat.schema import RAGState, ValidateResult
+from services.admission_service import call_timeout
+from services.context_service import build_digest
+from services.metrics_service import LLMMetricsCallbackHandler, VALIDATION_SHADOW
 
 logger = logging.getLogger(__name__)
 
@@ -29,21 +34,44 @@ val_prompt = ChatPromptTemplate.from_messages(
     template_format="jinja2",
 )
 
-def validate_node(state: RAGState, config: RunnableConfig) -> dict:
-    page_contents = [ d.page_content for d in state.docs ]
-    docs_str = "\n".join([f"- {content}" for content in page_contents])
-    
+async def validate_node(state: RAGState, config: RunnableConfig) -> dict:
+    cfg = get_settings()
     question = state.question
     answer = state.answer
 
+    # 전체 본문 대신 질문/답변과 관련된 줄만 추린 요약을 보낸다
+    docs_str = build_digest(
+        state.docs,
+        cfg.validate_token_budget,
+        focus=f"{question}\n{answer or ''}",
+    )
+
     msgs = val_prompt.format_messages(
         question=question,
         answer=answer,
         docs=docs_str,
     )
 
-    structured_llm = get_small_llm().with_structured_output(ValidateResult)
+    structured_llm = get_small_llm().with_structured_output(
+        ValidateResult, **prompt_cache_kwargs("validate", cfg.small_model_provider)
+    )
 
-    result: ValidateResult = structured_llm.invoke(msgs, config=config)
+    # 비동기 호출이라 요청 마감/취소 시 검증도 함께 멈춘다
+    result: ValidateResult = await asyncio.wait_for(
+        structured_llm.ainvoke(msgs, config=config),
+        timeout=call_timeout(config, cfg.small_llm_timeout),
+    )
 
     return {"validation": result}
+
+
+async def shadow_validate(state: RAGState, request_id: str) -> None:
+    """검증을 생략한(sample) 답변을 응답 후 검증해 결과만 기록한다 (이미 보낸 답변은 바꾸지 않음)."""
+    config: RunnableConfig = {"callbacks": [LLMMetricsCallbackHandler(default_node="validate_shadow")]}
+    try:
+        result: ValidateResult = (await validate_node(state, config))["validation"]
+    except Exception as e:
+        logger.warning(f"Shadow validation failed for {request_id}: {e}")
+        return
+    VALIDATION_SHADOW.labels(decision=result.decision).inc()
+    logger.info(f"Shadow validation {request_id}: {result.decision} (confidence {state.confidence}) - {result.reason}")
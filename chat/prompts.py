@@ -0,0 +1,18 @@
+from typing import Any, Dict
+from app.deps import get_settings
+
+# 프롬프트 배치 규칙 (프로바이더 프롬프트 캐시는 요청 앞부분이 바이트 단위로 같아야 적중한다):
+# 1. system: 고정 지침만 (날짜/사용자 입력 등 바뀌는 값 금지)
+# 2. user: 여러 요청이 공유하는 큰 블록(참고 공지) → 대화 기록 → 이번 질문 순
+# 프롬프트 문구나 배치를 바꾸면 버전을 올린다 (캐시 키와 chat_logs에 기록되어 전후 비교 가능)
+PROMPT_VERSION = "2"
+
+
+def prompt_cache_kwargs(prompt_name: str, provider: str) -> Dict[str, Any]:
+    """
+    OpenAI prompt_cache_key (같은 프롬프트의 요청을 같은 캐시로 라우팅해 적중률을 높인다).
+    다른 프로바이더는 모르는 인자이므로 넘기지 않는다.
+    """
+    if provider != "openai" or not get_settings().prompt_cache_key_enabled:
+        return {}
+    return {"prompt_cache_key": f"campus-rag:{prompt_name}:v{PROMPT_VERSION}"}
@@ -21,6 +21,9 @@ class GuardrailResult(BaseModel):
 
 class RAGState(BaseModel):
     messages: Annotated[List[BaseMessage], add_messages] = Field(default_factory=list)
+    # 대화 기록 압축: 오래된 메시지의 누적 요약(턴을 넘어 유지)과 이번 턴 프롬프트용 대화 기록
+    history_summary: str = ""
+    chat_history: str = ""
     question: str = Field(default="", description="The current user question being processed")
     
     docs: List[Document] = Field(default_factory=list)
@@ -32,3 +35,21 @@ class RAGState(BaseModel):
     guardrail: Optional[GuardrailResult] = None
     
     attempt: int = 0
+
+    # 재시도 시 재사용하는 검색 상태
+    # 임베딩 벡터는 체크포인트에 남기지 않는다 (retriever_service의 질의 임베딩 LRU에서 재사용)
+    embedded_query: Optional[str] = Field(default=None, description="이전 검색에 쓴 질의")
+    retrieved_k: int = Field(default=0, description="embedded_query로 이미 가져온 후보 수")
+    new_doc_count: int = Field(default=0, description="이번 retrieve에서 새로 추가된 문서 수")
+
+    # 신청 기간 조건 질문이면 기간 인덱스로 찾은 공지 id (비어 있으면 일반 질문)
+    temporal_ids: List[int] = Field(default_factory=list)
+
+    # 첫 검색의 깊이 결정 (chat_logs 기록 / 정책 보정용)
+    candidate_distances: List[float] = Field(default_factory=list, description="첫 검색 후보의 코사인 거리 (오름차순)")
+    depth: int = Field(default=0, description="첫 검색에서 남긴 청크 수")
+    depth_reason: Optional[str] = None
+
+    # 답변 신뢰도와 검증 방식 (full / skip / sample)
+    confidence: Optional[float] = None
+    validation_mode: Optional[str] = None
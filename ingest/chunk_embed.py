@@ -1,10 +1,12 @@
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from app.settings import get_settings
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from .notice_chunker import chunk_notice_text
+
 cfg = get_settings()
 splitter = RecursiveCharacterTextSplitter(
     chunk_size=cfg.chunk_size,
@@ -29,23 +31,43 @@ def _build_enhanced_text(row: Dict) -> str:
     return "\n".join(parts)
 
 
-def build_documents_from_parsed(parsed_rows: List[Dict]) -> List[Document]:
+def split_row(row: Dict, chunker: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    row를 (source, 청크 텍스트) 목록으로 분할.
+    - notice: 본문과 OCR 텍스트를 따로 구조 기반 분할 (청크가 두 출처에 걸치지 않음)
+    - recursive: 본문+OCR을 이어붙여 RecursiveCharacterTextSplitter로 분할 (이전 방식)
+    """
+    chunker = chunker or cfg.chunker
+    if chunker == "recursive":
+        return [("mixed", c) for c in splitter.split_text(_build_enhanced_text(row))]
+
+    chunks = []
+    for source, key in (("body", "cleaned_text"), ("ocr", "ocr_text")):
+        if row.get(key):
+            chunks.extend((source, c) for c in chunk_notice_text(row[key], cfg.chunk_tokens))
+    return chunks
+
+
+def build_documents_for_row(row: Dict) -> List[Document]:
+    """단일 row 청킹 (프로세스 풀 작업 단위)."""
+    return build_documents_from_parsed([row])
+
+
+def build_documents_from_parsed(parsed_rows: List[Dict], chunker: Optional[str] = None) -> List[Document]:
     docs = []
 
     for row in parsed_rows:
         try:
-            # 텍스트 증강
-            enhanced_text = _build_enhanced_text(row)
-
             # 청킹
-            text_chunks = splitter.split_text(enhanced_text)
+            text_chunks = split_row(row, chunker)
 
-            for i, chunk_text in enumerate(text_chunks):
+            for i, (source, chunk_text) in enumerate(text_chunks):
                 # 메타데이터 구성
                 page_content = row["title"] + "\n" + chunk_text
                 metadata = {
                     "announcement_id": row["announcement_id"],
                     "chunk_index": i,
+                    "source": source,
                     "title": row["title"],
                     "written_at": row["written_at"].isoformat() if row.get("written_at") else None,
 
@@ -4,12 +4,13 @@ from typing import List
 
 from sqlalchemy import RowMapping
 
-from .chunk_embed import build_documents_from_parsed
+from .chunk_embed import build_documents_for_row
 from services.database_service import (
     fetch_parsed_records_by_ids,
     fetch_parsed_records_by_date_range
 )
 from services.embed_service import embed_and_store_documents
+from services.cpu_pool_service import map_in_pool
 
 
 
@@ -21,7 +22,9 @@ load_dotenv()
 async def _ingest_parsed_rows(rows: List[RowMapping]) -> dict:
     logger.info(f"Processing {len(rows)} parsed announcements for embedding...")
 
-    docs = build_documents_from_parsed(rows)
+    # 청킹은 CPU 바운드이므로 프로세스 풀에서 배치로 실행 (RowMapping은 dict로 변환해 전달)
+    per_row = await map_in_pool(build_documents_for_row, [dict(row) for row in rows])
+    docs = [doc for row_docs in per_row for doc in row_docs]
     logger.info(f"Generated {len(docs)} document chunks from {len(rows)} announcements")
 
     await embed_and_store_documents(
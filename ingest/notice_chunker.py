@@ -0,0 +1,133 @@
+# ingest/notice_chunker.py
+"""
+공지사항 구조 기반 청커.
+
+get_plain_text가 정규화한 텍스트는 한 줄에 하나의 항목("항목: 값"), 번호/기호로 시작하는
+섹션 줄로 이루어져 있다. 이 구조를 블록 단위로 묶은 뒤 토큰 예산까지 채워 청크를 만든다.
+- 블록(섹션 + 그 아래 항목들)은 가능한 한 쪼개지 않는다.
+- 예산을 넘는 블록만 줄 → 문장 → 토큰 순으로 나누고, 이어지는 조각 앞에 섹션 제목을 붙인다.
+- 구조 경계에서 자르므로 overlap을 두지 않는다.
+"""
+import re
+from typing import List
+
+from services.token_service import count_tokens, truncate_tokens
+
+__all__ = ["chunk_notice_text"]
+
+# 번호/기호 섹션 시작: "1.", "2)", "(3)", "가.", "①", "■", "※", "-" 등
+_SECTION_START = re.compile(
+    r"^(?:\d{1,2}[.)]\s|\(\d{1,2}\)|[가-하][.)]\s|[①-⑳]|[■□◆◇●○▶▷※★☞◎•·]|-\s|\[[^\]]{1,30}\]|<[^>]{1,30}>)"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|(?<=다\.)")
+# 이어지는 조각 앞에 붙이는 섹션 제목의 최대 길이
+_HEADING_TOKENS = 32
+
+
+def _blocks(text: str) -> List[List[str]]:
+    """섹션 시작 줄마다 새 블록을 연다. 섹션 표시가 없는 줄은 직전 블록에 이어 붙는다."""
+    blocks: List[List[str]] = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if not blocks or _SECTION_START.match(line):
+            blocks.append([line])
+        else:
+            blocks[-1].append(line)
+    return blocks
+
+
+def _split_long_line(line: str, max_tokens: int) -> List[str]:
+    """한 줄이 예산을 넘으면 문장 단위로, 그래도 넘으면 토큰 단위로 자른다."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(line):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        candidate = f"{current} {sentence}".strip()
+        if count_tokens(candidate) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        while count_tokens(sentence) > max_tokens:
+            head = truncate_tokens(sentence, max_tokens)
+            if not head:
+                break
+            pieces.append(head)
+            sentence = sentence[len(head):].strip()
+        current = sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_block(lines: List[str], max_tokens: int) -> List[str]:
+    """
+    예산을 넘는 블록을 줄 경계로 나누고, 두 번째 조각부터 섹션 제목을 앞에 붙인다.
+    어느 조각에 제목이 붙을지 미리 알 수 없으므로 처음부터 제목 몫을 뺀 예산으로 나눈다.
+    """
+    heading = truncate_tokens(lines[0], min(_HEADING_TOKENS, max_tokens // 4))
+    heading_tokens = count_tokens(heading) + 1
+    budget = max(1, max_tokens - heading_tokens)
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in lines:
+        for part in _split_long_line(line, budget) if count_tokens(line) > budget else [line]:
+            part_tokens = count_tokens(part) + 1
+            if current and current_tokens + part_tokens > budget:
+                pieces.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        pieces.append("\n".join(current))
+    if len(pieces) > 1 and pieces[0] == lines[0]:
+        # 제목 줄만 남은 첫 조각은 따로 두지 않는다 (이어지는 조각마다 제목이 붙으므로)
+        return [f"{heading}\n{p}" for p in pieces[1:]]
+    return [pieces[0]] + [f"{heading}\n{p}" for p in pieces[1:]]
+
+
+def _enforce_limit(chunk: str, max_tokens: int) -> List[str]:
+    """줄 단위 토큰 합으로 센 예산이 실제 토큰 수와 어긋나 넘친 청크는 토큰 단위로 다시 자른다."""
+    pieces: List[str] = []
+    while count_tokens(chunk) > max_tokens:
+        head = truncate_tokens(chunk, max_tokens)
+        if not head:
+            break
+        pieces.append(head)
+        chunk = chunk[len(head):].strip()
+    if chunk:
+        pieces.append(chunk)
+    return pieces
+
+
+def chunk_notice_text(text: str, max_tokens: int) -> List[str]:
+    """구조 블록을 max_tokens까지 채워 청크 목록을 만든다."""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n".join(current))
+        current, current_tokens = [], 0
+
+    for lines in _blocks(text or ""):
+        block = "\n".join(lines)
+        block_tokens = count_tokens(block) + 1
+        if block_tokens > max_tokens:
+            flush()
+            chunks.extend(_split_block(lines, max_tokens))
+            continue
+        if current_tokens + block_tokens > max_tokens:
+            flush()
+        current.append(block)
+        current_tokens += block_tokens
+    flush()
+    # 모든 청크가 max_tokens 이하인지 확인 (임베딩 입력 한도)
+    return [piece for chunk in chunks for piece in _enforce_limit(chunk, max_tokens)]
@@ -1,24 +1,59 @@
+import asyncio
 import logging
 import json
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from ingest import ingest_by_ids, ingest_by_date_range
 from parse import process_announcements_by_ids, process_announcements_by_date_range
 from models import IngestByIdsRequest, IngestByDateRangeRequest, ChatRequest, ChatResponse
-from chat.chat_graph import app as chat_graph_app
+from chat.chat_graph import app as chat_graph_app, build_turn_input
 from chat.schema import RAGState
+from chat.nodes.validate import shadow_validate
+from chat.prompts import PROMPT_VERSION
 from fastapi import Depends
 from services.ocr.base import BaseOCRService
 from app.deps import get_ocr_service_provider
+from app.settings import get_settings
+from app.warmup import warm_up
+from services.image_download_service import close_http_session
+from services.cpu_pool_service import shutdown_process_pool
+from services.database_service import ensure_period_index
+from services.admission_service import Overloaded, get_admission_controller
 from langchain_core.callbacks import UsageMetadataCallbackHandler
-from langchain_core.messages import HumanMessage
+from services.metrics_service import (
+    CHAT_LATENCY,
+    REQUEST_ATTEMPTS,
+    LLMMetricsCallbackHandler,
+    CONTENT_TYPE_LATEST,
+    observe_latency,
+    render_metrics,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 개발 환경 전용 DDL (production은 배포 시 준비, pgvector 확장 생성과 같은 규칙)
+    if get_settings().app_env != "production":
+        try:
+            await asyncio.to_thread(ensure_period_index)
+        except Exception as e:
+            logger.warning(f"Period index creation failed: {e}")
+    # 시작: 풀/클라이언트를 병렬로 미리 준비해 첫 요청이 초기화 비용을 떠안지 않게 한다
+    if get_settings().warmup_enabled:
+        await warm_up()
+    yield
+    # 종료
+    await close_http_session()
+    shutdown_process_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.post("/ingest")
@@ -109,39 +144,84 @@ async def parse_announcements_by_date(
         return {"error": str(e), "success": False}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """RAG 기반 캠퍼스 공지사항 챗봇 API"""
+    # 마감 시각은 도착 시점 기준 (대기열 대기 시간도 예산에 포함)
+    deadline = time.monotonic() + get_settings().chat_deadline_seconds
+    with observe_latency(CHAT_LATENCY):
+        try:
+            async with get_admission_controller().admit(deadline) as admission:
+                return await asyncio.wait_for(
+                    _chat(request, deadline=deadline, degraded=admission.degraded),
+                    timeout=deadline - time.monotonic(),
+                )
+        except Overloaded as e:
+            logger.warning(f"Chat rejected: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Chat {request.conversation_id} exceeded deadline")
+            raise HTTPException(status_code=504, detail="응답 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.")
+
+
+# 응답 후 실행하는 작업 (GC로 사라지지 않도록 참조 유지)
+_background_tasks: set = set()
+
+# 노드 업데이트 로그에서 값 대신 길이만 남길 필드 (후보 거리 목록)
+_LOG_SIZE_ONLY_KEYS = ("candidate_distances",)
+
+
+def _loggable_update(updates) -> dict:
+    if not isinstance(updates, dict):
+        return updates
+    return {
+        k: f"<{len(v)} items>" if k in _LOG_SIZE_ONLY_KEYS and v is not None else v
+        for k, v in updates.items()
+    }
+
+
+
+async def _chat(request: ChatRequest, deadline: Optional[float] = None, degraded: bool = False) -> ChatResponse:
     start_time = time.time()
 
     usage_callback = UsageMetadataCallbackHandler()
 
     final_state = None
+    # 시도별 답변 신뢰도 / 검증 방식 / 검증 결과 (bench/validation_skip.py 보정 입력)
+    validation_trail = []
     async for mode, payload in chat_graph_app.astream(
-        {
-            "messages": [HumanMessage(content=request.question)],
-            "docs": [],
-            "answer": None,
-            "rewrite": None,
-            "validation": None,
-            "guardrail": None,
-            "attempt": 0,
-        },
+        build_turn_input(request.question),
         config={
-            "configurable": {"thread_id": request.conversation_id},
-            "callbacks": [usage_callback]
+            # deadline / degraded: 노드가 남은 시간과 부하에 따라 validate·재시도를 건너뛴다
+            "configurable": {"thread_id": request.conversation_id, "deadline": deadline, "degraded": degraded},
+            "callbacks": [usage_callback, LLMMetricsCallbackHandler()]
         },
         stream_mode=["updates", "values"]
     ):
         if mode == "updates":
             for node_name, updates in payload.items():
-                logger.info(f"Node '{node_name}' update: {updates}")
+                logger.info(f"Node '{node_name}' update: {_loggable_update(updates)}")
+                if node_name == "confidence":
+                    validation_trail.append({"confidence": updates["confidence"], "mode": updates["validation_mode"]})
+                elif node_name == "validate" and validation_trail:
+                    validation_trail[-1]["decision"] = updates["validation"].decision
         elif mode == "values":
             final_state = payload
 
     result = final_state
 
     state = RAGState(**result)
+    REQUEST_ATTEMPTS.observe(state.attempt)
 
     end_time = time.time()
     total_latency_ms = (end_time - start_time) * 1000
@@ -168,7 +248,20 @@ async def chat(request: ChatRequest):
                     "url": d.metadata.get("url"),
                     "title": d.metadata.get("title")
                 } for d in state.docs
-            ]
+            ],
+            # 첫 검색의 후보 거리 분포와 깊이 결정 (bench/retrieval_depth.py 보정 입력)
+            "candidate_distances": state.candidate_distances,
+            "depth": state.depth,
+            "depth_reason": state.depth_reason,
+            "temporal": bool(state.temporal_ids),
+        },
+        "validation": {
+            "decision": state.validation.decision if state.validation else None,
+            "attempt": state.attempt,
+            "mode": state.validation_mode,
+            "degraded": degraded,
+            "confidence": state.confidence,
+            "trail": validation_trail,
         },
         "context_used": [
             {
@@ -178,6 +271,7 @@ async def chat(request: ChatRequest):
         ],
         "generation": {
             "model": "gpt-4o-mini",
+            "prompt_version": PROMPT_VERSION,
             "first_token_latency_ms": None,
             "total_latency_ms": round(total_latency_ms, 2),
             "final_answer": state.answer,
@@ -188,6 +282,12 @@ async def chat(request: ChatRequest):
     with open("chat_logs.jsonl", "a", encoding="utf-8") as f:
         f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
 
+    if state.validation_mode == "sample":
+        # 응답을 기다리게 하지 않고 생략한 검증을 백그라운드로 실행 (품질 비교용)
+        task = asyncio.create_task(shadow_validate(state, request.conversation_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
     if state.guardrail and state.guardrail.policy == "BLOCK":
         return ChatResponse(
             answer="죄송합니다. 해당 질문은 대학 공지사항 관련 질문이 아니거나 부적절한 내용이 포함되어 있습니다.",
@@ -2,7 +2,7 @@
 """
 공지사항 파싱 패키지
 
-- parse: 공지사항 HTML 정제, OCR, 구조화된 정보 추출
+- parse: 공지사항 HTML 정제, OCR, 구조화된 정보 추출, 일괄 저장
 """
 
 from .parse import process_announcements_by_ids, process_announcements_by_date_range
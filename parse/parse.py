@@ -1,49 +1,82 @@
 # ingest/parse.py
 """
 공지사항 구조화 처리 모듈
-원본 → 중간테이블: HTML 정제, OCR
+원본 → 중간테이블: parse_chunk_size개씩 HTML 정제 → OCR → OCR 결과 저장 → 구조화 정보 추출 → 저장
 """
 import logging
 import asyncio
-from typing import List
+from collections import Counter
+from typing import List, Optional, Tuple
 
 from sqlalchemy import RowMapping
 
-from services.html_processing_service import get_plain_text, extract_image_urls, html_to_text
+from services.html_processing_service import ExtractedHtml, extract_html
+from services.cpu_pool_service import map_in_pool
+from services.image_filter_service import ImageFilterStats
 from services.database_service import (
+    fetch_ids_by_date_range,
     fetch_rows_by_ids,
-    fetch_rows_by_date_range,
-    upsert_processed_record,
+    fetch_structured_fields,
+    upsert_ocr_records,
+    upsert_processed_records,
 )
+from services.extraction_service import (
+    build_extraction_text,
+    content_hash,
+    extract_structured_info,
+    extract_structured_info_batch,
+    to_parsed_fields,
+)
+from app.settings import get_settings
 from models.announcement_parsed import AnnouncementParsed
 from services.ocr.base import BaseOCRService
+from services.ocr.scheduler import PRIORITY_HIGH, PRIORITY_LOW, ocr_priority
 
 logger = logging.getLogger(__name__)
 
-# 동시 처리 수 제한
+# 호출당 동시 처리 공지 수 제한 (OCR 요청 자체의 동시성/속도는 OCR 스케줄러가 전역으로 관리)
 MAX_CONCURRENT_TASKS = 20
-_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
 
 
-async def _process_single_announcement(row: RowMapping, ocr_service: BaseOCRService) -> AnnouncementParsed:
-    """Semaphore로 동시 처리 수를 제한하면서 단일 공지사항 처리"""
-    async with _semaphore:
+def _extract_row(item: Tuple[str, Optional[str]]) -> Tuple[Optional[ExtractedHtml], Optional[str]]:
+    """(html, 공지 URL) → (추출 결과, 에러). 프로세스 풀 작업 단위라 예외 대신 에러 문자열을 돌려준다."""
+    html, url = item
+    try:
+        return extract_html(html, base_url=url), None
+    except Exception as e:
+        return None, f"HTML extraction failed: {type(e).__name__}: {e}"
+
+
+async def _process_single_announcement(
+    row: RowMapping,
+    extraction: Tuple[Optional[ExtractedHtml], Optional[str]],
+    ocr_service: BaseOCRService,
+    image_stats: ImageFilterStats,
+    semaphore: asyncio.Semaphore,
+) -> AnnouncementParsed:
+    """Semaphore로 동시 처리 수를 제한하면서 단일 공지사항 OCR (저장은 _process_ids에서 묶음 단위로)"""
+    async with semaphore:
         announcement_id = row["id"]
         title = row["title"]
         written_at = row["written_at"]
-        html = row["html"]
 
         try:
             logger.info(f"Processing announcement {announcement_id}: {title}")
 
-            cleaned_text = get_plain_text(html)
+            # HTML 정제 결과 (프로세스 풀에서 미리 추출)
+            extracted, extract_error = extraction
+            if extract_error:
+                raise ValueError(extract_error)
+            cleaned_text = extracted.text
 
             try:
-                # 1. 이미지 URL 추출
-                image_urls = extract_image_urls(html)
+                # 1. 이미지 URL
+                image_urls = extracted.image_urls
 
-                # 2. OCR 서비스에 위임 (병렬 처리 및 에러 핸들링 포함)
-                ocr_text, ocr_error = await ocr_service.extract_text_from_urls(image_urls)
+                # 2. OCR 서비스에 위임 (이미지 선별, 병렬 처리 및 에러 핸들링 포함)
+                ocr_text, ocr_error = await ocr_service.extract_text_from_urls(
+                    image_urls, stats=image_stats, notice_id=announcement_id,
+                )
 
                 if ocr_error:
                     logger.warning(f"Announcement {announcement_id}: {ocr_error}")
@@ -62,31 +95,191 @@ async def _process_single_announcement(row: RowMapping, ocr_service: BaseOCRServ
                 error_message=ocr_error,  # OCR 실패 시 에러 메시지 기록
             )
 
-            upsert_processed_record(processed_data)
             logger.info(f"✓ Successfully processed announcement {announcement_id}")
             return processed_data
 
         except Exception as e:
             logger.error(f"✗ Failed to process announcement {announcement_id}: {e}")
-            failed_data = AnnouncementParsed(
+            return AnnouncementParsed(
                 announcement_id=announcement_id,
                 title=title,
                 written_at=written_at,
                 error_message=str(e),
             )
-            upsert_processed_record(failed_data)
-            return failed_data
 
 
-async def process_announcements_by_ids(ids: List[int], ocr_service: BaseOCRService = None) -> List[AnnouncementParsed]:
-    rows = fetch_rows_by_ids(ids)
-    tasks = [_process_single_announcement(row, ocr_service) for row in rows]
-    results = await asyncio.gather(*tasks)
+def _apply_fields(record: AnnouncementParsed, fields: dict) -> None:
+    for key, value in fields.items():
+        setattr(record, key, value)
+
+
+def _append_error(record: AnnouncementParsed, message: str) -> None:
+    record.error_message = f"{record.error_message}; {message}" if record.error_message else message
+
+
+async def _extract_structured(
+    records: List[AnnouncementParsed],
+    backfill: bool,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> None:
+    """
+    구조화 정보 추출 단계 (records를 제자리에서 갱신).
+    - 입력 텍스트 해시가 저장된 content_hash와 같으면 기존 추출 결과 재사용
+    - 백필이고 extraction_batch_api가 켜져 있으면 OpenAI Batch API 사용, 남은 건 온라인 추출
+    - 온라인 추출은 extraction_concurrency로 동시성 제한 (semaphore: 여러 묶음이 공유)
+    """
+    cfg = get_settings()
+    stats = Counter()
+
+    pending = []  # (record, text, hash)
+    for record in records:
+        text = build_extraction_text(record.cleaned_text, record.ocr_text)
+        if text.strip():
+            pending.append((record, text, content_hash(record.title, text)))
+        else:
+            stats["empty"] += 1
+
+    # 1. 변경 없는 텍스트는 기존 결과 재사용 (조회 실패 시 전부 새로 추출)
+    try:
+        existing = await asyncio.to_thread(fetch_structured_fields, [r.announcement_id for r, _, _ in pending])
+    except Exception as e:
+        logger.error(f"Fetching saved structured fields failed, extracting all: {e}")
+        existing = {}
+    to_extract = []
+    for record, text, text_hash in pending:
+        saved = existing.get(record.announcement_id)
+        if saved and (saved["structured_info"] or {}).get("content_hash") == text_hash:
+            _apply_fields(record, {k: v for k, v in saved.items() if k != "announcement_id"})
+            stats["reused"] += 1
+        else:
+            to_extract.append((record, text, text_hash))
+
+    # 2. 백필: Batch API
+    if (backfill and cfg.extraction_batch_api and cfg.chat_model_provider == "openai"
+            and len(to_extract) >= cfg.extraction_batch_min_rows):
+        try:
+            results = await extract_structured_info_batch(
+                [(str(r.announcement_id), text, r.title) for r, text, _ in to_extract]
+            )
+        except Exception as e:
+            logger.error(f"Extraction batch failed, falling back to online extraction: {e}")
+            results = {}
+        remaining = []
+        for record, text, text_hash in to_extract:
+            info = results.get(str(record.announcement_id))
+            if info is None:
+                remaining.append((record, text, text_hash))
+                continue
+            _apply_fields(record, to_parsed_fields(info, text_hash))
+            stats["batch"] += 1
+        to_extract = remaining
+
+    # 3. 온라인 추출
+    semaphore = semaphore or asyncio.Semaphore(cfg.extraction_concurrency)
+
+    async def extract_one(record: AnnouncementParsed, text: str, text_hash: str) -> None:
+        async with semaphore:
+            try:
+                info = await extract_structured_info(text, record.title)
+            except Exception as e:
+                logger.error(f"Extraction failed for announcement {record.announcement_id}: {e}")
+                _append_error(record, f"Extraction failed: {type(e).__name__}: {e}")
+                stats["failed"] += 1
+                return
+        if info is not None:
+            _apply_fields(record, to_parsed_fields(info, text_hash))
+            stats["online"] += 1
+
+    await asyncio.gather(*(extract_one(*item) for item in to_extract))
+    logger.info(f"Structured extraction ({len(records)} announcements): {dict(stats)}")
+
+
+async def _save(records: List[AnnouncementParsed], upsert, label: str) -> None:
+    """저장 실패는 해당 레코드의 error_message로 남기고 계속 진행 (응답 전체를 실패시키지 않음)."""
+    try:
+        await asyncio.to_thread(upsert, records)
+    except Exception as e:
+        logger.error(f"{label} failed for {len(records)} announcements: {e}")
+        for record in records:
+            _append_error(record, f"{label} failed: {type(e).__name__}: {e}")
+
+
+async def _ocr_rows(
+    rows: List[RowMapping],
+    ocr_service: BaseOCRService,
+    image_stats: ImageFilterStats,
+) -> List[AnnouncementParsed]:
+    # 1. HTML 정제 (CPU 바운드): 프로세스 풀에서 배치로 실행해 이벤트 루프를 비워둔다
+    extractions = await map_in_pool(_extract_row, [(row["html"], row["url"]) for row in rows])
+
+    # 2. OCR (I/O 바운드)
+    # 호출마다 세마포어를 따로 두어 단건 요청이 백필 작업 뒤에 줄 서지 않게 한다
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+    tasks = [
+        _process_single_announcement(row, extraction, ocr_service, image_stats, semaphore)
+        for row, extraction in zip(rows, extractions)
+    ]
+    records = await asyncio.gather(*tasks)
+
+    # 3. OCR 결과는 구조화 추출(Batch API는 최대 수십 분)과 무관하게 바로 저장 (구조화 필드는 유지)
+    await _save(records, upsert_ocr_records, "Saving OCR results")
+    return records
+
+
+async def _extract_and_save(
+    records: List[AnnouncementParsed],
+    backfill: bool,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    # 4. 구조화 정보 추출 (LLM) 후 저장
+    if not get_settings().extraction_enabled:
+        return
+    try:
+        await _extract_structured(records, backfill, semaphore)
+    except Exception as e:
+        logger.error(f"Structured extraction failed for {len(records)} announcements: {e}")
+        for record in records:
+            _append_error(record, f"Extraction failed: {type(e).__name__}: {e}")
+        return
+    await _save(records, upsert_processed_records, "Saving parsed records")
+
+
+async def _process_ids(
+    ids: List[int],
+    ocr_service: BaseOCRService,
+    backfill: bool = False,
+) -> List[AnnouncementParsed]:
+    """
+    parse_chunk_size개씩 원본 조회 → OCR → 저장하고, 구조화 추출과 저장은 묶음마다 백그라운드로 진행한다.
+    다음 묶음의 OCR이 이전 묶음의 추출(Batch API 대기 포함)과 겹쳐 진행되고, 원본 HTML은 묶음 단위로만 메모리에 있다.
+    """
+    cfg = get_settings()
+    size = max(1, cfg.parse_chunk_size)
+    image_stats = ImageFilterStats()
+    extraction_semaphore = asyncio.Semaphore(cfg.extraction_concurrency)
+    results: List[AnnouncementParsed] = []
+    extraction_tasks: List[asyncio.Task] = []
+    try:
+        for i in range(0, len(ids), size):
+            rows = await asyncio.to_thread(fetch_rows_by_ids, ids[i:i + size])
+            records = await _ocr_rows(rows, ocr_service, image_stats)
+            results.extend(records)
+            extraction_tasks.append(asyncio.create_task(_extract_and_save(records, backfill, extraction_semaphore)))
+        logger.info(f"OCR image filter ({len(results)} announcements): {image_stats.summary()}")
+        await asyncio.gather(*extraction_tasks)
+    except BaseException:
+        for task in extraction_tasks:
+            task.cancel()
+        raise
     return results
 
 
+async def process_announcements_by_ids(ids: List[int], ocr_service: BaseOCRService = None) -> List[AnnouncementParsed]:
+    with ocr_priority(PRIORITY_HIGH):
+        return await _process_ids(ids, ocr_service)
+
+
 async def process_announcements_by_date_range(from_date: str, to_date: str, ocr_service: BaseOCRService = None) -> List[AnnouncementParsed]:
-    rows = fetch_rows_by_date_range(from_date, to_date)
-    tasks = [_process_single_announcement(row, ocr_service) for row in rows]
-    results = await asyncio.gather(*tasks)
-    return results
+    ids = await asyncio.to_thread(fetch_ids_by_date_range, from_date, to_date)
+    with ocr_priority(PRIORITY_LOW):
+        return await _process_ids(ids, ocr_service, backfill=True)
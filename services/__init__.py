@@ -1,14 +1,16 @@
 # services package
 from .database_service import fetch_rows_by_ids, fetch_rows_by_date_range
 
-from .html_processing_service import get_plain_text, extract_image_urls
-from .image_download_service import download_image_as_base64
+from .html_processing_service import extract_html, get_plain_text, extract_image_urls
+from .image_download_service import download_image, close_http_session
 
 __all__ = [
     "fetch_rows_by_ids",
     "fetch_rows_by_date_range",
 
+    "extract_html",
     "get_plain_text",
     "extract_image_urls",
-    "download_image_as_base64",
+    "download_image",
+    "close_http_session",
 ]
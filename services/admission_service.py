@@ -0,0 +1,181 @@
+# services/admission_service.py
+"""
+/chat 요청 수락 제어 (admission control / load shedding).
+- 동시에 처리하는 요청 수 상한, 넘치면 길이가 제한된 FIFO 대기열에서 대기
+- 대기열이 가득 찼거나 대기 시간이 한도(또는 요청 마감 시각)를 넘으면 바로 거절 → 503 + Retry-After
+- 부하가 높을 때 수락한 요청은 degraded: validate와 재시도 루프를 건너뛰어 처리 시간을 줄인다
+- 요청별 마감 시각(deadline)은 LangGraph configurable로 전달해 각 노드가 남은 시간으로 선택 단계를 건너뛰고
+  LLM 호출 타임아웃도 남은 시간으로 줄인다
+
+사용 예:
+    async with get_admission_controller().admit(deadline) as admission:
+        ... admission.degraded ...
+"""
+import asyncio
+import math
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Deque, Mapping, Optional
+
+from app.settings import get_settings
+from services.metrics_service import CHAT_ADMISSION, CHAT_INFLIGHT, CHAT_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Admission",
+    "Overloaded",
+    "AdmissionController",
+    "get_admission_controller",
+    "remaining_seconds",
+    "call_timeout",
+    "should_skip_optional",
+]
+
+
+class Overloaded(Exception):
+    """처리 용량 초과로 요청을 거절 (retry_after: 다시 시도해 볼 만한 시간, 초)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"chat overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class Admission:
+    degraded: bool
+    queued_seconds: float
+
+
+class AdmissionController:
+    """
+    동시 처리 상한(max_inflight) + FIFO 대기열(max_queue, queue_timeout).
+    수락 시점의 부하(처리 중 + 대기)가 degrade_load * max_inflight 이상이면 degraded로 수락한다.
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout: float, degrade_load: float):
+        self.max_inflight = max(1, max_inflight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.degrade_load = degrade_load
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # 요청 처리 시간 EWMA (Retry-After 추정용)
+        self._service_time = 1.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _retry_after(self) -> int:
+        # 대기열이 모두 빠지는 데 걸릴 대략적인 시간
+        return max(1, math.ceil(self._service_time * (self.queued + 1) / self.max_inflight))
+
+    def _reject(self, reason: str) -> Overloaded:
+        CHAT_ADMISSION.labels(result=f"rejected_{reason}").inc()
+        return Overloaded(reason, self._retry_after())
+
+    async def _acquire(self, deadline: Optional[float]) -> None:
+        if self.inflight < self.max_inflight and not self._waiters:
+            self.inflight += 1
+            return
+        if self.queued >= self.max_queue:
+            raise self._reject("queue_full")
+
+        timeout = self.queue_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise self._reject("timeout")
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                # 슬롯을 받은 직후 시간 초과/취소 → 반납
+                self._release()
+            else:
+                fut.cancel()
+                self._waiters.remove(fut)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject("timeout") from None
+
+    def _release(self) -> None:
+        self.inflight -= 1
+        while self._waiters and self.inflight < self.max_inflight:
+            fut = self._waiters.popleft()
+            if fut.cancelled():
+                continue
+            self.inflight += 1
+            fut.set_result(None)
+
+    @asynccontextmanager
+    async def admit(self, deadline: Optional[float] = None):
+        """요청 1건의 처리 슬롯. 거절되면 Overloaded (deadline: time.monotonic() 기준 마감 시각)."""
+        load = self.inflight + self.queued
+        wait_start = time.monotonic()
+        await self._acquire(deadline)
+        queued = time.monotonic() - wait_start
+        CHAT_QUEUE_WAIT.observe(queued)
+
+        degraded = load >= self.degrade_load * self.max_inflight
+        CHAT_ADMISSION.labels(result="degraded" if degraded else "admitted").inc()
+        if degraded:
+            logger.info(f"Chat admitted in degraded mode (load {load}/{self.max_inflight}, queued {queued:.2f}s)")
+
+        CHAT_INFLIGHT.inc()
+        start = time.monotonic()
+        try:
+            yield Admission(degraded=degraded, queued_seconds=queued)
+        finally:
+            CHAT_INFLIGHT.dec()
+            self._service_time = 0.9 * self._service_time + 0.1 * (time.monotonic() - start)
+            self._release()
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    cfg = get_settings()
+    return AdmissionController(
+        max_inflight=cfg.chat_max_inflight,
+        max_queue=cfg.chat_max_queue,
+        queue_timeout=cfg.chat_queue_timeout,
+        degrade_load=cfg.chat_degrade_load,
+    )
+
+
+# ========== 요청 마감 시각 (그래프 노드용) ==========
+
+def remaining_seconds(config: Mapping[str, Any]) -> Optional[float]:
+    """configurable["deadline"](time.monotonic() 기준)까지 남은 시간. 마감이 없으면 None."""
+    deadline = (config.get("configurable") or {}).get("deadline")
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(config: Mapping[str, Any], default: float) -> float:
+    """LLM 호출 1건의 타임아웃: 기본값(llm_timeout 등)과 요청 마감까지 남은 시간 중 작은 값."""
+    remaining = remaining_seconds(config)
+    if remaining is None:
+        return default
+    return max(0.0, min(default, remaining))
+
+
+def should_skip_optional(config: Mapping[str, Any]) -> bool:
+    """
+    validate / 재시도 같은 선택 단계를 건너뛸지.
+    degraded로 수락된 요청이거나 남은 시간이 chat_optional_min_seconds보다 적으면 True.
+    """
+    if (config.get("configurable") or {}).get("degraded"):
+        return True
+    remaining = remaining_seconds(config)
+    return remaining is not None and remaining < get_settings().chat_optional_min_seconds
@@ -0,0 +1,89 @@
+# services/batching_service.py
+"""
+마이크로 배처.
+동시에 들어온 단건 요청을 짧은 창(window_ms) 동안 모아 한 번의 배치 호출로 처리하고
+결과를 각 요청자에게 돌려준다. 배치가 max_batch에 차면 창을 기다리지 않고 바로 보낸다.
+(로컬 임베딩 모델, 임베딩 API 등 배치 입력을 받는 호출에 사용)
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+from services.metrics_service import MICROBATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["MicroBatcher"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    fn(items) -> results (같은 길이, 같은 순서)를 배치 단위로 호출.
+
+    사용 예:
+        batcher = MicroBatcher(embed_many, max_batch=32, window_ms=5, name="query_embedding")
+        vector = await batcher.submit("장학금 신청 기간")
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch: int,
+        window_ms: float,
+        name: str,
+    ):
+        self._fn = fn
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window_ms) / 1000
+        self.name = name
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 실행 중인 배치 요청 (GC로 사라지지 않도록 참조 유지)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이벤트 루프가 바뀌면(테스트/벤치의 asyncio.run 반복) 이전 루프의 대기열은 버린다
+            self._loop, self._pending, self._timer = loop, [], None
+
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            self._timer = self._loop.call_later(self.window, self._flush)
+        # 기다리던 쪽이 이미 취소된 요청은 보내지 않는다
+        batch = [(item, fut) for item, fut in batch if not fut.done()]
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        MICROBATCH_SIZE.labels(name=self.name).observe(len(batch))
+        try:
+            results = await self._fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
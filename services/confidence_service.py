@@ -0,0 +1,83 @@
+# services/confidence_service.py
+"""
+답변 신뢰도 점수 서비스 (LLM 호출 없음).
+validate(소형 LLM + 문서 요약 재전송)를 건너뛰어도 되는지 판단하는 데 쓴다.
+- 검색 강도: 최상위 청크의 코사인 거리
+- 근거 겹침: 답변 바이그램 중 참고 청크에 나오는 비율 (공지 문구를 그대로 인용하면 높다)
+- 답변 불가 문구("찾을 수 없습니다" 등)가 있으면 0 (validate가 RETRY를 권장하는 경우)
+"""
+import random
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+
+from services.context_service import char_bigrams
+
+__all__ = ["Confidence", "score_confidence", "choose_validation_mode"]
+
+# 이 거리 이하면 검색 강도 1, 이상이면 0 (그 사이는 선형)
+_STRONG_DISTANCE = 0.30
+_WEAK_DISTANCE = 0.55
+# 근거 겹침이 이 범위에서 0 → 1
+_LOW_OVERLAP = 0.35
+_HIGH_OVERLAP = 0.75
+_RETRIEVAL_WEIGHT = 0.4
+
+_REFUSAL = re.compile(
+    r"(찾을|확인할|알|답변할|답변드릴|안내할|안내해\s*드릴)\s*수\s*없"
+    r"|정보가\s*(없|부족)|내용이\s*(없|포함되어\s*있지\s*않)|언급(이|되어\s*있지)\s*(없|않)"
+)
+
+
+@dataclass(frozen=True)
+class Confidence:
+    """답변 신뢰도 (score: 0~1)와 근거 신호."""
+    score: float
+    best_distance: Optional[float]
+    overlap: float
+    refusal: bool
+
+
+def _scale(value: float, low: float, high: float) -> float:
+    return min(1.0, max(0.0, (value - low) / (high - low)))
+
+
+def score_confidence(answer: Optional[str], docs: List[Document]) -> Confidence:
+    answer = answer or ""
+    refusal = bool(_REFUSAL.search(answer))
+
+    distances = [d.metadata.get("score") for d in docs if (d.metadata or {}).get("score") is not None]
+    best = min(distances) if distances else None
+
+    answer_grams = char_bigrams(answer)
+    context_grams = set()
+    for doc in docs:
+        context_grams |= char_bigrams(doc.page_content)
+    overlap = len(answer_grams & context_grams) / len(answer_grams) if answer_grams else 0.0
+
+    if refusal or not docs or not answer_grams:
+        return Confidence(0.0, best, overlap, refusal)
+
+    retrieval = 0.5 if best is None else 1.0 - _scale(best, _STRONG_DISTANCE, _WEAK_DISTANCE)
+    grounding = _scale(overlap, _LOW_OVERLAP, _HIGH_OVERLAP)
+    score = _RETRIEVAL_WEIGHT * retrieval + (1 - _RETRIEVAL_WEIGHT) * grounding
+    return Confidence(round(score, 4), best, round(overlap, 4), refusal)
+
+
+def choose_validation_mode(
+    score: float,
+    threshold: float,
+    sample_rate: float,
+    rand: Callable[[], float] = random.random,
+) -> str:
+    """
+    신뢰도 → 검증 방식.
+    - full: 응답 전에 validate (RETRY면 재검색)
+    - skip: validate 생략
+    - sample: validate 생략 대상 중 sample_rate 비율, 응답 후 백그라운드로 validate해 생략 판단의 품질을 측정
+    """
+    if score < threshold:
+        return "full"
+    return "sample" if rand() < sample_rate else "skip"
@@ -0,0 +1,166 @@
+# services/context_service.py
+"""
+검색 결과 → LLM 프롬프트 컨텍스트 패킹 서비스.
+- announcement_id 기준 그룹핑, 인접/중복(overlap) 청크 병합
+- 청크마다 반복되는 제목 제거
+- 토큰 예산에 맞춰 잘라내기
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from services.token_service import count_tokens, truncate_tokens
+
+__all__ = ["PackedNotice", "group_notices", "pack_context", "build_digest", "char_bigrams"]
+
+# 인접 청크 병합 시 탐색할 최대 overlap 길이 / 우연한 일치로 보지 않을 최소 길이
+_MAX_OVERLAP_CHARS = 512
+_MIN_OVERLAP_CHARS = 8
+# 예산이 이보다 적게 남으면 다음 공지는 넣지 않는다
+_MIN_BODY_TOKENS = 40
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class PackedNotice:
+    """하나의 공지사항으로 병합된 검색 결과."""
+    announcement_id: Optional[int]
+    title: str = ""
+    url: Optional[str] = None
+    written_at: Optional[str] = None
+    application_period: Optional[str] = None
+    chunks: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def body(self) -> str:
+        """chunk_index 순으로 정렬해 인접 청크는 overlap을 제거하며 이어붙인 본문."""
+        parts: List[str] = []
+        prev_index = None
+        for index, text in sorted(self.chunks, key=lambda c: c[0]):
+            if parts and prev_index is not None and index == prev_index + 1:
+                parts[-1] = _merge_overlap(parts[-1], text)
+            else:
+                parts.append(text)
+            prev_index = index
+        return "\n...\n".join(parts)
+
+    def header(self) -> str:
+        lines = [f"[Doc Id: {self.announcement_id}] {self.title}".rstrip()]
+        meta = []
+        if self.written_at:
+            meta.append(f"작성일: {self.written_at[:10]}")
+        if self.application_period:
+            meta.append(f"신청기간: {self.application_period}")
+        if self.url:
+            meta.append(f"링크: {self.url}")
+        if meta:
+            lines.append(", ".join(meta))
+        return "\n".join(lines)
+
+
+def _strip_title(doc: Document) -> str:
+    """build_documents_from_parsed가 청크 앞에 붙인 제목 줄을 제거."""
+    content = doc.page_content or ""
+    title = (doc.metadata or {}).get("title")
+    if title and content.startswith(title + "\n"):
+        return content[len(title) + 1:]
+    return content
+
+
+def _merge_overlap(left: str, right: str) -> str:
+    """left의 끝과 right의 앞이 겹치면 겹친 부분을 한 번만 남기고 이어붙인다."""
+    limit = min(len(left), len(right), _MAX_OVERLAP_CHARS)
+    for size in range(limit, _MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return left + "\n" + right
+
+
+def group_notices(docs: List[Document]) -> List[PackedNotice]:
+    """검색 순위(처음 등장한 순서)를 유지하면서 announcement_id별로 청크를 묶는다."""
+    groups: Dict[object, PackedNotice] = {}
+    seen_chunks = set()
+    for pos, doc in enumerate(docs):
+        md = doc.metadata or {}
+        aid = md.get("announcement_id")
+        key = aid if aid is not None else f"_doc{pos}"
+        index = md.get("chunk_index")
+        index = index if index is not None else pos
+        if (key, index) in seen_chunks:
+            continue
+        seen_chunks.add((key, index))
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = PackedNotice(
+                announcement_id=aid,
+                title=md.get("title") or "",
+                url=md.get("url"),
+                written_at=md.get("written_at"),
+                application_period=md.get("application_period"),
+            )
+        group.chunks.append((index, _strip_title(doc)))
+    return list(groups.values())
+
+
+def pack_context(docs: List[Document], token_budget: int) -> str:
+    """generate용 컨텍스트. 순위가 높은 공지부터 예산 안에서 채우고, 넘치는 공지는 잘라낸다."""
+    blocks: List[str] = []
+    remaining = token_budget
+    for notice in group_notices(docs):
+        header = notice.header()
+        header_tokens = count_tokens(header) + 1
+        if remaining - header_tokens < _MIN_BODY_TOKENS:
+            break
+        body = notice.body
+        body_tokens = count_tokens(body)
+        if header_tokens + body_tokens > remaining:
+            body = truncate_tokens(body, remaining - header_tokens) + " …"
+            body_tokens = remaining - header_tokens
+        blocks.append(f"{header}\n{body}")
+        remaining -= header_tokens + body_tokens
+    return "\n\n".join(blocks)
+
+
+def char_bigrams(text: str) -> set:
+    """공백을 제거한 문자 바이그램 집합 (한국어 어절 변형에 강한 어휘 겹침 측정용)."""
+    compact = _WHITESPACE.sub("", text or "").lower()
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def build_digest(docs: List[Document], token_budget: int, focus: str) -> str:
+    """
+    validate용 요약 컨텍스트.
+    공지별로 제목과, focus(질문+답변)와 어휘가 가장 많이 겹치는 줄만 원래 순서대로 남긴다.
+    """
+    notices = group_notices(docs)
+    if not notices:
+        return ""
+    focus_grams = char_bigrams(focus)
+    per_notice = max(_MIN_BODY_TOKENS, token_budget // len(notices))
+
+    blocks: List[str] = []
+    remaining = token_budget
+    for notice in notices:
+        if remaining < _MIN_BODY_TOKENS:
+            break
+        budget = min(per_notice, remaining)
+        header = f"- [Doc Id: {notice.announcement_id}] {notice.title}".rstrip()
+        used = count_tokens(header)
+
+        lines = [l for l in notice.body.splitlines() if l.strip() and l != "..."]
+        ranked = sorted(range(len(lines)), key=lambda i: -len(char_bigrams(lines[i]) & focus_grams))
+        keep = set()
+        for i in ranked:
+            cost = count_tokens(lines[i])
+            if used + cost > budget:
+                continue
+            keep.add(i)
+            used += cost
+        body = "\n".join(f"  {lines[i]}" for i in sorted(keep))
+        blocks.append(f"{header}\n{body}" if body else header)
+        remaining -= used
+    return "\n".join(blocks)
@@ -0,0 +1,68 @@
+# services/cpu_pool_service.py
+"""
+CPU 바운드 작업(HTML 정제, 청킹) 오프로딩용 프로세스 풀.
+이벤트 루프를 점유하지 않도록 작업을 배치로 묶어 ProcessPoolExecutor에서 실행한다.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["get_process_pool", "map_in_pool", "shutdown_process_pool"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """프로세스 풀 (lazy singleton). cpu_pool_workers가 0이면 None (이벤트 루프에서 직접 실행)."""
+    global _pool
+    workers = get_settings().cpu_pool_workers
+    if workers <= 0:
+        return None
+    if _pool is None:
+        # fork는 부모의 스레드/커넥션 풀 상태를 복제하므로 spawn 사용
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"CPU process pool started with {workers} workers")
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _run_batch(fn: Callable[[T], R], items: Sequence[T]) -> List[R]:
+    return [fn(item) for item in items]
+
+
+async def map_in_pool(fn: Callable[[T], R], items: Sequence[T], batch_size: Optional[int] = None) -> List[R]:
+    """
+    items에 fn을 적용한 결과를 순서대로 반환.
+    fn과 items는 pickle 가능해야 한다 (모듈 최상위 함수, dict/dataclass 등).
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    pool = get_process_pool()
+    if pool is None:
+        return _run_batch(fn, items)
+
+    batch_size = batch_size or get_settings().cpu_pool_batch_size
+    loop = asyncio.get_running_loop()
+    futures = [
+        loop.run_in_executor(pool, _run_batch, fn, items[i:i + batch_size])
+        for i in range(0, len(items), batch_size)
+    ]
+    batches = await asyncio.gather(*futures)
+    return [result for batch in batches for result in batch]
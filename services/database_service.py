@@ -1,13 +1,19 @@
 # services/database_service.py
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 from sqlalchemy import text, RowMapping
 from app.deps import get_engine
 from models.announcement_parsed import AnnouncementParsed
+from services.metrics_service import DB_QUERY_LATENCY, timed
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # ========== 원본 공지사항 조회 ==========
 
+@timed(DB_QUERY_LATENCY, query="fetch_rows_by_ids")
 def fetch_rows_by_ids(ids: List[int]) -> List[RowMapping]:
     """ID 목록으로 공지사항 조회."""
     engine = get_engine()
@@ -23,6 +29,7 @@ def fetch_rows_by_ids(ids: List[int]) -> List[RowMapping]:
         return list(rows)
 
 
+@timed(DB_QUERY_LATENCY, query="fetch_rows_by_date_range")
 def fetch_rows_by_date_range(from_date: str, to_date: str) -> List[RowMapping]:
     """날짜 범위로 공지사항 조회."""
     engine = get_engine()
@@ -38,8 +45,86 @@ def fetch_rows_by_date_range(from_date: str, to_date: str) -> List[RowMapping]:
         return list(rows)
 
 
+@timed(DB_QUERY_LATENCY, query="fetch_ids_by_date_range")
+def fetch_ids_by_date_range(from_date: str, to_date: str) -> List[int]:
+    """날짜 범위의 공지사항 ID (원본 HTML은 묶음별로 fetch_rows_by_ids로 조회)."""
+    engine = get_engine()
+    with engine.connect() as conn:
+        return list(conn.execute(text("""
+         SELECT a.id
+         FROM public.announcement a
+         WHERE a.written_at >= :from_date AND a.written_at <= :to_date
+         ORDER BY a.written_at DESC
+         """), {"from_date": from_date, "to_date": to_date}).scalars().all())
+
+
 # ========== 중간 테이블 (announcement_parsed) CRUD ==========
 
+_UPSERT_PARSED_SQL = text("""
+    INSERT INTO public.announcement_parsed (
+        announcement_id, title, written_at, cleaned_text, ocr_text,
+        application_period_start, application_period_end,
+        target_departments, target_grades, tags, structured_info,
+        error_message
+    ) VALUES (
+        :announcement_id, :title, :written_at, :cleaned_text, :ocr_text,
+        :application_period_start, :application_period_end,
+        :target_departments, :target_grades, :tags, :structured_info,
+        :error_message
+    )
+    ON CONFLICT (announcement_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        written_at = EXCLUDED.written_at,
+        cleaned_text = EXCLUDED.cleaned_text,
+        ocr_text = EXCLUDED.ocr_text,
+        application_period_start = EXCLUDED.application_period_start,
+        application_period_end = EXCLUDED.application_period_end,
+        target_departments = EXCLUDED.target_departments,
+        target_grades = EXCLUDED.target_grades,
+        tags = EXCLUDED.tags,
+        structured_info = EXCLUDED.structured_info,
+        error_message = EXCLUDED.error_message,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+# 구조화 필드는 건드리지 않고 정제/OCR 결과만 저장 (구조화 추출 전 중간 저장용)
+_UPSERT_OCR_SQL = text("""
+    INSERT INTO public.announcement_parsed (
+        announcement_id, title, written_at, cleaned_text, ocr_text, error_message
+    ) VALUES (
+        :announcement_id, :title, :written_at, :cleaned_text, :ocr_text, :error_message
+    )
+    ON CONFLICT (announcement_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        written_at = EXCLUDED.written_at,
+        cleaned_text = EXCLUDED.cleaned_text,
+        ocr_text = EXCLUDED.ocr_text,
+        error_message = EXCLUDED.error_message,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+# 한 번의 executemany(한 트랜잭션)로 보내는 레코드 수
+_BULK_CHUNK_SIZE = 500
+
+
+def _parsed_params(data: AnnouncementParsed) -> dict:
+    return {
+        "announcement_id": data.announcement_id,
+        "title": data.title,
+        "written_at": data.written_at,
+        "cleaned_text": data.cleaned_text,
+        "ocr_text": data.ocr_text,
+        "application_period_start": data.application_period_start,
+        "application_period_end": data.application_period_end,
+        "target_departments": data.target_departments,
+        "target_grades": data.target_grades,
+        "tags": data.tags,
+        "structured_info": json.dumps(data.structured_info, ensure_ascii=False) if data.structured_info else None,
+        "error_message": data.error_message,
+    }
+
+
+@timed(DB_QUERY_LATENCY, query="upsert_processed_record")
 def upsert_processed_record(data: AnnouncementParsed) -> int:
     """
     중간 테이블에 레코드 삽입/업데이트 (UPSERT).
@@ -48,50 +133,79 @@ def upsert_processed_record(data: AnnouncementParsed) -> int:
     """
     engine = get_engine()
     with engine.connect() as conn:
-        result = conn.execute(text("""
-            INSERT INTO public.announcement_parsed (
-                announcement_id, title, written_at, cleaned_text, ocr_text,
-                application_period_start, application_period_end,
-                target_departments, target_grades, tags, structured_info,
-                error_message
-            ) VALUES (
-                :announcement_id, :title, :written_at, :cleaned_text, :ocr_text,
-                :application_period_start, :application_period_end,
-                :target_departments, :target_grades, :tags, :structured_info,
-                :error_message
-            )
-            ON CONFLICT (announcement_id) DO UPDATE SET
-                title = EXCLUDED.title,
-                written_at = EXCLUDED.written_at,
-                cleaned_text = EXCLUDED.cleaned_text,
-                ocr_text = EXCLUDED.ocr_text,
-                application_period_start = EXCLUDED.application_period_start,
-                application_period_end = EXCLUDED.application_period_end,
-                target_departments = EXCLUDED.target_departments,
-                target_grades = EXCLUDED.target_grades,
-                tags = EXCLUDED.tags,
-                structured_info = EXCLUDED.structured_info,
-                error_message = EXCLUDED.error_message,
-                updated_at = CURRENT_TIMESTAMP
-            RETURNING id
-        """), {
-            "announcement_id": data.announcement_id,
-            "title": data.title,
-            "written_at": data.written_at,
-            "cleaned_text": data.cleaned_text,
-            "ocr_text": data.ocr_text,
-            "application_period_start": data.application_period_start,
-            "application_period_end": data.application_period_end,
-            "target_departments": data.target_departments,
-            "target_grades": data.target_grades,
-            "tags": data.tags,
-            "structured_info": json.dumps(data.structured_info) if data.structured_info else None,
-            "error_message": data.error_message,
-        })
+        result = conn.execute(text(_UPSERT_PARSED_SQL.text + " RETURNING id"), _parsed_params(data))
         conn.commit()
         return result.scalar_one()
 
 
+def _upsert_in_chunks(sql, params: List[dict]) -> int:
+    """
+    _BULK_CHUNK_SIZE개씩 각자의 트랜잭션으로 executemany.
+    한 청크가 실패해도 나머지 청크는 저장하고, 끝난 뒤 첫 에러를 다시 올린다.
+    반환: 저장한 레코드 수
+    """
+    engine = get_engine()
+    saved = 0
+    first_error: Optional[Exception] = None
+    for i in range(0, len(params), _BULK_CHUNK_SIZE):
+        chunk = params[i:i + _BULK_CHUNK_SIZE]
+        try:
+            with engine.begin() as conn:
+                conn.execute(sql, chunk)
+            saved += len(chunk)
+        except Exception as e:
+            logger.error(f"Upsert failed for {len(chunk)} records (ids {chunk[0]['announcement_id']}..): {e}")
+            first_error = first_error or e
+    if first_error is not None:
+        raise first_error
+    return saved
+
+
+@timed(DB_QUERY_LATENCY, query="upsert_processed_records")
+def upsert_processed_records(records: List[AnnouncementParsed]) -> int:
+    """
+    중간 테이블 일괄 UPSERT (executemany, 청크마다 별도 트랜잭션).
+    반환: 저장한 레코드 수
+    """
+    if not records:
+        return 0
+    return _upsert_in_chunks(_UPSERT_PARSED_SQL, [_parsed_params(r) for r in records])
+
+
+@timed(DB_QUERY_LATENCY, query="upsert_ocr_records")
+def upsert_ocr_records(records: List[AnnouncementParsed]) -> int:
+    """
+    정제/OCR 결과만 일괄 UPSERT (구조화 필드는 기존 값 유지).
+    구조화 추출(Batch API는 최대 수십 분)이 끝나기 전에 OCR 결과를 잃지 않도록 먼저 저장하는 용도.
+    """
+    if not records:
+        return 0
+    params = [
+        {k: v for k, v in _parsed_params(r).items()
+         if k in ("announcement_id", "title", "written_at", "cleaned_text", "ocr_text", "error_message")}
+        for r in records
+    ]
+    return _upsert_in_chunks(_UPSERT_OCR_SQL, params)
+
+
+@timed(DB_QUERY_LATENCY, query="fetch_structured_fields")
+def fetch_structured_fields(ids: List[int]) -> Dict[int, RowMapping]:
+    """announcement_id → 저장된 구조화 필드 (추출 결과 재사용 판단용, structured_info.content_hash 포함)."""
+    if not ids:
+        return {}
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT announcement_id, application_period_start, application_period_end,
+                   target_departments, target_grades, tags, structured_info
+            FROM public.announcement_parsed
+            WHERE announcement_id = ANY(:ids)
+              AND structured_info->>'content_hash' IS NOT NULL
+        """), {"ids": ids}).mappings().all()
+        return {row["announcement_id"]: row for row in rows}
+
+
+@timed(DB_QUERY_LATENCY, query="fetch_parsed_records_by_ids")
 def fetch_parsed_records_by_ids(ids: List[int]) -> List[RowMapping]:
     """ID 목록으로 중간 테이블 레코드들 조회 (announcement_id 기준)."""
     engine = get_engine()
@@ -112,6 +226,7 @@ def fetch_parsed_records_by_ids(ids: List[int]) -> List[RowMapping]:
         return list(rows)
 
 
+@timed(DB_QUERY_LATENCY, query="fetch_parsed_records_by_date_range")
 def fetch_parsed_records_by_date_range(from_date: str, to_date: str) -> List[RowMapping]:
     """날짜 범위로 중간 테이블 레코드들 조회 (written_at 기준)."""
     engine = get_engine()
@@ -130,3 +245,97 @@ def fetch_parsed_records_by_date_range(from_date: str, to_date: str) -> List[Row
             ORDER BY ap.written_at DESC
         """), {"from_date": from_date, "to_date": to_date}).mappings().all()
         return list(rows)
+
+
+# ========== 신청 기간 인덱스 ==========
+
+# 신청 기간을 tsrange로 본 GiST 표현식 인덱스 (한쪽 끝만 있으면 반대쪽은 무한대).
+# fetch_announcements_by_period의 WHERE 절이 이 표현식/조건과 같아야 인덱스를 탄다.
+# 시작 > 마감인 행은 tsrange가 에러를 내므로 식 안에서 NULL로 바꾼다.
+# (WHERE의 AND 조건은 평가 순서가 보장되지 않아, 조건으로 거르면 순차 스캔에서 여전히 에러가 날 수 있다)
+_PERIOD_RANGE = (
+    "(CASE WHEN application_period_start IS NULL OR application_period_end IS NULL"
+    " OR application_period_start <= application_period_end"
+    " THEN tsrange(application_period_start, application_period_end, '[]') END)"
+)
+_PERIOD_PREDICATE = "(application_period_start IS NOT NULL OR application_period_end IS NOT NULL)"
+
+
+@timed(DB_QUERY_LATENCY, query="ensure_period_index")
+def ensure_period_index() -> None:
+    """
+    announcement_parsed 신청 기간 GiST 인덱스 생성 (이미 있으면 무시).
+    개발 환경에서는 시작 시 실행하고, production에서는 배포 시 같은 DDL을 실행한다 (pgvector 확장과 같은 규칙).
+    인덱스가 없어도 기간 조회는 동작한다 (느릴 뿐).
+    """
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE INDEX IF NOT EXISTS idx_announcement_parsed_period
+            ON public.announcement_parsed USING gist ({_PERIOD_RANGE})
+            WHERE {_PERIOD_PREDICATE}
+        """))
+
+
+@timed(DB_QUERY_LATENCY, query="fetch_announcements_by_period")
+def fetch_announcements_by_period(
+    start: datetime,
+    end: datetime,
+    deadline_only: bool = False,
+    limit: int = 20,
+) -> List[RowMapping]:
+    """
+    신청 기간이 [start, end]와 겹치는 공지 조회 (마감 임박 순).
+    deadline_only면 마감일이 [start, end] 안에 있는 공지만.
+    """
+    engine = get_engine()
+    deadline_clause = "AND application_period_end BETWEEN :start AND :end" if deadline_only else ""
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT announcement_id, title, application_period_start, application_period_end, tags
+            FROM public.announcement_parsed
+            WHERE {_PERIOD_PREDICATE}
+              AND {_PERIOD_RANGE} && tsrange(:start, :end, '[]')
+              {deadline_clause}
+            ORDER BY application_period_end ASC NULLS LAST, written_at DESC
+            LIMIT :limit
+        """), {"start": start, "end": end, "limit": limit}).mappings().all()
+        return list(rows)
+
+
+# ========== 벡터 컬렉션 (인메모리 인덱스 적재용) ==========
+
+@timed(DB_QUERY_LATENCY, query="collection_embeddings_version")
+def collection_embeddings_version(collection_name: str) -> str:
+    """
+    PGVector 컬렉션 내용 버전 "청크 수:id 목록 md5" (인메모리 인덱스 스냅샷이 최신인지 판단).
+    청크 id는 저장할 때마다 새로 만들어지므로 삭제 + 같은 수의 추가도 다른 버전이 된다.
+    vector_index_service.ids_version과 같은 형식 (id를 바이트 순서로 정렬해 ','로 연결).
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        row = conn.execute(text("""
+            SELECT count(*) AS n,
+                   md5(coalesce(string_agg(e.id::text, ',' ORDER BY e.id::text COLLATE "C"), '')) AS digest
+            FROM langchain_pg_embedding e
+            JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+            WHERE c.name = :name
+        """), {"name": collection_name}).one()
+        return f"{row.n}:{row.digest}"
+
+
+@timed(DB_QUERY_LATENCY, query="fetch_collection_embeddings")
+def fetch_collection_embeddings(collection_name: str) -> List[RowMapping]:
+    """
+    PGVector 컬렉션의 전체 청크 (id, document, cmetadata, embedding).
+    embedding은 pgvector 텍스트 표현('[0.1,0.2,...]')으로 가져온다.
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT e.id, e.document, e.cmetadata, e.embedding::text AS embedding
+            FROM langchain_pg_embedding e
+            JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+            WHERE c.name = :name
+            ORDER BY e.id
+        """), {"name": collection_name}).mappings().all()
@@ -1,28 +1,52 @@
 """임베딩 생성 및 벡터 저장 서비스"""
-from typing import List
+from typing import TYPE_CHECKING, List
 from langchain_core.documents import Document
-from langchain_postgres.vectorstores import PGVector
 
-from app.deps import get_openai_client, get_vectorstore, get_settings
+from app.deps import embedding_dimensions, get_embeddings, get_openai_client, get_vectorstore, get_settings
 import logging
 
+if TYPE_CHECKING:
+    from langchain_postgres.vectorstores import PGVector
+
+from services.metrics_service import EMBEDDING_LATENCY, DB_QUERY_LATENCY, observe_latency
+from services.vector_index_service import add_to_vector_index
+
 logger = logging.getLogger(__name__)
 
 
 BATCH_SIZE = 256  # 배치 크기 조절
 
 
+async def _generate_local_embeddings(texts: List[str]) -> List[List[float]]:
+    """로컬 모델 임베딩 (처리량은 API 한도가 아니라 이 프로세스의 코어에 묶인다)."""
+    embeddings = get_embeddings()
+    vectors: List[List[float]] = []
+    for i in range(0, len(texts), BATCH_SIZE):
+        batch = texts[i:i + BATCH_SIZE]
+        with observe_latency(EMBEDDING_LATENCY, provider="huggingface", kind="documents"):
+            vectors.extend(await embeddings.aembed_documents(batch))
+    logger.info(f"Embedding generated locally for {len(texts)} texts")
+    return vectors
+
+
 async def _generate_embeddings(
     texts: List[str],
 ) -> List[List[float]]:
+    if get_settings().embed_provider != "openai":
+        return await _generate_local_embeddings(texts)
+
     client = get_openai_client()
     model = get_settings().embed_model
+    # text-embedding-3 계열은 설정한 차원으로 잘라 받는다 (PGVector embedding_length와 일치)
+    dimensions = embedding_dimensions()
+    extra = {"dimensions": dimensions} if dimensions else {}
     vectors: List[List[float]] = []
 
     total_tokens = 0
     for i in range(0, len(texts), BATCH_SIZE):
         batch = texts[i:i + BATCH_SIZE]
-        resp = await client.embeddings.create(model=model, input=batch)
+        with observe_latency(EMBEDDING_LATENCY, provider="openai", kind="documents"):
+            resp = await client.embeddings.create(model=model, input=batch, **extra)
 
         vectors.extend(d.embedding for d in resp.data)
         total_tokens += getattr(resp.usage, "total_tokens", 0)
@@ -37,10 +61,15 @@ async def embed_and_store_documents(
     texts = [doc.page_content for doc in docs]
 
     vectors = await _generate_embeddings(texts=texts)
-    vector_store: PGVector = get_vectorstore()
+    vector_store: "PGVector" = get_vectorstore()
+
+    metadatas = [doc.metadata for doc in docs]
+    with observe_latency(DB_QUERY_LATENCY, query="vector_store_add"):
+        ids = await vector_store.aadd_embeddings(
+            texts=texts,
+            metadatas=metadatas,
+            embeddings=vectors
+        )
 
-    await vector_store.aadd_embeddings(
-        texts=texts,
-        metadatas=[doc.metadata for doc in docs],
-        embeddings=vectors
-    )
+    # 인메모리 인덱스가 적재돼 있으면 같은 청크를 바로 반영
+    await add_to_vector_index(ids, texts, metadatas, vectors)
@@ -1,13 +1,29 @@
 # services/extraction_service.py
-"""LLM 기반 구조화된 정보 추출 서비스"""
-from typing import Optional
+"""
+LLM 기반 구조화된 정보 추출 서비스
+- 온라인 추출: with_structured_output + ainvoke
+- 백필용 배치 추출: OpenAI Batch API (비동기 작업 제출 후 폴링)
+- 내용 해시로 이미 추출한 텍스트는 건너뛴다 (structured_info.content_hash)
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import hashlib
+import json
 import logging
+import time
 
-from app.deps import get_chat_llm
+from app.deps import get_chat_llm, get_openai_client
+from app.settings import get_settings
 from models.announcement_parsed import AnnouncementParsedInfo
+from services.metrics_service import LLMMetricsCallbackHandler
+from services.token_service import truncate_tokens
 
 logger = logging.getLogger(__name__)
 
+# 프롬프트/스키마를 바꾸면 올려서 기존 추출 결과를 다시 만들게 한다 (content_hash에 포함)
+EXTRACTION_VERSION = "1"
+
 
 EXTRACTION_SYSTEM_PROMPT = """
 당신은 대학교 공지사항에서 중요한 정보를 추출하는 전문가입니다.
@@ -31,7 +47,93 @@ EXTRACTION_SYSTEM_PROMPT = """
 """
 
 
-def extract_structured_info(cleaned_text: str, title: str = "") -> Optional[AnnouncementParsedInfo]:
+def build_extraction_text(cleaned_text: Optional[str], ocr_text: Optional[str]) -> str:
+    """추출 입력 텍스트 (본문 + OCR, 토큰 상한으로 자름)."""
+    text = "\n".join(t for t in (cleaned_text, ocr_text) if t)
+    return truncate_tokens(text, get_settings().extraction_max_tokens)
+
+
+def content_hash(title: str, text: str) -> str:
+    """추출 입력이 바뀌었는지 판단하는 해시 (추출 버전 포함)."""
+    h = hashlib.sha256()
+    for part in (EXTRACTION_VERSION, title or "", text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _messages(text: str, title: str) -> List[Dict[str, str]]:
+    user_prompt = f"""
+    공지사항 제목: {title}
+
+    공지사항 내용:
+    {text}
+
+    위 공지사항에서 구조화된 정보를 추출해주세요.
+    """
+    return [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _parse_datetime(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    if not value:
+        return None
+    value = value.strip()
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            dt = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt == "%Y-%m-%d" and end_of_day:
+            # 날짜만 있는 마감일은 그날 끝까지 유효
+            dt = dt.replace(hour=23, minute=59)
+        return dt
+    logger.warning(f"Unparseable extracted date: {value!r}")
+    return None
+
+
+def _normalize_period(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    시작 > 마감인 기간 정리 (tsrange는 역전된 범위를 거부해 인덱스/조회/저장이 모두 실패한다).
+    - 연도를 넘는 기간("12.20 ~ 1.10")을 한 해로 적은 경우: 마감을 다음 해로
+    - 그 외에는 어느 쪽이 틀렸는지 알 수 없으므로 둘 다 버린다
+    """
+    if start is None or end is None or start <= end:
+        return start, end
+    if start.year == end.year and start.month > end.month:
+        try:
+            return start, end.replace(year=end.year + 1)
+        except ValueError:  # 2월 29일
+            pass
+    logger.warning(f"Dropping inverted application period: {start} ~ {end}")
+    return None, None
+
+
+def to_parsed_fields(info: AnnouncementParsedInfo, text_hash: str) -> Dict[str, Any]:
+    """추출 결과 → AnnouncementParsed 구조화 필드."""
+    start, end = _normalize_period(
+        _parse_datetime(info.application_period_start),
+        _parse_datetime(info.application_period_end, end_of_day=True),
+    )
+    return {
+        "application_period_start": start,
+        "application_period_end": end,
+        "target_departments": info.target_departments,
+        "target_grades": info.target_grades,
+        "tags": info.tags,
+        "structured_info": {
+            "additional_info": {item.key: item.value for item in (info.additional_info or [])},
+            "content_hash": text_hash,
+            "extraction_version": EXTRACTION_VERSION,
+        },
+    }
+
+
+async def extract_structured_info(cleaned_text: str, title: str = "") -> Optional[AnnouncementParsedInfo]:
     """
     LLM을 사용해서 공지사항에서 구조화된 정보 추출.
     LangChain의 with_structured_output()을 사용하여 JSON 출력 강제화.
@@ -46,18 +148,89 @@ def extract_structured_info(cleaned_text: str, title: str = "") -> Optional[Anno
     llm = get_chat_llm()
     structured_llm = llm.with_structured_output(AnnouncementParsedInfo)
 
-    user_prompt = f"""
-    공지사항 제목: {title}
-    
-    공지사항 내용:
-    {cleaned_text}
-    
-    위 공지사항에서 구조화된 정보를 추출해주세요.
+    return await structured_llm.ainvoke(
+        _messages(cleaned_text, title),
+        config={"callbacks": [LLMMetricsCallbackHandler(default_node="extraction")]},
+    )
+
+
+# ========== OpenAI Batch API (백필용) ==========
+
+def _batch_request(custom_id: str, text: str, title: str) -> Dict[str, Any]:
+    cfg = get_settings()
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": cfg.chat_model,
+            "temperature": cfg.temperature,
+            "messages": _messages(text, title),
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "AnnouncementParsedInfo",
+                    "schema": AnnouncementParsedInfo.model_json_schema(),
+                },
+            },
+        },
+    }
+
+
+async def extract_structured_info_batch(
+    items: List[Tuple[str, str, str]],
+) -> Dict[str, AnnouncementParsedInfo]:
     """
+    OpenAI Batch API로 여러 공지를 한 번에 추출 (온라인 요청보다 저렴, 대신 완료까지 수 분~수 시간).
+    extraction_batch_timeout 안에 끝나지 않으면 작업을 취소하고 빈 결과를 돌려준다.
 
-    result = structured_llm.invoke([
-        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-        {"role": "user", "content": user_prompt}
-    ])
+    Args:
+        items: (custom_id, 텍스트, 제목) 목록
+
+    Returns:
+        custom_id → 추출 결과 (실패/누락된 항목은 빠진다)
+    """
+    cfg = get_settings()
+    client = get_openai_client()
+
+    payload = "\n".join(
+        json.dumps(_batch_request(cid, text, title), ensure_ascii=False) for cid, text, title in items
+    ).encode("utf-8")
+    input_file = await client.files.create(file=("extraction.jsonl", payload), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    logger.info(f"Extraction batch {batch.id} submitted ({len(items)} requests)")
+
+    deadline = time.monotonic() + cfg.extraction_batch_timeout
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        if time.monotonic() > deadline:
+            logger.warning(f"Extraction batch {batch.id} timed out (status={batch.status}), cancelling")
+            await client.batches.cancel(batch.id)
+            return {}
+        await asyncio.sleep(cfg.extraction_batch_poll_seconds)
+        batch = await client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        logger.error(f"Extraction batch {batch.id} ended with status={batch.status}")
+        return {}
+
+    content = await client.files.content(batch.output_file_id)
+    results: Dict[str, AnnouncementParsedInfo] = {}
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        try:
+            message = response["body"]["choices"][0]["message"]["content"]
+            results[record["custom_id"]] = AnnouncementParsedInfo.model_validate_json(message)
+        except Exception as e:
+            logger.warning(f"Extraction batch result {record.get('custom_id')} unparseable: {e}")
 
-    return result
+    logger.info(f"Extraction batch {batch.id} completed: {len(results)}/{len(items)} parsed")
+    return results
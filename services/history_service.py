@@ -0,0 +1,54 @@
+# services/history_service.py
+"""
+대화 기록 압축 서비스 (LLM 호출 없음).
+긴 대화에서도 프롬프트의 대화 기록과 체크포인트의 messages 크기가 일정하도록
+- 최근 메시지 몇 개만 원문으로 (AI 답변은 토큰 상한으로 자름)
+- 그보다 오래된 메시지는 누적 요약으로 접는다: 사용자 질문 + AI 답변의 첫 문장
+  (생성 프롬프트가 답변을 질문의 핵심 키워드로 시작하게 하므로 첫 문장이 곧 요지)
+- 요약도 토큰 상한을 넘으면 오래된 줄부터 버린다
+"""
+import re
+from typing import List, Sequence
+
+from langchain_core.messages import BaseMessage
+
+from services.token_service import count_tokens, truncate_tokens
+
+__all__ = ["fold_summary", "format_history"]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n")
+# 요약 한 줄의 최대 토큰 (긴 질문/첫 문장이 요약 전체를 차지하지 않도록)
+_SUMMARY_LINE_TOKENS = 60
+
+
+def _first_sentence(text: str) -> str:
+    return _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+
+
+def _summary_line(message: BaseMessage) -> str:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if message.type == "ai":
+        content = _first_sentence(content)
+    return f"- {message.type}: {truncate_tokens(content.strip(), _SUMMARY_LINE_TOKENS)}"
+
+
+def fold_summary(summary: str, messages: Sequence[BaseMessage], max_tokens: int) -> str:
+    """기존 요약 뒤에 messages를 한 줄씩 덧붙이고, max_tokens를 넘으면 오래된 줄부터 버린다."""
+    lines = [line for line in summary.splitlines() if line]
+    lines += [_summary_line(m) for m in messages]
+    while lines and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def format_history(summary: str, recent: Sequence[BaseMessage], answer_tokens: int) -> str:
+    """프롬프트용 대화 기록: 이전 대화 요약 + 최근 메시지 (AI 답변은 answer_tokens까지)."""
+    parts: List[str] = []
+    if summary:
+        parts.append("(이전 대화 요약)\n" + summary)
+    for m in recent:
+        content = m.content if isinstance(m.content, str) else str(m.content)
+        if m.type == "ai":
+            content = truncate_tokens(content, answer_tokens)
+        parts.append(f"- {m.type}: {content}")
+    return "\n".join(parts)
@@ -1,88 +1,171 @@
 # services/html_processing_service.py
 """
-HTML 처리 및 OCR 오케스트레이션 서비스
-- HTML → 일반 텍스트 추출
-- HTML 내 이미지 → OCR 텍스트 추출
+HTML 처리 서비스
+- HTML을 한 번만 파싱(lxml)하고 한 번의 순회로 정제 텍스트 / 이미지 URL / 링크 / 표 구조를 추출
+- 정규식은 모듈 로드 시 한 번만 컴파일
 """
 import re
 import unicodedata
 import logging
-from bs4 import BeautifulSoup
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
 
-__all__ = ["get_plain_text", "extract_image_urls", "html_to_text"]
+import lxml.html
+from lxml import etree
+
+__all__ = ["ExtractedHtml", "extract_html", "get_plain_text", "extract_image_urls", "html_to_text"]
 
 logger = logging.getLogger(__name__)
 
 
-# ========== HTML → 텍스트 변환 ==========
+# ========== 정제 규칙 (precompiled) ==========
 
-def _clean_text(s: str) -> str:
-    """연속 개행/공백 압축 + trim."""
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = re.sub(r"\n{2,}", "\n", s)
-    s = re.sub(r"[ \t]{2,}", " ", s)
-    lines = [line.strip() for line in s.splitlines() if line.strip()]
-    return "\n".join(lines)
+_BLOCK_TAGS = frozenset({"br", "p", "div"})
+_SKIP_TAGS = frozenset({"script", "style"})
+_CELL_TAGS = frozenset({"td", "th"})
 
+# zero-width 문자 제거, nbsp → 공백, CR → LF
+_CHAR_TABLE = str.maketrans({
+    "\u200b": None, "\u200c": None, "\u200d": None, "\ufeff": None,
+    "\xa0": " ",
+    "\r": "\n",
+})
+# SmartEditor 잔류 물음표(깨진 공백) 정리: 주변 공백을 포함해 공백 하나로
+_QUESTION_MARK = re.compile(r"\s*\?\s*")
+_MULTI_SPACE = re.compile(r"[ \t]{2,}")
+# 콜론 앞뒤 이상 개행 보정: "행사명\n:\n" / "행사명:\n" / "\n: 값" → "행사명: "
+_COLON_BREAK = re.compile(r"\s*:\s*\n|\n\s*:\s*")
+# 영문/숫자 사이 개행 제거: "2025\n학년도" → "2025 학년도"
+_WORD_BREAK = re.compile(r"(\w)\n(\w)")
+_TRAILING_SPACE = re.compile(r" +(?=\n|$)")
 
-def html_to_text(html: str) -> str:
-    """
-    <br>/<p>/<div>는 개행으로 치환, 나머지 태그는 제거.
-    SmartEditor 특유의 제어문자·?·&nbsp;도 정제.
-    """
-    soup = BeautifulSoup(html or "", "lxml")
 
-    # 스크립트·스타일 제거
-    for t in soup(["script", "style"]):
-        t.decompose()
+@dataclass
+class ExtractedHtml:
+    """HTML 한 번 순회로 얻는 결과."""
+    text: str = ""                                                 # get_plain_text 결과
+    raw_text: str = ""                                             # html_to_text 결과 (구문 보정 전)
+    image_urls: List[str] = field(default_factory=list)            # 절대 URL, 등장 순서, 중복 제거
+    links: List[Tuple[str, str]] = field(default_factory=list)     # (href, 링크 텍스트)
+    tables: List[List[List[str]]] = field(default_factory=list)    # 표 → 행 → 셀 텍스트
 
-    # 주요 블록 태그를 개행 기준으로
-    for tag in soup.find_all(["br", "p", "div"]):
-        tag.insert_before("\n")
 
-    text = soup.get_text()
+def _clean_text(s: str) -> str:
+    """연속 공백 압축 + 줄 단위 trim + 빈 줄 제거."""
+    s = _MULTI_SPACE.sub(" ", s)
+    return "\n".join(line for line in (l.strip() for l in s.splitlines()) if line)
 
-    # 유니코드 정규화
-    text = unicodedata.normalize("NFC", text)
 
-    # 제어문자/공백/nbsp 정리
-    text = re.sub(r"[\u200b\u200c\u200d\uFEFF]", "", text)  # zero-width
-    text = text.replace("\xa0", " ")
+def _parse(html: str) -> Optional[etree._Element]:
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # 인코딩 선언(<?xml encoding=...?>)이 포함된 문자열은 bytes로 넘겨야 한다
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return None
 
-    # SmartEditor 잔류 물음표(깨진 공백) 정리
-    text = re.sub(r"(?<=\s)\?(?=\s)", " ", text)
-    text = re.sub(r"\s*\?\s*", " ", text)
-    text = re.sub(r"\?{2,}", "?", text)
 
-    return _clean_text(text)
+def _resolve(url: str, base_url: Optional[str]) -> str:
+    return urljoin(base_url, url) if base_url else url
 
 
-def get_plain_text(html: str) -> str:
-    """HTML → 텍스트 변환 + 구문 보정."""
-    s = html_to_text(html)
+def _table_rows(table: etree._Element) -> List[List[str]]:
+    rows = []
+    for tr in table.iter("tr"):
+        cells = [" ".join(td.text_content().split()) for td in tr if isinstance(td.tag, str) and td.tag in _CELL_TAGS]
+        if any(cells):
+            rows.append(cells)
+    return rows
+
 
-    # 콜론 앞뒤 이상 개행 보정: "행사명\n:\n" → "행사명: "
-    s = re.sub(r"\n\s*:\s*\n", ": ", s)
-    s = re.sub(r"\s*:\s*\n", ": ", s)
-    s = re.sub(r"\n\s*:\s*", ": ", s)
+def extract_html(html: str, base_url: Optional[str] = None) -> ExtractedHtml:
+    """
+    HTML을 한 번 파싱해 정제 텍스트, 이미지 URL, 링크, 표 구조를 함께 추출.
+    텍스트 규칙: <br>/<p>/<div> 앞은 개행, script/style·주석 제거, SmartEditor 잔류 문자 정제.
+    """
+    root = _parse(html)
+    if root is None:
+        return ExtractedHtml()
+
+    parts: List[str] = []
+    images: List[str] = []
+    seen_images = set()
+    links: List[Tuple[str, str]] = []
+    tables: List[List[List[str]]] = []
+
+    # 재귀 대신 명시적 스택 (closing=True 이면 tail 텍스트만 처리)
+    stack = [(root, False)]
+    while stack:
+        el, closing = stack.pop()
+        if closing:
+            if el.tail:
+                parts.append(el.tail)
+            continue
+
+        tag = el.tag
+        if not isinstance(tag, str) or tag in _SKIP_TAGS:
+            # 주석/처리 명령, script/style: 내용은 버리고 뒤따르는 텍스트만 유지
+            if el.tail:
+                parts.append(el.tail)
+            continue
+
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+        elif tag == "img":
+            src = (el.get("src") or "").strip()
+            if src:
+                src = _resolve(src, base_url)
+                if src not in seen_images:
+                    seen_images.add(src)
+                    images.append(src)
+        elif tag == "a":
+            href = (el.get("href") or "").strip()
+            if href and not href.startswith(("#", "javascript:")):
+                links.append((_resolve(href, base_url), " ".join(el.text_content().split())))
+        elif tag == "table":
+            rows = _table_rows(el)
+            if rows:
+                tables.append(rows)
+
+        if el.text:
+            parts.append(el.text)
+        stack.append((el, True))
+        stack.extend((child, False) for child in reversed(el))
+
+    text = "".join(parts).replace("\r\n", "\n")
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    text = text.translate(_CHAR_TABLE)
+    text = _QUESTION_MARK.sub(" ", text)
+    raw_text = _clean_text(text)
+
+    # 구문 보정. raw_text는 이미 줄 단위로 정리되어 있으므로 보정 뒤에는 줄 끝 공백만 남을 수 있다.
+    s = _COLON_BREAK.sub(": ", raw_text)
+    s = _WORD_BREAK.sub(r"\1 \2", s)
+    s = _TRAILING_SPACE.sub("", s)
+
+    return ExtractedHtml(text=s, raw_text=raw_text, image_urls=images, links=links, tables=tables)
 
-    # 영문/숫자 사이 개행 제거: "2025\n학년도" → "2025 학년도"
-    s = re.sub(r"(\w)\n(\w)", r"\1 \2", s)
 
-    return _clean_text(s)
+def html_to_text(html: str) -> str:
+    """
+    <br>/<p>/<div>는 개행으로 치환, 나머지 태그는 제거.
+    SmartEditor 특유의 제어문자·?·&nbsp;도 정제.
+    """
+    return extract_html(html).raw_text
+
+
+def get_plain_text(html: str) -> str:
+    """HTML → 텍스트 변환 + 구문 보정."""
+    return extract_html(html).text
 
 
-def extract_image_urls(html: str) -> list[str]:
+def extract_image_urls(html: str, base_url: Optional[str] = None) -> list[str]:
     """
-    HTML에서 이미지 URL들을 추출.
+    HTML에서 이미지 URL들을 추출 (base_url 기준 절대 URL, 중복 제거).
     """
-    soup = BeautifulSoup(html, "html.parser")
-    img_tags = soup.find_all("img")
-    
-    urls = []
-    for img in img_tags:
-        src = (img.get("src") or "").strip()
-        if src:
-            urls.append(src)
-            
-    return urls
+    return extract_html(html, base_url).image_urls
@@ -1,8 +1,8 @@
-import base64
 import ssl
 import logging
 import aiohttp
 import asyncio
+from typing import Optional
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -11,8 +11,53 @@ from tenacity import (
     before_sleep_log
 )
 
+from app.settings import get_settings
+from services.metrics_service import IMAGE_DOWNLOAD_LATENCY, timed
+
 logger = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 64 * 1024
+# 이미지 서버가 Content-Type을 잘못 주는 경우가 있어 일반 바이너리 타입도 허용
+_ALLOWED_CONTENT_TYPES = ("image/", "application/octet-stream", "binary/octet-stream")
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class ImageRejectedError(ValueError):
+    """크기 초과·비이미지 응답 등으로 다운로드를 중단한 경우 (재시도하지 않음)."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """공유 aiohttp 세션 (이벤트 루프별 lazy singleton)."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        cfg = get_settings()
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),  # 10초 → 30초로 증가
+            headers={"User-Agent": "uos-rag-ingest/1.0"},
+            connector=aiohttp.TCPConnector(ssl=ssl_context, limit=cfg.image_download_concurrency),
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_http_session() -> None:
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session, _session_loop = None, None
+
+
 @retry(
     stop=stop_after_attempt(3),  # 최대 3회 시도
     wait=wait_exponential(multiplier=1, min=1, max=5),  # 1초, 2초, 4초 대기
@@ -20,33 +65,40 @@ logger = logging.getLogger(__name__)
     before_sleep=before_sleep_log(logger, logging.WARNING),
     reraise=True
 )
-async def download_image_as_base64(url: str) -> str:
+@timed(IMAGE_DOWNLOAD_LATENCY)
+async def download_image(url: str) -> bytes:
     """
-    URL에서 이미지를 다운로드하고 Base64 문자열로 반환.
+    URL에서 이미지를 스트리밍으로 다운로드해 bytes로 반환.
+    Content-Type이 이미지가 아니거나 image_max_bytes를 넘으면 본문을 더 읽지 않고 중단한다.
 
     Args:
         url: 이미지 URL
 
     Returns:
-        Base64 encoded image string.
+        이미지 bytes
+
+    Raises:
+        ImageRejectedError: 비이미지 응답 또는 크기 초과
     """
-    timeout = aiohttp.ClientTimeout(total=30)  # 10초 → 30초로 증가
-
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-
-    connector = aiohttp.TCPConnector(ssl=ssl_context)
-    async with aiohttp.ClientSession(
-        timeout=timeout,
-        headers={"User-Agent": "uos-rag-ingest/1.0"},
-        connector=connector
-    ) as session:
-        async with session.get(url) as resp:
-            resp.raise_for_status()
-
-            # 이미지를 base64로 인코딩
-            img_data = await resp.read()
-            img_size_kb = len(img_data) / 1024
-            logger.info(f"이미지 다운로드 완료: {img_size_kb:.2f}KB")
-            return base64.b64encode(img_data).decode()
+    max_bytes = get_settings().image_max_bytes
+
+    async with _get_session().get(url) as resp:
+        resp.raise_for_status()
+
+        content_type = resp.headers.get("Content-Type", "").lower()
+        if content_type and not content_type.startswith(_ALLOWED_CONTENT_TYPES):
+            raise ImageRejectedError("not_image", f"Unexpected content type: {content_type}")
+        if resp.content_length is not None and resp.content_length > max_bytes:
+            raise ImageRejectedError("too_large", f"Image too large: {resp.content_length} bytes")
+
+        # 청크를 모아 마지막에 한 번만 이어 붙인다 (bytearray → bytes 변환으로 전체를 한 번 더 복사하지 않게)
+        chunks = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                raise ImageRejectedError("too_large", f"Image too large: > {max_bytes} bytes")
+
+    logger.info(f"이미지 다운로드 완료: {size / 1024:.2f}KB")
+    return b"".join(chunks)
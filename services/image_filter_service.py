@@ -0,0 +1,328 @@
+# services/image_filter_service.py
+"""
+OCR 전 이미지 선별 서비스.
+- URL 정규화 후 중복 제거, data: URI / 비대상 확장자 제외
+- 다운로드한 이미지의 내용 해시(SHA-1)로 중복 제외, 설정한 상용구(로고 등)는 지각 해시(dHash)로도 제외
+- 여러 공지에 반복되는 이미지는 작거나 OCR 글자가 거의 없을 때만 상용구로 제외 (글자가 많은 포스터는 OCR 결과 재사용)
+- 바이트 크기·가로세로 크기 기준으로 아이콘/스페이서 제외
+- 이미 OCR한 이미지(같은 내용 해시)는 결과를 재사용
+- 큰 이미지는 OCR 가능한 해상도로 축소·재압축 후 업로드
+"""
+import io
+import asyncio
+import hashlib
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from PIL import Image
+
+from app.settings import get_settings
+from services.metrics_service import OCR_IMAGES
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ImageFilterStats", "ImageInfo", "ImageFilter", "inspect_image", "downscale_for_ocr", "get_image_filter"]
+
+
+@dataclass
+class ImageFilterStats:
+    """한 번의 파싱 실행 동안의 이미지 선별 통계."""
+    total: int = 0                                     # 입력 이미지 URL 수
+    ocr_calls: int = 0                                 # 실제 OCR 요청 수
+    cache_hits: int = 0                                # 이전/진행 중 OCR 결과 재사용
+    download_failed: int = 0
+    skipped: Counter = field(default_factory=Counter)  # 사유별 제외 수
+
+    def seen(self, n: int) -> None:
+        self.total += n
+        OCR_IMAGES.labels(outcome="total").inc(n)
+
+    def skip(self, reason: str) -> None:
+        self.skipped[reason] += 1
+        OCR_IMAGES.labels(outcome=f"skipped_{reason}").inc()
+
+    def cache_hit(self) -> None:
+        self.cache_hits += 1
+        OCR_IMAGES.labels(outcome="cache_hit").inc()
+
+    def ocr_call(self) -> None:
+        self.ocr_calls += 1
+        OCR_IMAGES.labels(outcome="ocr").inc()
+
+    def download_failure(self) -> None:
+        self.download_failed += 1
+        OCR_IMAGES.labels(outcome="download_failed").inc()
+
+    @property
+    def avoided(self) -> int:
+        """선별/캐시로 생략한 OCR 호출 수."""
+        return sum(self.skipped.values()) + self.cache_hits
+
+    def summary(self) -> str:
+        reasons = ", ".join(f"{k}={v}" for k, v in sorted(self.skipped.items())) or "none"
+        return (f"images={self.total} ocr_calls={self.ocr_calls} avoided={self.avoided} "
+                f"(cache_hits={self.cache_hits}, skipped: {reasons}) download_failed={self.download_failed}")
+
+
+@dataclass
+class ImageInfo:
+    digest: str                          # SHA-1 (내용 해시)
+    size: int                            # bytes
+    width: Optional[int] = None
+    height: Optional[int] = None
+    phash: Optional[int] = None          # 64bit dHash
+
+
+def normalize_url(url: str) -> str:
+    """scheme/host 소문자화, fragment 제거."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+
+def _dhash(img: Image.Image) -> int:
+    """9x8 그레이스케일 축소 후 가로 인접 픽셀 비교로 만든 64bit difference hash."""
+    small = img.convert("L").resize((9, 8), Image.BILINEAR)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits
+
+
+def inspect_image(data: bytes) -> ImageInfo:
+    """내용 해시와 (가능하면) 크기·지각 해시 계산. 디코딩할 수 없는 이미지는 크기/해시 없이 반환."""
+    info = ImageInfo(digest=hashlib.sha1(data).hexdigest(), size=len(data))
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            info.width, info.height = img.size
+            info.phash = _dhash(img)
+    except Exception as e:
+        logger.debug(f"Image decode failed ({len(data)} bytes): {e}")
+    return info
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """JPEG 저장용 RGB 변환. 투명 영역은 흰 배경에 합성한다 (그냥 convert하면 검게 되어 글자가 사라진다)."""
+    if img.mode == "P" and "transparency" in img.info:
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA", "PA"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def downscale_for_ocr(data: bytes, max_side: int, min_bytes: int, quality: int) -> bytes:
+    """
+    긴 변이 max_side를 넘거나 min_bytes보다 큰 이미지를 축소·JPEG 재압축 (CPU 작업, 스레드에서 호출).
+    결과가 원본보다 크거나 디코딩에 실패하면 원본을 그대로 반환한다.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if max(img.size) <= max_side and len(data) <= min_bytes:
+                return data
+            img.draft("RGB", (max_side, max_side))  # JPEG는 디코딩 단계에서 축소 (메모리 절약)
+            out = _to_rgb(img)
+            out.thumbnail((max_side, max_side), Image.LANCZOS)
+            buf = io.BytesIO()
+            out.save(buf, "JPEG", quality=quality, optimize=True)
+    except Exception as e:
+        logger.debug(f"Image downscale skipped ({len(data)} bytes): {e}")
+        return data
+
+    resized = buf.getvalue()
+    return resized if len(resized) < len(data) else data
+
+
+class ImageFilter:
+    """프로세스 단위로 공유되는 이미지 선별기 (상용구 판정 카운트와 OCR 결과 캐시를 유지)."""
+
+    def __init__(
+        self,
+        min_bytes: int,
+        min_side: int,
+        skip_extensions: Iterable[str],
+        skip_hashes: Iterable[str],
+        boilerplate_min_notices: int,
+        boilerplate_max_side: int,
+        boilerplate_max_chars: int,
+        phash_distance: int,
+        cache_size: int,
+        track_size: int,
+    ):
+        self.min_bytes = min_bytes
+        self.min_side = min_side
+        self.skip_extensions = tuple(e.lower() for e in skip_extensions)
+        self.phash_distance = phash_distance
+        self.boilerplate_min_notices = boilerplate_min_notices
+        self.boilerplate_max_side = boilerplate_max_side
+        self.boilerplate_max_chars = boilerplate_max_chars
+        self.cache_size = cache_size
+        self.track_size = track_size
+
+        # 설정의 상용구 해시: 40자리 → SHA-1, 16자리 → dHash(hex)
+        hashes = [h.strip().lower() for h in skip_hashes if h.strip()]
+        self._boilerplate_digests = {h for h in hashes if len(h) == 40}
+        self._boilerplate_phashes = [int(h, 16) for h in hashes if len(h) == 16]
+
+        # 내용 해시 → 그 이미지가 나온 공지 ID (LRU, 최대 track_size개 해시)
+        self._notice_ids: "OrderedDict[str, Set[Hashable]]" = OrderedDict()
+        # OCR 텍스트가 boilerplate_max_chars보다 짧았던 내용 해시 (LRU, 최대 track_size개)
+        self._short_text: "OrderedDict[str, None]" = OrderedDict()
+        self._ocr_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    # ---------- URL 단계 ----------
+
+    def select_urls(self, urls: List[str], stats: ImageFilterStats) -> List[str]:
+        """다운로드 전에 걸러낼 수 있는 URL 제외 (중복, data: URI, 비대상 확장자)."""
+        selected = []
+        seen = set()
+        stats.seen(len(urls))
+        for url in urls:
+            if url.startswith("data:"):
+                stats.skip("data_uri")
+                continue
+            norm = normalize_url(url)
+            if norm in seen:
+                stats.skip("duplicate_url")
+                continue
+            seen.add(norm)
+            if urlsplit(norm).path.lower().endswith(self.skip_extensions):
+                stats.skip("extension")
+                continue
+            selected.append(url)
+        return selected
+
+    # ---------- 내용 단계 ----------
+
+    def _near_boilerplate(self, phash: Optional[int]) -> bool:
+        if phash is None:
+            return False
+        return any(bin(phash ^ known).count("1") <= self.phash_distance for known in self._boilerplate_phashes)
+
+    def skip_reason(self, info: ImageInfo) -> Optional[str]:
+        """OCR 대상이 아니면 제외 사유, 대상이면 None."""
+        if info.width is None:
+            # 디코딩 불가 (HTML 에러 페이지, 손상 파일 등)
+            return "undecodable"
+        if info.size < self.min_bytes:
+            return "too_small_bytes"
+        if min(info.width, info.height) < self.min_side:
+            return "too_small_dims"
+        if info.digest in self._boilerplate_digests or self._near_boilerplate(info.phash):
+            return "boilerplate"
+        if len(self._notice_ids.get(info.digest, ())) >= self.boilerplate_min_notices and (
+            max(info.width, info.height) <= self.boilerplate_max_side or info.digest in self._short_text
+        ):
+            # 여러 공지에 반복해서 나오는 작은 이미지나 글자가 거의 없던 이미지(학교 로고, 공통 배너 등)
+            # 반복 게시되는 장학/모집 포스터처럼 글자가 많은 이미지는 OCR 결과 캐시를 재사용한다
+            return "boilerplate"
+        return None
+
+    def dedupe(self, infos: List[ImageInfo], stats: ImageFilterStats) -> List[int]:
+        """
+        한 공지 안에서 내용(SHA-1)이 같은 이미지를 제외하고 남길 인덱스 반환.
+        지각 해시는 쓰지 않는다: 같은 양식의 다른 페이지(표 서식 등)도 dHash가 가까워 OCR 텍스트가 사라진다.
+        """
+        keep: List[int] = []
+        digests = set()
+        for i, info in enumerate(infos):
+            if info.digest in digests:
+                stats.skip("duplicate_content")
+                continue
+            digests.add(info.digest)
+            keep.append(i)
+        return keep
+
+    def observe_notice(self, infos: List[ImageInfo], notice_id: Optional[Hashable] = None) -> None:
+        """
+        공지 하나에서 본 이미지를 상용구 판정에 반영 (같은 공지를 다시 파싱해도 한 번만 센다).
+        notice_id가 없으면 호출마다 다른 공지로 본다.
+        """
+        if notice_id is None:
+            notice_id = object()
+        for digest in {info.digest for info in infos}:
+            ids = self._notice_ids.get(digest)
+            if ids is None:
+                ids = self._notice_ids[digest] = set()
+            else:
+                self._notice_ids.move_to_end(digest)
+            if len(ids) < self.boilerplate_min_notices:
+                # 판정에는 boilerplate_min_notices개까지만 필요
+                ids.add(notice_id)
+        while len(self._notice_ids) > self.track_size:
+            self._notice_ids.popitem(last=False)
+
+    # ---------- OCR 결과 캐시 ----------
+
+    def _remember(self, digest: str, text: str) -> None:
+        self._ocr_cache[digest] = text
+        self._ocr_cache.move_to_end(digest)
+        while len(self._ocr_cache) > self.cache_size:
+            self._ocr_cache.popitem(last=False)
+
+    def claim(self, digest: str, stats: ImageFilterStats) -> Tuple[asyncio.Future, bool]:
+        """
+        같은 내용 해시의 이미지는 한 번만 OCR하기 위한 예약.
+        반환: (결과 future, 호출자가 직접 OCR해야 하는지)
+        - 캐시에 있으면 완료된 future
+        - 다른 공지에서 OCR 중이면 그 future (결과 공유)
+        - 처음이면 새 future를 만들고 호출자가 OCR 후 settle()로 결과를 채운다
+        """
+        cached = self._ocr_cache.get(digest)
+        if cached is not None:
+            self._ocr_cache.move_to_end(digest)
+            stats.cache_hit()
+            fut = asyncio.get_running_loop().create_future()
+            fut.set_result(cached)
+            return fut, False
+
+        pending = self._pending.get(digest)
+        if pending is not None:
+            stats.cache_hit()
+            return pending, False
+
+        stats.ocr_call()
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[digest] = fut
+        return fut, True
+
+    def settle(self, digest: str, result: Union[str, BaseException]) -> None:
+        """claim()으로 예약한 OCR 결과(또는 예외)를 기록."""
+        fut = self._pending.pop(digest, None)
+        if isinstance(result, BaseException):
+            if fut is not None and not fut.done():
+                fut.set_exception(result)
+            return
+        self._remember(digest, result)
+        if len(result.strip()) < self.boilerplate_max_chars:
+            self._short_text[digest] = None
+            self._short_text.move_to_end(digest)
+            while len(self._short_text) > self.track_size:
+                self._short_text.popitem(last=False)
+        if fut is not None and not fut.done():
+            fut.set_result(result)
+
+
+@lru_cache(maxsize=1)
+def get_image_filter() -> ImageFilter:
+    cfg = get_settings()
+    return ImageFilter(
+        min_bytes=cfg.ocr_min_image_bytes,
+        min_side=cfg.ocr_min_image_side,
+        skip_extensions=cfg.ocr_skip_extensions,
+        skip_hashes=cfg.ocr_boilerplate_hashes,
+        boilerplate_min_notices=cfg.ocr_boilerplate_min_notices,
+        boilerplate_max_side=cfg.ocr_boilerplate_max_side,
+        boilerplate_max_chars=cfg.ocr_boilerplate_max_chars,
+        phash_distance=cfg.ocr_phash_distance,
+        cache_size=cfg.ocr_cache_size,
+        track_size=cfg.ocr_boilerplate_track_size,
+    )
@@ -0,0 +1,86 @@
+# services/local_embedding_service.py
+"""
+로컬 문장 임베딩 백엔드 (embed_provider=huggingface).
+- langchain-huggingface(sentence-transformers)로 프로세스 안에서 임베딩 (torch / onnx / openvino)
+- 양자화 ONNX 모델 파일 지정 가능 (예: onnx/model_qint8_avx512.onnx)
+- 동시에 들어온 질의 임베딩은 마이크로 배처로 모아 한 번에 인코딩
+- 인코딩은 전용 스레드 1개에서 실행 (모델 내부 연산 스레드가 코어를 사용, 이벤트 루프는 막지 않음)
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from services.batching_service import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["LocalEmbeddings"]
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers 모델을 감싼 LangChain Embeddings.
+    query_prefix / document_prefix: e5 계열처럼 질의/문서 접두어가 필요한 모델용 ("query: ", "passage: ")
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch",
+        device: str = "cpu",
+        onnx_file: str = "",
+        query_prefix: str = "",
+        document_prefix: str = "",
+        max_batch: int = 32,
+        window_ms: float = 5.0,
+    ):
+        # 선택 의존성: 로컬 백엔드를 쓸 때만 sentence-transformers를 불러온다
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "embed_provider=huggingface requires sentence-transformers: "
+                "pip install -r requirements-local-embed.txt"
+            ) from e
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        model_kwargs = {"device": device}
+        if backend != "torch":
+            model_kwargs["backend"] = backend
+        if onnx_file:
+            model_kwargs["model_kwargs"] = {"file_name": onnx_file}
+
+        self._model = HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs=model_kwargs,
+            encode_kwargs={"normalize_embeddings": True, "batch_size": max_batch},
+        )
+        self.query_prefix = query_prefix
+        self.document_prefix = document_prefix
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-embed")
+        self._query_batcher: MicroBatcher[str, List[float]] = MicroBatcher(
+            self._aencode, max_batch=max_batch, window_ms=window_ms, name="local_query_embedding",
+        )
+        logger.info(f"Local embedding model loaded: {model_name} (backend={backend}, device={device})")
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        return self._model.embed_documents(texts)
+
+    async def _aencode(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._encode, texts)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode([self.document_prefix + t for t in texts])
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([self.query_prefix + text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # 인제스트는 이미 배치 단위로 들어오므로 바로 인코딩
+        return await self._aencode([self.document_prefix + t for t in texts])
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self._query_batcher.submit(self.query_prefix + text)
@@ -0,0 +1,304 @@
+# services/metrics_service.py
+"""
+Prometheus 메트릭 정의 및 계측 헬퍼.
+- 그래프 노드별 지연시간, 모델별 토큰 사용량
+- 검색 후보 수, 검색 깊이 결정(사유별), 재시도 루프 횟수
+- 답변 신뢰도, 검증 방식(full / skip / sample), 생략된 검증의 사후 판정
+- OCR / 이미지 다운로드 / 임베딩 / DB 쿼리 소요 시간
+- 질의 임베딩 캐시 적중, 마이크로 배치 크기
+- 시작 시 warm-up 단계별 소요 시간
+- /chat 수락 제어 결과 / 처리 중 요청 수 / 대기열 대기 시간
+- OCR 전 이미지 선별 결과 (생략된 OCR 호출 수)
+- OCR 스케줄러 대기 시간 / 동시 요청 수 / 적응형 동시성 한도
+"""
+import time
+import inspect
+import functools
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+__all__ = [
+    "NODE_LATENCY",
+    "LLM_TOKENS",
+    "CHAT_LATENCY",
+    "RETRIEVAL_CANDIDATES",
+    "RETRIEVAL_DEPTH",
+    "RETRY_LOOPS",
+    "REQUEST_ATTEMPTS",
+    "ANSWER_CONFIDENCE",
+    "VALIDATION_MODE",
+    "VALIDATION_SHADOW",
+    "OCR_LATENCY",
+    "IMAGE_DOWNLOAD_LATENCY",
+    "OCR_IMAGES",
+    "OCR_QUEUE_WAIT",
+    "OCR_INFLIGHT",
+    "OCR_CONCURRENCY_LIMIT",
+    "EMBEDDING_LATENCY",
+    "EMBEDDING_CACHE",
+    "MICROBATCH_SIZE",
+    "DB_QUERY_LATENCY",
+    "STARTUP_SECONDS",
+    "CHAT_ADMISSION",
+    "CHAT_INFLIGHT",
+    "CHAT_QUEUE_WAIT",
+    "observe_latency",
+    "timed",
+    "instrument_node",
+    "record_token_usage",
+    "LLMMetricsCallbackHandler",
+    "render_metrics",
+    "CONTENT_TYPE_LATEST",
+]
+
+logger = logging.getLogger(__name__)
+
+# LLM/OCR 호출은 수백 ms ~ 수십 초, DB/벡터 검색은 수 ms ~ 수백 ms 범위
+_LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+_IO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+# ========== 메트릭 정의 ==========
+
+NODE_LATENCY = Histogram(
+    "rag_node_latency_seconds",
+    "채팅 그래프 노드별 실행 시간",
+    ["node", "status"],
+    buckets=_LLM_BUCKETS,
+)
+CHAT_LATENCY = Histogram(
+    "rag_chat_latency_seconds",
+    "/chat 요청 전체 처리 시간",
+    ["status"],
+    buckets=_LLM_BUCKETS,
+)
+CHAT_ADMISSION = Counter(
+    "rag_chat_admission_total",
+    "/chat 수락 제어 결과 (admitted / degraded / rejected_queue_full / rejected_timeout)",
+    ["result"],
+)
+CHAT_INFLIGHT = Gauge(
+    "rag_chat_inflight_requests",
+    "처리 중인 /chat 요청 수",
+)
+CHAT_QUEUE_WAIT = Histogram(
+    "rag_chat_queue_wait_seconds",
+    "/chat 요청이 처리 슬롯을 받기까지 대기한 시간",
+    buckets=_IO_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM 토큰 사용량 (노드/프로바이더/모델/토큰 종류별: input / output / cache_read)",
+    ["node", "provider", "model", "type"],
+)
+RETRIEVAL_CANDIDATES = Histogram(
+    "rag_retrieval_candidates",
+    "retrieve 노드가 반환한 문서(청크) 수",
+    buckets=(0, 1, 2, 4, 6, 8, 10, 15, 20, 30, 50),
+)
+RETRIEVAL_DEPTH = Histogram(
+    "rag_retrieval_depth",
+    "거리 분포로 정한 검색 깊이 (gap / margin / flat / base / fixed / retry)",
+    ["reason"],
+    buckets=(1, 2, 3, 4, 6, 8, 10, 12, 16, 20),
+)
+RETRY_LOOPS = Counter(
+    "rag_retry_loops_total",
+    "validate → refine_query 재시도 루프 횟수",
+)
+REQUEST_ATTEMPTS = Histogram(
+    "rag_request_attempts",
+    "요청당 재시도 횟수 분포",
+    buckets=(0, 1, 2, 3, 4, 5),
+)
+ANSWER_CONFIDENCE = Histogram(
+    "rag_answer_confidence",
+    "LLM 없이 계산한 답변 신뢰도 (검색 거리 + 답변-근거 겹침)",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 1.0),
+)
+VALIDATION_MODE = Counter(
+    "rag_validation_mode_total",
+    "답변 검증 방식 (full: 응답 전 검증 / skip: 생략 / sample: 생략 후 백그라운드 검증)",
+    ["mode"],
+)
+VALIDATION_SHADOW = Counter(
+    "rag_validation_shadow_total",
+    "검증을 생략한 답변을 백그라운드로 검증한 결과 (RETRY 비율 = 생략으로 놓친 재시도 추정)",
+    ["decision"],
+)
+OCR_LATENCY = Histogram(
+    "ocr_request_seconds",
+    "OCR 요청 1회 시간 (gemini_batch: 여러 이미지를 담은 요청)",
+    ["provider", "status"],
+    buckets=_LLM_BUCKETS,
+)
+IMAGE_DOWNLOAD_LATENCY = Histogram(
+    "image_download_seconds",
+    "OCR 대상 이미지 다운로드 시간",
+    ["status"],
+    buckets=_IO_BUCKETS,
+)
+OCR_IMAGES = Counter(
+    "ocr_images_total",
+    "OCR 대상 이미지 처리 결과 (total / ocr / cache_hit / skipped_<사유> / download_failed)",
+    ["outcome"],
+)
+OCR_QUEUE_WAIT = Histogram(
+    "ocr_queue_wait_seconds",
+    "OCR 스케줄러 슬롯 대기 시간",
+    ["provider", "priority"],
+    buckets=_LLM_BUCKETS,
+)
+OCR_INFLIGHT = Gauge(
+    "ocr_inflight_requests",
+    "진행 중인 OCR 요청 수",
+    ["provider"],
+)
+OCR_CONCURRENCY_LIMIT = Gauge(
+    "ocr_concurrency_limit",
+    "OCR 프로바이더별 현재 동시성 한도 (적응형)",
+    ["provider"],
+)
+EMBEDDING_LATENCY = Histogram(
+    "embedding_request_seconds",
+    "임베딩 요청 시간 (query: 검색 질의 1건 대기 시간, query_batch: 질의 묶음 API 호출, documents: 인제스트 배치)",
+    ["provider", "kind", "status"],
+    buckets=_IO_BUCKETS,
+)
+EMBEDDING_CACHE = Counter(
+    "embedding_query_cache_total",
+    "질의 임베딩 캐시 결과 (hit: LRU / inflight: 진행 중인 요청 공유 / miss: 새 요청)",
+    ["result"],
+)
+MICROBATCH_SIZE = Histogram(
+    "microbatch_size",
+    "마이크로 배처가 한 번에 보낸 요청 수",
+    ["name"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_seconds",
+    "DB / 벡터 스토어 쿼리 시간",
+    ["query", "status"],
+    buckets=_IO_BUCKETS,
+)
+STARTUP_SECONDS = Gauge(
+    "app_startup_seconds",
+    "시작 시 warm-up 단계별 소요 시간 (total: 전체)",
+    ["phase"],
+)
+
+
+# ========== 계측 헬퍼 ==========
+
+@contextmanager
+def observe_latency(histogram: Histogram, **labels: str):
+    """
+    with 블록의 실행 시간을 histogram에 기록.
+    예외가 발생하면 status="error", 정상 종료면 status="success" 라벨을 붙인다.
+    """
+    start = time.perf_counter()
+    status = "success"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        histogram.labels(status=status, **labels).observe(time.perf_counter() - start)
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable:
+    """함수(동기/비동기) 실행 시간을 기록하는 데코레이터."""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with observe_latency(histogram, **labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def sync_wrapper(*args, **kwargs):
+            with observe_latency(histogram, **labels):
+                return fn(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """
+    LangGraph 노드 함수를 감싸 노드별 지연시간을 기록.
+    functools.wraps로 원본 시그니처를 유지하므로 config 주입 등 LangGraph 동작은 그대로다.
+    """
+    return timed(NODE_LATENCY, node=name)(fn)
+
+
+def record_token_usage(node: str, provider: str, model: str, usage: Dict[str, Any]) -> None:
+    """
+    usage_metadata(input_tokens/output_tokens)를 토큰 카운터에 누적.
+    프롬프트 캐시에서 읽은 입력 토큰(input_token_details.cache_read)은 type="cache_read"로 따로 센다
+    (input에 포함된 값, 적중률 = cache_read / input).
+    """
+    counts = {
+        "input": usage.get("input_tokens") or 0,
+        "output": usage.get("output_tokens") or 0,
+        "cache_read": (usage.get("input_token_details") or {}).get("cache_read") or 0,
+    }
+    for token_type, count in counts.items():
+        if count:
+            LLM_TOKENS.labels(node=node, provider=provider, model=model, type=token_type).inc(count)
+
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LLM 호출이 끝날 때 usage_metadata를 노드/프로바이더/모델 라벨로 집계하는 콜백.
+    노드 이름은 LangGraph가 채워주는 metadata["langgraph_node"]를 사용한다.
+    """
+
+    run_inline = True
+
+    def __init__(self, default_node: str = "unknown"):
+        super().__init__()
+        self.default_node = default_node
+        self._runs: Dict[UUID, Tuple[str, str, str]] = {}
+
+    def _remember(self, run_id: UUID, metadata: Optional[Dict[str, Any]]) -> None:
+        md = metadata or {}
+        self._runs[run_id] = (
+            md.get("langgraph_node") or self.default_node,
+            md.get("ls_provider") or "unknown",
+            md.get("ls_model_name") or "unknown",
+        )
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        self._remember(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        self._remember(run_id, metadata)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._runs.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        node, provider, model = self._runs.pop(run_id, (self.default_node, "unknown", "unknown"))
+        for generations in response.generations:
+            for gen in generations:
+                message = getattr(gen, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                model_name = (message.response_metadata or {}).get("model_name") or model
+                record_token_usage(node, provider, model_name, usage)
+
+
+def render_metrics() -> bytes:
+    """/metrics 응답 본문 (Prometheus text exposition format)."""
+    return generate_latest()
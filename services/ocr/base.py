@@ -1,24 +1,52 @@
 import logging
 import asyncio
 from abc import ABC, abstractmethod
-from services.image_download_service import download_image_as_base64
+from typing import Hashable, Optional
+from app.settings import get_settings
+from services.image_download_service import ImageRejectedError, download_image
+from services.image_filter_service import ImageFilterStats, downscale_for_ocr, get_image_filter, inspect_image
 
 logger = logging.getLogger(__name__)
 
 class BaseOCRService(ABC):
     @abstractmethod
-    async def extract_text_from_image(self, img_base64: str) -> str:
+    async def extract_text_from_image(self, image: bytes) -> str:
         """
-        Extract text from a base64 encoded image.
+        Extract text from an image.
         
         Args:
-            img_base64: Base64 encoded image string.
+            image: Raw image bytes. Providers encode at their own API boundary.
             
         Returns:
             Extracted text.
         """
         pass
 
+    async def extract_text_from_images(self, images: list[bytes]) -> list[str | BaseException]:
+        """
+        같은 공지의 여러 이미지 OCR. 기본 구현은 이미지별 병렬 요청이며,
+        한 요청에 여러 이미지를 담을 수 있는 프로바이더는 재정의한다.
+
+        Returns:
+            입력 순서대로 OCR 텍스트 또는 예외
+        """
+        return await asyncio.gather(
+            *(self.extract_text_from_image(img) for img in images),
+            return_exceptions=True,
+        )
+
+    async def _prepare_images(self, images: list[bytes]) -> list[bytes]:
+        """업로드 전 큰 이미지 축소·재압축 (ocr_downscale, 스레드에서 실행)."""
+        cfg = get_settings()
+        if not cfg.ocr_downscale:
+            return images
+        return await asyncio.gather(*(
+            asyncio.to_thread(
+                downscale_for_ocr, img, cfg.ocr_max_image_side, cfg.ocr_recompress_min_bytes, cfg.ocr_jpeg_quality
+            )
+            for img in images
+        ))
+
     async def extract_text_from_url(self, url: str) -> str:
         """
         URL에서 이미지를 다운로드하고 OCR 수행.
@@ -29,16 +57,25 @@ class BaseOCRService(ABC):
         Returns:
             Extracted text.
         """
-        img_base64 = await download_image_as_base64(url)
-        return await self.extract_text_from_image(img_base64)
+        return await self.extract_text_from_image(await download_image(url))
 
-    async def extract_text_from_urls(self, urls: list[str]) -> tuple[str | None, str | None]:
+    async def extract_text_from_urls(
+        self,
+        urls: list[str],
+        stats: Optional[ImageFilterStats] = None,
+        notice_id: Optional[Hashable] = None,
+    ) -> tuple[str | None, str | None]:
         """
-        여러 이미지 URL에 대해 병렬로 OCR을 수행하고 결과를 반환.
-        
+        여러 이미지 URL 중 OCR할 가치가 있는 이미지만 골라 병렬로 OCR을 수행하고 결과를 반환.
+        - URL 중복 / data: URI / 비대상 확장자는 다운로드 전에 제외
+        - 다운로드 후 크기·해상도 미달, 상용구(로고 등), 같은 공지 안의 중복 이미지 제외
+        - 이미 OCR한 이미지(같은 내용 해시)는 결과 재사용
+
         Args:
             urls: 이미지 URL 리스트
-            
+            stats: 실행 단위 선별 통계 (없으면 이 호출에서만 집계)
+            notice_id: 공지 ID (상용구 판정에서 같은 공지를 중복으로 세지 않도록)
+
         Returns:
             tuple[str | None, str | None]: (OCR 텍스트, 에러 요약)
                 - OCR 텍스트: 성공한 이미지들의 OCR 결과 (없으면 None)
@@ -47,15 +84,65 @@ class BaseOCRService(ABC):
         if not urls:
             return None, None
 
-        # 병렬 OCR 수행
-        ocr_tasks = [self.extract_text_from_url(url) for url in urls]
-        ocr_results = await asyncio.gather(*ocr_tasks, return_exceptions=True)
+        stats = stats if stats is not None else ImageFilterStats()
+        image_filter = get_image_filter()
+
+        # 1. URL 단계 선별 후 병렬 다운로드
+        urls = image_filter.select_urls(urls, stats)
+        downloads = await asyncio.gather(*(download_image(url) for url in urls), return_exceptions=True)
 
-        # 결과 처리
-        valid_ocr_results = []
         failed_images = []
+        images = []  # (이미지 번호, bytes)
+        for i, result in enumerate(downloads):
+            if isinstance(result, ImageRejectedError):
+                stats.skip(result.reason)
+            elif isinstance(result, Exception):
+                stats.download_failure()
+                failed_images.append(f"Image {i+1}: {type(result).__name__}: {str(result)}")
+                logger.error(f"Image download failed for image {i+1}: {str(result)}")
+            else:
+                images.append((i, result))
+
+        # 2. 내용 단계 선별 (디코딩·해시 계산은 스레드에서)
+        infos = await asyncio.gather(*(asyncio.to_thread(inspect_image, data) for _, data in images))
+        candidates = []
+        for k in image_filter.dedupe(infos, stats):
+            reason = image_filter.skip_reason(infos[k])
+            if reason:
+                stats.skip(reason)
+                continue
+            candidates.append(k)
+        image_filter.observe_notice(infos, notice_id)
+
+        # 3. 남은 이미지만 OCR (같은 이미지는 한 번만)
+        futures = []
+        to_run = []
+        for k in candidates:
+            fut, owner = image_filter.claim(infos[k].digest, stats)
+            futures.append(fut)
+            if owner:
+                to_run.append(k)
+
+        if to_run:
+            try:
+                results = await self.extract_text_from_images(await self._prepare_images([images[k][1] for k in to_run]))
+            except asyncio.CancelledError:
+                # 같은 이미지를 기다리는 다른 공지가 멈추지 않도록 예약을 해제
+                for k in to_run:
+                    image_filter.settle(infos[k].digest, RuntimeError("OCR cancelled"))
+                raise
+            except Exception as e:
+                results = [e] * len(to_run)
+            for k, result in zip(to_run, results):
+                image_filter.settle(infos[k].digest, result)
+
+        # 다른 공지와 공유하는 future가 이 호출의 취소로 함께 취소되지 않도록 shield
+        ocr_results = await asyncio.gather(*(asyncio.shield(f) for f in futures), return_exceptions=True)
 
-        for i, result in enumerate(ocr_results):
+        # 결과 처리
+        valid_ocr_results = []
+        for k, result in zip(candidates, ocr_results):
+            i = images[k][0]
             if isinstance(result, str):
                 if result.strip():
                     valid_ocr_results.append(result)
@@ -69,12 +156,13 @@ class BaseOCRService(ABC):
 
         # 에러 요약 생성
         ocr_error = None
+        attempted = len(urls)
         if failed_images:
             if not valid_ocr_results:
-                ocr_error = f"All {len(urls)} images failed OCR: {'; '.join(failed_images[:3])}"
+                ocr_error = f"All {attempted} images failed OCR: {'; '.join(failed_images[:3])}"
             else:
-                ocr_error = f"Partial OCR failure: {len(failed_images)}/{len(urls)} images failed"
-        
+                ocr_error = f"Partial OCR failure: {len(failed_images)}/{attempted} images failed"
+
         ocr_text = "\n".join(valid_ocr_results) if valid_ocr_results else None
-        
+
         return ocr_text, ocr_error
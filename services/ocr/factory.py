@@ -1,7 +1,5 @@
 from app.settings import get_settings
 from services.ocr.base import BaseOCRService
-from services.ocr.gemini_ocr_service import GeminiOCRService
-from services.ocr.upstage_ocr_service import UpstageOCRService
 
 
 def get_ocr_service() -> BaseOCRService:
@@ -13,9 +11,10 @@ def get_ocr_service() -> BaseOCRService:
     """
     ocr_provider = get_settings().ocr_provider.lower()
 
-    if ocr_provider == "gemini":
-        return GeminiOCRService()
-    elif ocr_provider == "upstage":
+    # 선택된 프로바이더 모듈만 import
+    if ocr_provider == "upstage":
+        from services.ocr.upstage_ocr_service import UpstageOCRService
         return UpstageOCRService()
 
+    from services.ocr.gemini_ocr_service import GeminiOCRService
     return GeminiOCRService()
@@ -1,3 +1,4 @@
+import re
 import base64
 import asyncio
 import logging
@@ -10,11 +11,44 @@ from tenacity import (
   before_sleep_log
 )
 from app.deps import get_gemini_llm
+from app.settings import get_settings
 from services.ocr.base import BaseOCRService
 from langchain_core.callbacks import UsageMetadataCallbackHandler
+from services.metrics_service import OCR_LATENCY, LLMMetricsCallbackHandler, observe_latency
+from services.ocr.scheduler import get_ocr_scheduler
 
 logger = logging.getLogger(__name__)
 
+# 배치 응답의 이미지 구분선: "<<<IMAGE 1>>>"
+_IMAGE_MARKER = re.compile(r"^\s*<<<IMAGE (\d+)>>>\s*$", re.MULTILINE)
+
+
+def plan_batches(images: list[bytes], max_images: int, max_bytes: int) -> list[list[int]]:
+    """이미지 인덱스를 요청 단위로 묶음 (개수·총 bytes 상한, 입력 순서 유지)."""
+    batches, current, current_bytes = [], [], 0
+    for i, img in enumerate(images):
+        size = len(img)
+        if current and (len(current) >= max_images or current_bytes + size > max_bytes):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(i)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def split_batch_output(text: str, n: int) -> dict[int, str]:
+    """배치 응답을 이미지 번호(0-based)별 텍스트로 분리. 구분선이 없는 이미지는 빠진다."""
+    parts = {}
+    matches = list(_IMAGE_MARKER.finditer(text))
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        idx = int(m.group(1)) - 1
+        if 0 <= idx < n and idx not in parts:
+            parts[idx] = text[m.end():nxt.start() if nxt else len(text)].strip()
+    return parts
+
+
 class GeminiOCRService(BaseOCRService):
     def __init__(self):
         self.system_prompt = """
@@ -28,6 +62,38 @@ class GeminiOCRService(BaseOCRService):
             - 불필요한 수식어/중복 제거
             - 표/레이아웃/좌표/메타데이터 금지
         """
+        self.batch_prompt = """
+            아래 {n}개의 이미지를 각각 OCR하고, 이미지마다 핵심만 요약해 주세요.
+            - 이미지별 최대 1500자 이내
+            - 불필요한 수식어/중복 제거
+            - 표/레이아웃/좌표/메타데이터 금지
+            - 이미지 순서대로, 각 요약 앞에 구분선 한 줄을 그대로 출력: <<<IMAGE 번호>>>
+            - 글자가 없는 이미지는 구분선 아래를 비워 두세요
+        """
+
+    async def _invoke(self, content: list[dict], provider_label: str, size_kb: float) -> str:
+        """Gemini 호출 1회 (스케줄러 슬롯 + 지연/토큰 계측)."""
+        model = get_gemini_llm()
+        usage_callback = UsageMetadataCallbackHandler()
+
+        try:
+            async with get_ocr_scheduler().slot("gemini"):
+                with observe_latency(OCR_LATENCY, provider=provider_label):
+                    response = await model.ainvoke(
+                        [SystemMessage(content=self.system_prompt), HumanMessage(content=content)],
+                        config={"callbacks": [usage_callback, LLMMetricsCallbackHandler(default_node="ocr")]}
+                    )
+        except Exception as e:
+            logger.error(f"OCR 요청 실패 - 이미지 크기: {size_kb:.2f}KB, 에러: {type(e).__name__}: {str(e)}")
+            raise
+
+        logger.info(f"OCR 성공 - 이미지 크기: {size_kb:.2f}KB. Token Usage: {usage_callback.usage_metadata}")
+        return response.content
+
+    @staticmethod
+    def _image_part(image: bytes) -> dict:
+        """이미지 content part. base64 인코딩은 이 요청 경계에서 한 번만 한다."""
+        return {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64.b64encode(image).decode()}"}}
 
     @retry(
         stop=stop_after_attempt(3),  # 최대 3회 시도
@@ -36,40 +102,68 @@ class GeminiOCRService(BaseOCRService):
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True
     )
-    async def extract_text_from_image(self, img_base64: str) -> str:
-        img_bytes = base64.b64decode(img_base64)
-        image_size_kb = len(img_bytes) / 1024
+    async def extract_text_from_image(self, image: bytes) -> str:
+        image_size_kb = len(image) / 1024
+        logger.info(f"Gemini OCR 요청 시작 - 이미지 크기: {image_size_kb:.2f}KB")
+        content = [{"type": "text", "text": self.user_prompt}, self._image_part(image)]
+        return await self._invoke(content, "gemini", image_size_kb)
 
-        model = get_gemini_llm()
+    @retry(
+        stop=stop_after_attempt(2),  # 실패하면 이미지별 요청으로 대체하므로 재시도는 1회만
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((TimeoutError, asyncio.TimeoutError, Exception)),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+    async def extract_text_from_batch(self, images: list[bytes]) -> dict[int, str]:
+        """
+        여러 이미지를 한 요청으로 OCR.
 
-        system_message = SystemMessage(content=self.system_prompt)
-        human_message = HumanMessage(
-            content=[
-                {
-                    "type": "text",
-                    "text": self.user_prompt
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{img_base64}"}
-                }
-            ]
-        )
+        Returns:
+            이미지 번호(0-based) → 텍스트. 응답에서 구분선을 찾지 못한 이미지는 빠진다.
+        """
+        n = len(images)
+        size_kb = sum(len(img) for img in images) / 1024
+        logger.info(f"Gemini 배치 OCR 요청 시작 - 이미지 {n}개, 총 크기: {size_kb:.2f}KB")
 
-        logger.info(f"Gemini OCR 요청 시작 - 이미지 크기: {image_size_kb:.2f}KB")
+        content = [{"type": "text", "text": self.batch_prompt.format(n=n)}]
+        for i, img in enumerate(images, start=1):
+            content.append({"type": "text", "text": f"<<<IMAGE {i}>>>"})
+            content.append(self._image_part(img))
 
-        usage_callback = UsageMetadataCallbackHandler()
+        return split_batch_output(await self._invoke(content, "gemini_batch", size_kb), n)
 
-        try:
-            response = await model.ainvoke(
-                [system_message, human_message],
-                config={"callbacks": [usage_callback]}
-            )
-        except Exception as e:
-            logger.error(f"OCR 요청 실패 - 이미지 크기: {image_size_kb:.2f}KB, 에러: {type(e).__name__}: {str(e)}")
-            raise
+    async def _run_batch(self, images: list[bytes]) -> list[str | BaseException]:
+        """배치 요청 후 실패했거나 응답에서 빠진 이미지는 단건 요청으로 대체."""
+        parts: dict[int, str] = {}
+        if len(images) > 1:
+            try:
+                parts = await self.extract_text_from_batch(images)
+            except Exception as e:
+                logger.warning(f"Gemini 배치 OCR 실패, 이미지별 요청으로 대체: {type(e).__name__}: {e}")
 
-        token_usage = usage_callback.usage_metadata
-        logger.info(f"OCR 성공 - 이미지 크기: {image_size_kb:.2f}KB. Token Usage: {token_usage}")
+        missing = [i for i in range(len(images)) if i not in parts]
+        if missing and len(missing) < len(images):
+            logger.warning(f"Gemini 배치 응답에서 이미지 {len(missing)}개 누락, 이미지별 요청으로 대체")
+        singles = await asyncio.gather(
+            *(self.extract_text_from_image(images[i]) for i in missing),
+            return_exceptions=True,
+        )
+        parts.update(zip(missing, singles))
+        return [parts[i] for i in range(len(images))]
 
-        return response.content
+    async def extract_text_from_images(self, images: list[bytes]) -> list[str | BaseException]:
+        """ocr_batch_max_images / ocr_batch_max_bytes 기준으로 묶어 배치 요청."""
+        cfg = get_settings()
+        if cfg.ocr_batch_max_images <= 1:
+            return await super().extract_text_from_images(images)
+
+        batches = plan_batches(images, cfg.ocr_batch_max_images, cfg.ocr_batch_max_bytes)
+        batch_results = await asyncio.gather(
+            *(self._run_batch([images[i] for i in batch]) for batch in batches)
+        )
+        results: list[str | BaseException] = [None] * len(images)
+        for batch, texts in zip(batches, batch_results):
+            for i, text in zip(batch, texts):
+                results[i] = text
+        return results
@@ -0,0 +1,265 @@
+# services/ocr/scheduler.py
+"""
+OCR 요청 스케줄러.
+- 프로바이더별 토큰 버킷(초당 요청 수)과 적응형 동시성 한도(AIMD)
+- 프로세스 전역 동시 요청 상한
+- 우선순위: 단건 /parse(HIGH)가 기간 백필(LOW)보다 먼저 슬롯을 받는다
+
+프로바이더 구현은 재시도 1회마다 `async with get_ocr_scheduler().slot(provider):` 안에서 요청한다.
+"""
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import contextvars
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.settings import get_settings
+from services.metrics_service import OCR_CONCURRENCY_LIMIT, OCR_INFLIGHT, OCR_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "PRIORITY_HIGH",
+    "PRIORITY_LOW",
+    "ocr_priority",
+    "OCRScheduler",
+    "get_ocr_scheduler",
+]
+
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+_PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_LOW: "low"}
+
+# 현재 작업의 OCR 우선순위 (asyncio 태스크에 context로 전파됨)
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("ocr_priority", default=PRIORITY_LOW)
+
+
+@contextmanager
+def ocr_priority(priority: int):
+    """with 블록 안에서 시작한 OCR 요청의 우선순위 지정."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """429 / quota 초과 여부 (프로바이더 SDK마다 예외 타입이 달라 상태코드·메시지로 판별)."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None) or getattr(exc, "status", None)
+    if status == 429:
+        return True
+    msg = str(exc).lower()
+    return "429" in msg or "resource_exhausted" in msg or "rate limit" in msg or "quota" in msg
+
+
+class _PrioritySlots:
+    """우선순위 대기열이 있는 세마포어. 한도(limit)는 실행 중에 바뀔 수 있다."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.inflight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 슬롯을 받은 직후 취소됨 → 반납
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.inflight -= 1
+        self._wake()
+
+    def set_limit(self, limit: int) -> None:
+        self.limit = limit
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self.limit:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.cancelled():
+                continue
+            self.inflight += 1
+            fut.set_result(None)
+
+
+class _TokenBucket:
+    """초당 rate개, 최대 burst개까지 쌓이는 토큰 버킷. rate <= 0 이면 제한 없음."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """429 이후 잠시 새 요청을 멈춘다."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class ProviderLimits:
+    rate: float                 # 초당 요청 수
+    burst: int
+    max_concurrency: int
+    min_concurrency: int = 1
+
+
+class _ProviderState:
+    """
+    프로바이더별 제한 상태.
+    동시성 한도는 AIMD로 조정: 목표 지연 이내 성공이 한도만큼 쌓이면 +1,
+    429는 절반, 타임아웃·목표 지연 초과는 3/4 (감소는 cooldown 간격으로 한 번만).
+    """
+
+    def __init__(self, name: str, limits: ProviderLimits, target_latency: float, cooldown: float):
+        self.name = name
+        self.limits = limits
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.slots = _PrioritySlots(limits.max_concurrency)
+        self.bucket = _TokenBucket(limits.rate, limits.burst)
+        self._successes = 0
+        self._last_decrease = 0.0
+        OCR_CONCURRENCY_LIMIT.labels(provider=name).set(self.slots.limit)
+
+    def _set_limit(self, limit: int) -> None:
+        limit = max(self.limits.min_concurrency, min(self.limits.max_concurrency, limit))
+        if limit != self.slots.limit:
+            logger.info(f"OCR concurrency [{self.name}]: {self.slots.limit} → {limit}")
+            self.slots.set_limit(limit)
+            OCR_CONCURRENCY_LIMIT.labels(provider=self.name).set(limit)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self._set_limit(int(self.slots.limit * factor))
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.target_latency:
+            self._decrease(0.75)
+            return
+        self._successes += 1
+        if self._successes >= self.slots.limit:
+            self._successes = 0
+            self._set_limit(self.slots.limit + 1)
+
+    def on_error(self, exc: BaseException) -> None:
+        if _is_rate_limited(exc):
+            self.bucket.pause(self.cooldown)
+            self._decrease(0.5)
+        elif isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+            self._decrease(0.75)
+
+
+class OCRScheduler:
+    """프로세스 전역 OCR 스케줄러 (프로바이더 슬롯 → 전역 슬롯 → 토큰 버킷 순으로 획득)."""
+
+    def __init__(
+        self,
+        providers: Dict[str, ProviderLimits],
+        max_inflight: int,
+        target_latency: float,
+        cooldown: float,
+    ):
+        self._global = _PrioritySlots(max_inflight)
+        self._providers = {
+            name: _ProviderState(name, limits, target_latency, cooldown) for name, limits in providers.items()
+        }
+
+    def _provider(self, name: str) -> _ProviderState:
+        if name not in self._providers:
+            raise KeyError(f"Unknown OCR provider: {name}")
+        return self._providers[name]
+
+    @asynccontextmanager
+    async def slot(self, provider: str, priority: Optional[int] = None):
+        """OCR 요청 1회(재시도 1회)분의 실행 슬롯."""
+        state = self._provider(provider)
+        priority = _priority.get() if priority is None else priority
+
+        wait_start = time.perf_counter()
+        await state.slots.acquire(priority)
+        try:
+            await self._global.acquire(priority)
+        except BaseException:
+            state.slots.release()
+            raise
+
+        try:
+            await state.bucket.acquire()
+            OCR_QUEUE_WAIT.labels(provider=provider, priority=_PRIORITY_NAMES.get(priority, str(priority))).observe(
+                time.perf_counter() - wait_start
+            )
+
+            OCR_INFLIGHT.labels(provider=provider).inc()
+            start = time.perf_counter()
+            try:
+                yield
+            except Exception as e:
+                state.on_error(e)
+                raise
+            else:
+                state.on_success(time.perf_counter() - start)
+            finally:
+                OCR_INFLIGHT.labels(provider=provider).dec()
+        finally:
+            self._global.release()
+            state.slots.release()
+
+
+@lru_cache(maxsize=1)
+def get_ocr_scheduler() -> OCRScheduler:
+    cfg = get_settings()
+    return OCRScheduler(
+        providers={
+            "gemini": ProviderLimits(
+                rate=cfg.ocr_gemini_rps,
+                burst=cfg.ocr_gemini_burst,
+                max_concurrency=cfg.ocr_gemini_max_concurrency,
+            ),
+            "upstage": ProviderLimits(
+                rate=cfg.ocr_upstage_rps,
+                burst=cfg.ocr_upstage_burst,
+                max_concurrency=cfg.ocr_upstage_max_concurrency,
+            ),
+        },
+        max_inflight=cfg.ocr_max_inflight,
+        target_latency=cfg.ocr_target_latency,
+        cooldown=cfg.ocr_backoff_seconds,
+    )
@@ -1,9 +1,12 @@
 import time
-import base64
 import asyncio
 import logging
-import tempfile
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
 from tenacity import (
   retry,
   stop_after_attempt,
@@ -11,53 +14,83 @@ from tenacity import (
   retry_if_exception_type,
   before_sleep_log
 )
-from langchain_upstage import UpstageDocumentParseLoader
+from app.settings import get_settings
 from services.ocr.base import BaseOCRService
+from services.metrics_service import OCR_LATENCY, observe_latency
+from services.ocr.scheduler import get_ocr_scheduler
 
 logger = logging.getLogger(__name__)
 
+DOCUMENT_PARSE_URL = "https://api.upstage.ai/v1/document-digitization"
 
-class UpstageOCRService(BaseOCRService):
-    def _extract_text_from_image_sync(self, img_base64: str) -> tuple[str, float, float]:
-        """
-        Upstage DocumentParseLoader를 사용하여 이미지에서 텍스트 추출 (동기 함수).
+# Upstage 호출 전용 스레드 풀 / HTTP 세션 (기본 루프 executor를 점유하지 않도록 분리)
+_executor: Optional[ThreadPoolExecutor] = None
+_session: Optional[requests.Session] = None
+_init_lock = threading.Lock()
 
-        Args:
-            img_base64: Base64로 인코딩된 이미지 데이터
 
-        Returns:
-            tuple[str, float, float]: (OCR 결과 텍스트, 이미지 크기(KB), 소요 시간(ms))
-        """
-        # Base64 디코딩
-        img_bytes = base64.b64decode(img_base64)
-        image_size_kb = len(img_bytes) / 1024
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                workers = get_settings().ocr_upstage_max_concurrency
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upstage-ocr")
+    return _executor
 
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-            tmp_file.write(img_bytes)
-            tmp_file_path = tmp_file.name
 
-        try:
-            logger.info(f"Upstage OCR 요청 시작 - 이미지 크기: {image_size_kb:.2f}KB")
-            start_time = time.time()
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _init_lock:
+            if _session is None:
+                workers = get_settings().ocr_upstage_max_concurrency
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+                session.headers["Authorization"] = f"Bearer {get_settings().upstage_api_key}"
+                _session = session
+    return _session
 
-            # UpstageDocumentParseLoader 사용 (ocr="force"로 강제 OCR 수행)
-            loader = UpstageDocumentParseLoader(tmp_file_path, ocr="force")
-            pages = loader.load()
 
-            end_time = time.time()
-            duration_ms = (end_time - start_time) * 1000
-
-            # 모든 페이지의 텍스트를 합침
-            result_text = '\n'.join([page.page_content for page in pages])
+class UpstageOCRService(BaseOCRService):
+    def _extract_text_from_image_sync(self, image: bytes) -> tuple[str, float, float]:
+        """
+        Upstage Document Parse API로 이미지에서 텍스트 추출 (동기 함수).
+        이미지 bytes를 multipart 본문으로 바로 전송한다 (임시 파일 없음).
 
-            logger.info(f"OCR 성공 - 이미지 크기: {image_size_kb:.2f}KB, 소요 시간: {duration_ms:.2f}ms, 결과 길이: {len(result_text)}")
-            return result_text, image_size_kb, duration_ms
+        Args:
+            image: 이미지 bytes
 
-        finally:
-            # 임시 파일 삭제
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
+        Returns:
+            tuple[str, float, float]: (OCR 결과 텍스트, 이미지 크기(KB), 소요 시간(ms))
+        """
+        image_size_kb = len(image) / 1024
+
+        logger.info(f"Upstage OCR 요청 시작 - 이미지 크기: {image_size_kb:.2f}KB")
+        start_time = time.time()
+
+        response = _get_session().post(
+            DOCUMENT_PARSE_URL,
+            files={"document": ("image", image)},
+            data={
+                "model": "document-parse",
+                "ocr": "force",
+                # 이전 UpstageDocumentParseLoader 기본값과 같은 출력 형식
+                "output_formats": "['html']",
+                "coordinates": False,
+            },
+            timeout=get_settings().ocr_timeout,
+        )
+        response.raise_for_status()
+        elements = response.json().get("elements", [])
+
+        duration_ms = (time.time() - start_time) * 1000
+
+        # 모든 요소의 텍스트를 합침
+        result_text = "".join(element["content"]["html"] for element in elements)
+
+        logger.info(f"OCR 성공 - 이미지 크기: {image_size_kb:.2f}KB, 소요 시간: {duration_ms:.2f}ms, 결과 길이: {len(result_text)}")
+        return result_text, image_size_kb, duration_ms
 
     @retry(
         stop=stop_after_attempt(3),  # 최대 3회 시도
@@ -66,23 +99,25 @@ class UpstageOCRService(BaseOCRService):
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True
     )
-    async def extract_text_from_image(self, img_base64: str) -> str:
+    async def extract_text_from_image(self, image: bytes) -> str:
         """
-        Upstage DocumentParseLoader를 사용하여 이미지에서 텍스트 추출 (비동기 래퍼).
+        Upstage Document Parse API로 이미지에서 텍스트 추출 (비동기 래퍼).
 
         Args:
-            img_base64: Base64로 인코딩된 이미지 데이터
+            image: 이미지 bytes
 
         Returns:
             OCR 결과 텍스트
         """
         try:
-            loop = asyncio.get_event_loop()
-            result_text, image_size_kb, duration_ms = await loop.run_in_executor(
-                None,
-                self._extract_text_from_image_sync,
-                img_base64
-            )
+            loop = asyncio.get_running_loop()
+            async with get_ocr_scheduler().slot("upstage"):
+                with observe_latency(OCR_LATENCY, provider="upstage"):
+                    result_text, image_size_kb, duration_ms = await loop.run_in_executor(
+                        _get_executor(),
+                        self._extract_text_from_image_sync,
+                        image
+                    )
 
             return result_text
 
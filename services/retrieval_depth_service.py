@@ -0,0 +1,122 @@
+# services/retrieval_depth_service.py
+"""
+검색 깊이(프롬프트에 넣을 청크 수) 결정 서비스.
+고정 k 대신 후보의 코사인 거리 분포를 보고 청크 수를 정한다.
+- 상위 후보 뒤에 뚜렷한 거리 간격(gap)이 있으면 거기서 끊는다 (쉬운 질문: 적고 확실한 청크)
+- 최상위와 거리 차가 margin을 넘는 후보는 버린다
+- 상위 후보들의 거리가 거의 같으면(flat) 처음부터 넓게 가져온다 (어려운 질문: 재시도 대신)
+정책 값은 chat_logs.jsonl로 오프라인 보정한 JSON(bench/retrieval_depth.py)에서 읽는다.
+"""
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import List, Optional, Sequence, Tuple
+
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DepthPolicy", "choose_depth", "get_depth_policy", "load_depth_policy", "save_depth_policy"]
+
+
+@dataclass(frozen=True)
+class DepthPolicy:
+    """
+    검색 깊이 정책 (거리는 PGVector 코사인 거리: 작을수록 가깝다).
+    - fetch_k: 첫 검색에서 가져와 분포를 볼 후보 수
+    - min_k / base_k / flat_k / max_k: 최소 / 보통 / 분포가 평평할 때 / 재시도 포함 최대 청크 수
+    - gap: min_k~base_k 사이에서 이 이상 벌어지는 인접 거리 차가 있으면 거기서 끊는다
+    - margin: 최상위보다 이만큼 이상 먼 후보는 버린다
+    - flat_spread: 상위 flat_k 후보의 거리 범위가 이 이하이면 평평하다고 본다
+    - step: 같은 질의로 재시도할 때 늘리는 청크 수
+    """
+    fetch_k: int = 20
+    min_k: int = 3
+    base_k: int = 6
+    flat_k: int = 12
+    max_k: int = 20
+    gap: float = 0.05
+    margin: float = 0.15
+    flat_spread: float = 0.03
+    step: int = 4
+
+    @classmethod
+    def fixed(cls) -> "DepthPolicy":
+        """거리 분포를 보지 않는 이전 동작 (항상 base_k, 재시도 시 step씩)."""
+        return cls(fetch_k=6, min_k=6, base_k=6, flat_k=6, max_k=20, gap=float("inf"), margin=float("inf"),
+                   flat_spread=-1.0, step=4)
+
+
+def choose_depth(distances: Sequence[Optional[float]], policy: DepthPolicy) -> Tuple[int, str]:
+    """
+    거리 순으로 정렬된 후보 거리 목록 → (남길 청크 수, 사유).
+    사유: gap(간격에서 끊음) | margin(먼 후보 제외) | flat(넓게) | base(기본) | fixed(점수 없음)
+    """
+    n = min(len(distances), policy.max_k)
+    if n == 0:
+        return 0, "base"
+    if any(d is None for d in distances[:n]):
+        return min(policy.base_k, n), "fixed"
+
+    min_k = min(policy.min_k, n)
+    best = distances[0]
+    within = sum(1 for d in distances[:n] if d - best <= policy.margin)
+    within = max(within, min_k)
+
+    # 기본 깊이 안에서 가장 크게 벌어지는 지점
+    upper = min(within, policy.base_k)
+    cut, widest = 0, 0.0
+    for i in range(min_k, upper):
+        gap = distances[i] - distances[i - 1]
+        if gap > widest:
+            cut, widest = i, gap
+    if cut and widest >= policy.gap:
+        return cut, "gap"
+
+    flat_n = min(policy.flat_k, within)
+    if flat_n > policy.base_k and distances[flat_n - 1] - best <= policy.flat_spread:
+        return flat_n, "flat"
+
+    if within < policy.base_k:
+        return within, "margin"
+    return min(policy.base_k, n), "base"
+
+
+def load_depth_policy(path: str) -> DepthPolicy:
+    """보정 결과 JSON → DepthPolicy (없는 키는 기본값)."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    known = {f.name for f in fields(DepthPolicy)}
+    return DepthPolicy(**{k: v for k, v in data.items() if k in known})
+
+
+def save_depth_policy(policy: DepthPolicy, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(asdict(policy), f, ensure_ascii=False, indent=2)
+
+
+_policy: Optional[DepthPolicy] = None
+
+
+def get_depth_policy() -> DepthPolicy:
+    """
+    검색 깊이 정책 (lazy singleton).
+    retrieval_adaptive=false면 고정 k, 보정 파일이 없으면 기본값.
+    """
+    global _policy
+    if _policy is None:
+        cfg = get_settings()
+        if not cfg.retrieval_adaptive:
+            _policy = DepthPolicy.fixed()
+        elif cfg.retrieval_policy_path and os.path.exists(cfg.retrieval_policy_path):
+            try:
+                _policy = load_depth_policy(cfg.retrieval_policy_path)
+                logger.info(f"Retrieval depth policy loaded from {cfg.retrieval_policy_path}: {_policy}")
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Invalid retrieval depth policy {cfg.retrieval_policy_path}, using defaults: {e}")
+                _policy = DepthPolicy()
+        else:
+            _policy = DepthPolicy()
+    return _policy
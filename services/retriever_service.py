@@ -1,23 +1,28 @@
 # services/retriever_service.py
 """
 벡터 스토어 검색 서비스.
+- 질의 임베딩 (최근 질의 LRU + 진행 중인 요청 공유, rewrite 직후 미리 시작,
+  동시 요청 질의는 마이크로 배치로 묶어 API 한 번에) / 벡터 검색
+- 신청 기간 조건 검색: 기간 인덱스로 공지를 고른 뒤 해당 공지 안에서만 벡터 검색
 """
+import asyncio
 import logging
-from typing import List
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
 from langchain_core.documents import Document
 
-from app.deps import get_vectorstore
+from app.deps import get_vectorstore, get_embeddings
+from app.settings import get_settings
+from services.batching_service import MicroBatcher
+from services.database_service import fetch_announcements_by_period
+from services.metrics_service import DB_QUERY_LATENCY, EMBEDDING_CACHE, EMBEDDING_LATENCY, observe_latency
+from services.temporal_service import TemporalIntent
+from services.vector_index_service import get_vector_index
 
 logger = logging.getLogger(__name__)
 
 
-async def retriever_search(
-    query: str,
-    k: int,
-) -> List[Document]:
-    vectorstore = get_vectorstore()
-
-    docs_with_score = await vectorstore.asimilarity_search_with_score(query, k)
+def _attach_scores(docs_with_score: List[Tuple[Document, float]]) -> List[Document]:
     docs = []
     for doc, score in docs_with_score:
         if doc.metadata is None:
@@ -28,6 +33,207 @@ async def retriever_search(
     return docs
 
 
+# ========== 질의 임베딩 ==========
+
+_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+_embedding_inflight: Dict[str, asyncio.Task] = {}
+# prefetch로 시작했고 아직 아무도 기다리지 않는 작업 (취소해도 되는 작업)
+_prefetch_only: Set[asyncio.Task] = set()
+
+
+def _cache_get(query: str) -> Optional[List[float]]:
+    embedding = _embedding_cache.get(query)
+    if embedding is not None:
+        _embedding_cache.move_to_end(query)
+    return embedding
+
+
+def _cache_put(query: str, embedding: List[float]) -> None:
+    size = get_settings().query_embedding_cache_size
+    if size <= 0:
+        return
+    _embedding_cache[query] = embedding
+    _embedding_cache.move_to_end(query)
+    while len(_embedding_cache) > size:
+        _embedding_cache.popitem(last=False)
+
+
+_query_batcher: Optional[MicroBatcher] = None
+
+
+async def _embed_queries(queries: List[str]) -> List[List[float]]:
+    """여러 질의를 임베딩 API 요청 한 번으로 (OpenAI는 질의/문서 임베딩이 같은 호출)."""
+    with observe_latency(EMBEDDING_LATENCY, provider="openai", kind="query_batch"):
+        return await get_embeddings().aembed_documents(queries)
+
+
+def _get_query_batcher() -> Optional[MicroBatcher]:
+    """
+    OpenAI 질의 임베딩용 마이크로 배처 (lazy singleton).
+    로컬 모델은 LocalEmbeddings가 자체 배처를 쓰고, embed_batch_max<=1이면 배치하지 않는다.
+    """
+    global _query_batcher
+    cfg = get_settings()
+    if cfg.embed_provider != "openai" or cfg.embed_batch_max <= 1:
+        return None
+    if _query_batcher is None:
+        _query_batcher = MicroBatcher(
+            _embed_queries,
+            max_batch=cfg.embed_batch_max,
+            window_ms=cfg.embed_batch_window_ms,
+            name="openai_query_embedding",
+        )
+    return _query_batcher
+
+
+async def _embed(query: str) -> List[float]:
+    batcher = _get_query_batcher()
+    with observe_latency(EMBEDDING_LATENCY, provider=get_settings().embed_provider, kind="query"):
+        if batcher is not None:
+            # 동시에 들어온 다른 요청의 질의와 묶여 한 번의 embeddings.create로 나간다
+            embedding = await batcher.submit(query)
+        else:
+            embedding = await get_embeddings().aembed_query(query)
+    _cache_put(query, embedding)
+    return embedding
+
+
+def _on_embedding_done(query: str, task: asyncio.Task) -> None:
+    if _embedding_inflight.get(query) is task:
+        del _embedding_inflight[query]
+    _prefetch_only.discard(task)
+    # prefetch만 하고 아무도 기다리지 않은 작업의 예외가 경고로 남지 않게 소비
+    if not task.cancelled():
+        task.exception()
+
+
+def _inflight_task(query: str) -> Tuple[asyncio.Task, bool]:
+    """query의 진행 중인 임베딩 작업 (없으면 새로 시작). (작업, 새로 시작했는지)"""
+    loop = asyncio.get_running_loop()
+    task = _embedding_inflight.get(query)
+    if task is not None and task.get_loop() is loop:
+        return task, False
+    task = loop.create_task(_embed(query))
+    task.add_done_callback(lambda t: _on_embedding_done(query, t))
+    _embedding_inflight[query] = task
+    return task, True
+
+
+def prefetch_query_embedding(query: str) -> None:
+    """
+    질의 임베딩을 백그라운드로 미리 시작 (결과는 embed_query가 이어받는다).
+    rewrite 직후 호출해 다른 노드(가드레일)가 도는 동안 임베딩 왕복을 겹친다.
+    """
+    if query and _cache_get(query) is None:
+        task, started = _inflight_task(query)
+        if started:
+            _prefetch_only.add(task)
+
+
+def cancel_query_embedding_prefetch(query: str) -> None:
+    """
+    prefetch한 임베딩이 필요 없어졌을 때(가드레일 차단) 아직 진행 중이면 취소.
+    다른 요청이 같은 질의를 기다리고 있으면 그대로 둔다.
+    (마이크로 배치 창 안에 있으면 배치에서 빠져 API 요청 자체가 나가지 않는다)
+    """
+    task = _embedding_inflight.get(query)
+    if task is not None and task in _prefetch_only:
+        task.cancel()
+
+
+async def embed_query(query: str) -> List[float]:
+    """
+    검색 질의 임베딩. 재시도 시 재사용할 수 있도록 검색과 분리한다.
+    최근 질의는 LRU에서, 같은 질의를 이미 요청 중이면 그 결과를 공유한다.
+    """
+    cached = _cache_get(query)
+    if cached is not None:
+        EMBEDDING_CACHE.labels(result="hit").inc()
+        return cached
+
+    task, started = _inflight_task(query)
+    _prefetch_only.discard(task)
+    EMBEDDING_CACHE.labels(result="miss" if started else "inflight").inc()
+    # 기다리던 요청 하나가 취소돼도 공유 작업은 계속 진행
+    return await asyncio.shield(task)
+
+
+# ========== 벡터 검색 ==========
+
+
+async def retriever_search_by_vector(
+    embedding: List[float],
+    k: int,
+    filter: Optional[Dict[str, Any]] = None,
+) -> List[Document]:
+    """
+    미리 계산한 질의 임베딩으로 벡터 검색 (filter: 메타데이터 조건, 예: {"announcement_id": {"$in": [...]}}).
+    인메모리 인덱스가 켜져 있고 적재됐으면 프로세스 안에서, 아니면 PGVector로 검색한다.
+    """
+    index = get_vector_index()
+    if index is not None:
+        try:
+            with observe_latency(DB_QUERY_LATENCY, query="vector_index_search"):
+                return _attach_scores(index.search(embedding, k, filter=filter))
+        except ValueError as e:
+            logger.debug(f"Vector index cannot serve this query, using PGVector: {e}")
+
+    vectorstore = get_vectorstore()
+
+    with observe_latency(DB_QUERY_LATENCY, query="vector_search"):
+        docs_with_score = await vectorstore.asimilarity_search_with_score_by_vector(embedding, k, filter=filter)
+    return _attach_scores(docs_with_score)
+
+
+def _format_period(row) -> str:
+    def fmt(dt):
+        return dt.strftime("%Y-%m-%d %H:%M") if dt else "?"
+    return f"{fmt(row['application_period_start'])} ~ {fmt(row['application_period_end'])}"
+
+
+async def period_search(
+    intent: TemporalIntent,
+    embedding: List[float],
+    k: int,
+    max_announcements: int = 20,
+) -> Tuple[List[int], List[Document]]:
+    """
+    신청 기간 조건 검색.
+    1. 기간 인덱스(GiST)로 조건에 맞는 공지 id 조회 (마감 임박 순)
+    2. 그 공지들 안에서만 질의와 가까운 청크를 벡터 검색
+    각 청크 metadata에 application_period("시작 ~ 마감")를 붙인다.
+
+    Returns:
+        (조건에 맞는 공지 id 목록, 청크 목록)
+    """
+    try:
+        rows = await asyncio.to_thread(
+            fetch_announcements_by_period,
+            intent.start, intent.end, deadline_only=intent.mode == "deadline", limit=max_announcements,
+        )
+    except Exception as e:
+        # 기간 조회가 실패해도 일반 벡터 검색 결과로 답변할 수 있게 빈 결과로 처리
+        logger.warning(f"Period lookup failed, falling back to vector search: {e}")
+        return [], []
+    if not rows:
+        return [], []
+
+    periods = {row["announcement_id"]: _format_period(row) for row in rows}
+    ids = list(periods)
+    docs = await retriever_search_by_vector(embedding, k, filter={"announcement_id": {"$in": ids}})
+    for doc in docs:
+        doc.metadata["application_period"] = periods.get(doc.metadata.get("announcement_id"))
+    return ids, docs
+
+
+async def retriever_search(
+    query: str,
+    k: int,
+) -> List[Document]:
+    embedding = await embed_query(query)
+    return await retriever_search_by_vector(embedding, k)
+
+
 if __name__ == "__main__":
     import asyncio
 
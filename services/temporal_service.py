@@ -0,0 +1,84 @@
+# services/temporal_service.py
+"""
+질문의 시간 조건(신청/접수 기간) 파싱 서비스.
+"지금 신청 가능한 장학금", "이번 주 마감" 같은 질문을 기간 조건으로 바꿔
+announcement_parsed의 신청 기간 인덱스로 바로 조회할 수 있게 한다.
+LLM 없이 규칙 기반으로 동작한다 (오탐 시 벡터 검색 결과와 병합되므로 답변이 깨지지 않음).
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+__all__ = ["TemporalIntent", "parse_temporal_intent"]
+
+# 신청/접수 기간에 관한 질문인지 (시간 표현만 있고 이 단서가 없으면 일반 질문으로 본다)
+_PERIOD_CUE = re.compile(r"신청|접수|모집|지원|마감|기한|기간|응모|등록")
+_DEADLINE_CUE = re.compile(r"마감|기한|까지")
+_OPEN_NOW = re.compile(r"지금|현재|요즘|진행\s*중|접수\s*중|모집\s*중|신청\s*가능|지원\s*가능|열려\s*있")
+
+_DAYS_WITHIN = re.compile(r"(\d+)\s*일\s*(?:이내|안에|내|남은)")
+
+
+@dataclass(frozen=True)
+class TemporalIntent:
+    """
+    기간 조건.
+    - mode="open": 신청 기간이 [start, end]와 겹치는 공지 (그 사이 언제든 신청 가능)
+    - mode="deadline": 마감일이 [start, end] 안에 있는 공지
+    """
+    mode: Literal["open", "deadline"]
+    start: datetime
+    end: datetime
+    label: str
+
+
+def _day_start(dt: datetime) -> datetime:
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _day_end(dt: datetime) -> datetime:
+    return dt.replace(hour=23, minute=59, second=59, microsecond=0)
+
+
+def _window(question: str, now: datetime) -> Optional[tuple]:
+    """시간 표현 → (start, end, label). 없으면 None."""
+    today = _day_start(now)
+    if "오늘" in question:
+        return now, _day_end(now), "오늘"
+    if "내일" in question:
+        return today + timedelta(days=1), _day_end(today + timedelta(days=1)), "내일"
+    if "이번 주" in question or "이번주" in question or "금주" in question:
+        return now, _day_end(today + timedelta(days=6 - today.weekday())), "이번 주"
+    if "다음 주" in question or "다음주" in question:
+        monday = today + timedelta(days=7 - today.weekday())
+        return monday, _day_end(monday + timedelta(days=6)), "다음 주"
+    if "이번 달" in question or "이번달" in question:
+        next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return now, _day_end(next_month - timedelta(days=1)), "이번 달"
+    m = _DAYS_WITHIN.search(question)
+    if m:
+        days = int(m.group(1))
+        return now, _day_end(today + timedelta(days=days)), f"{days}일 이내"
+    if _OPEN_NOW.search(question):
+        return now, now, "현재"
+    return None
+
+
+def parse_temporal_intent(question: str, now: Optional[datetime] = None) -> Optional[TemporalIntent]:
+    """
+    신청/접수 기간에 관한 시간 조건이 있는 질문이면 TemporalIntent, 아니면 None.
+
+    예:
+        "지금 신청 가능한 장학금"  → open [now, now]
+        "이번 주 마감인 공지"     → deadline [now, 일요일 23:59:59]
+    """
+    if not question or not _PERIOD_CUE.search(question):
+        return None
+    now = now or datetime.now()
+    window = _window(question, now)
+    if window is None:
+        return None
+    start, end, label = window
+    mode = "deadline" if _DEADLINE_CUE.search(question) else "open"
+    return TemporalIntent(mode=mode, start=start, end=end, label=label)
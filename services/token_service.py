@@ -0,0 +1,59 @@
+# services/token_service.py
+"""
+로컬 토크나이저 서비스 (tiktoken).
+프롬프트 토큰 예산 계산 및 청크 크기 산정에 사용한다.
+"""
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+import tiktoken
+
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["count_tokens", "truncate_tokens"]
+
+# BPE 파일을 받을 수 없는 환경(오프라인)에서의 근사치: 한국어 기준 약 2자당 1토큰
+_APPROX_CHARS_PER_TOKEN = 2
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    name = get_settings().tokenizer_encoding
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding '{name}' unavailable, falling back to char approximation: {e}")
+        return None
+
+
+def _encode(text: str) -> Optional[List[int]]:
+    enc = _get_encoding()
+    if enc is None:
+        return None
+    return enc.encode(text, disallowed_special=())
+
+
+def count_tokens(text: str) -> int:
+    """text의 토큰 수."""
+    if not text:
+        return 0
+    tokens = _encode(text)
+    if tokens is None:
+        return -(-len(text) // _APPROX_CHARS_PER_TOKEN)
+    return len(tokens)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """text를 앞에서부터 max_tokens 토큰까지만 남긴다."""
+    if max_tokens <= 0:
+        return ""
+    tokens = _encode(text)
+    if tokens is None:
+        return text[:max_tokens * _APPROX_CHARS_PER_TOKEN]
+    if len(tokens) <= max_tokens:
+        return text
+    # 멀티바이트 문자가 토큰 경계에서 잘리면 replacement char가 생기므로 제거
+    return _get_encoding().decode(tokens[:max_tokens]).rstrip("�")
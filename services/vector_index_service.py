@@ -0,0 +1,556 @@
+# services/vector_index_service.py
+"""
+인메모리 벡터 인덱스 (PGVector 컬렉션 복제본).
+- 컬렉션 임베딩을 L2 정규화한 NumPy 행렬로 올려 프로세스 안에서 내적 top-k 검색
+- 저장 형식: float32 / float16 / int8 (행별 스케일) / binary (부호 비트, 해밍 거리)
+- 압축 형식은 1차 검색 후 상위 k*rescore 후보만 float32 원본(memmap)으로 재채점
+- 스냅샷(.npy)을 memmap으로 열어 워커 간 페이지 캐시를 공유하고, 재시작 시 DB 전체 적재를 생략
+- 인제스트가 PGVector에 추가한 청크를 증분 반영 (원본은 항상 PGVector)
+반환 점수는 PGVector와 같은 코사인 거리 (낮을수록 유사).
+
+스냅샷 디렉터리 구조 (vector_index_path):
+    current -> snap-<ns>-<pid>    원자적으로 교체하는 심볼릭 링크 (가리키는 스냅샷은 완성된 상태)
+    snap-<ns>-<pid>/              manifest.json / embeddings*.npy / scale.npy / docs.jsonl
+    .lock                         스냅샷을 쓰는 프로세스 간 잠금
+인덱스는 프로세스(워커)마다 따로 두는 복제본이다. 인제스트를 처리한 워커가 새 스냅샷을 쓰고,
+다른 워커는 vector_index_reload_seconds마다 current가 바뀌었는지 보고 다시 연다.
+"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.settings import get_settings
+from services.database_service import collection_embeddings_version, fetch_collection_embeddings
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "VectorIndex",
+    "get_vector_index",
+    "load_vector_index",
+    "add_to_vector_index",
+    "ids_version",
+]
+
+_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8, "binary": np.uint8}
+# float32가 아닌 행렬은 이 행 수씩 float32로 풀어서 내적 (캐시에 들어가는 크기, 전체 복사본을 만들지 않음)
+_SCORE_BLOCK_ROWS = 1024
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """정규화된 float32 행렬 → (저장 행렬, int8일 때 행별 스케일)."""
+    if dtype == "float32":
+        return np.ascontiguousarray(vectors, dtype=np.float32), None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scale = np.abs(vectors).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        q = np.round(vectors / scale[:, None]).astype(np.int8)
+        return q, scale.astype(np.float32)
+    if dtype == "binary":
+        return np.packbits(vectors > 0, axis=1), None
+    raise ValueError(f"Unsupported vector index dtype: {dtype}")
+
+
+def _parse_pgvector(value: str) -> np.ndarray:
+    return np.fromstring(value.strip("[]"), sep=",", dtype=np.float32)
+
+
+def ids_version(ids: Sequence[str]) -> str:
+    """청크 id 목록의 내용 버전 (database_service.collection_embeddings_version과 같은 형식)."""
+    joined = ",".join(sorted(ids, key=lambda i: i.encode("utf-8")))
+    return f"{len(ids)}:{hashlib.md5(joined.encode('utf-8')).hexdigest()}"
+
+
+@dataclass
+class _Segment:
+    matrix: np.ndarray            # (n, d) 정규화 후 dtype으로 저장된 벡터 (binary는 (n, d/8) 비트)
+    scale: Optional[np.ndarray]   # int8 행별 스케일 (n,)
+    full: np.ndarray              # (n, d) float32 원본 (재채점용, 스냅샷에서는 memmap)
+    offset: int                   # 전체 행 번호에서 이 세그먼트의 시작 위치
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """정규화된 질의와의 (근사) 코사인 유사도 (rows: 이 세그먼트 안의 행 번호만 계산)."""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        scale = self.scale if rows is None or self.scale is None else self.scale[rows]
+        if matrix.dtype == np.float32:
+            return matrix @ query
+        if matrix.dtype == np.uint8:
+            # 부호 비트 해밍 거리 → 코사인 근사 (같은 부호 비율)
+            bits = np.packbits(query > 0)
+            hamming = np.bitwise_count(matrix ^ bits).sum(axis=1, dtype=np.int32)
+            return 1.0 - 2.0 * hamming.astype(np.float32) / len(query)
+        out = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), _SCORE_BLOCK_ROWS):
+            block = matrix[start:start + _SCORE_BLOCK_ROWS].astype(np.float32)
+            out[start:start + len(block)] = block @ query
+        if scale is not None:
+            out *= scale
+        return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 위치 (내림차순)."""
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class VectorIndex:
+    """
+    청크 임베딩 행렬 + 문서/메타데이터.
+    스냅샷에서 연 기본 세그먼트(memmap) 뒤에 인제스트로 추가된 세그먼트를 덧붙인다.
+    """
+
+    def __init__(self, dim: int, dtype: str = "float32", rescore: int = 4):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported vector index dtype: {dtype}")
+        self.dim = dim
+        self.dtype = dtype
+        # 압축 형식일 때 1차 검색에서 k*rescore개를 골라 float32로 재채점 (0이면 1차 점수 그대로)
+        self.rescore = rescore
+        self._segments: List[_Segment] = []
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        # 가장 흔한 필터(announcement_id $in)는 배열로 마스킹
+        self._announcement_ids = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def copy(self) -> "VectorIndex":
+        """
+        얕은 복사본 (세그먼트 행렬은 공유).
+        세그먼트는 추가만 되고 바뀌지 않으므로, 복사본에 add해도 원본 검색에 영향이 없다.
+        """
+        other = VectorIndex(dim=self.dim, dtype=self.dtype, rescore=self.rescore)
+        other._segments = list(self._segments)
+        other._ids = list(self._ids)
+        other._contents = list(self._contents)
+        other._metadata = list(self._metadata)
+        other._announcement_ids = self._announcement_ids
+        return other
+
+    # ---------- 적재 ----------
+
+    def add(
+        self,
+        ids: Sequence[str],
+        contents: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+        embeddings: Any,
+    ) -> None:
+        """청크 추가 (embeddings: (n, dim) 배열 또는 리스트)."""
+        if not ids:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), self.dim))
+        matrix, scale = quantize(vectors, self.dtype)
+        self._append(matrix, scale, vectors, ids, contents, metadatas)
+
+    def _append(self, matrix, scale, full, ids, contents, metadatas) -> None:
+        self._segments.append(_Segment(matrix=matrix, scale=scale, full=full, offset=len(self._ids)))
+        self._ids.extend(str(i) for i in ids)
+        self._contents.extend(contents)
+        metadatas = [dict(md or {}) for md in metadatas]
+        self._metadata.extend(metadatas)
+        ann_ids = np.array(
+            [md.get("announcement_id") if isinstance(md.get("announcement_id"), int) else -1 for md in metadatas],
+            dtype=np.int64,
+        )
+        self._announcement_ids = np.concatenate([self._announcement_ids, ann_ids])
+
+    @classmethod
+    def from_rows(
+        cls, rows: Sequence[Dict[str, Any]], dim: int, dtype: str = "float32", rescore: int = 4,
+    ) -> "VectorIndex":
+        """fetch_collection_embeddings 결과로 인덱스 구성."""
+        index = cls(dim=dim, dtype=dtype, rescore=rescore)
+        if rows:
+            embeddings = np.stack([_parse_pgvector(row["embedding"]) for row in rows])
+            index.add(
+                [row["id"] for row in rows],
+                [row["document"] for row in rows],
+                [row["cmetadata"] for row in rows],
+                embeddings,
+            )
+        return index
+
+    # ---------- 스냅샷 ----------
+
+    def save(self, path: str, manifest: Dict[str, Any]) -> str:
+        """
+        세그먼트를 하나로 합쳐 path 아래 새 스냅샷 디렉터리로 저장하고 current 링크를 교체.
+        임시 디렉터리에 모든 파일을 쓴 뒤 rename하므로 중간에 죽어도 current는 완성된 스냅샷만 가리킨다.
+        호출자는 _snapshot_lock으로 다른 프로세스의 저장과 겹치지 않게 한다. 반환: 스냅샷 이름
+        """
+        os.makedirs(path, exist_ok=True)
+        name = f"snap-{time.time_ns()}-{os.getpid()}"
+        tmp = os.path.join(path, f".{name}.tmp")
+        os.makedirs(tmp)
+        try:
+            matrix = np.concatenate([s.matrix for s in self._segments]) if self._segments \
+                else np.empty((0, self.dim), dtype=_DTYPES[self.dtype])
+            np.save(os.path.join(tmp, "embeddings.npy"), matrix)
+            if self.dtype != "float32":
+                full = np.concatenate([s.full for s in self._segments]) if self._segments \
+                    else np.empty((0, self.dim), dtype=np.float32)
+                np.save(os.path.join(tmp, "embeddings_full.npy"), full)
+            if self.dtype == "int8":
+                scale = np.concatenate([s.scale for s in self._segments]) if self._segments \
+                    else np.empty(0, dtype=np.float32)
+                np.save(os.path.join(tmp, "scale.npy"), scale)
+
+            with open(os.path.join(tmp, "docs.jsonl"), "w", encoding="utf-8") as f:
+                for doc_id, content, md in zip(self._ids, self._contents, self._metadata):
+                    f.write(json.dumps({"id": doc_id, "content": content, "metadata": md}, ensure_ascii=False) + "\n")
+
+            manifest = {**manifest, "dtype": self.dtype, "dim": self.dim, "count": len(self),
+                        "version": ids_version(self._ids)}
+            with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.rename(tmp, os.path.join(path, name))
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        # 심볼릭 링크를 임시 이름으로 만든 뒤 rename (원자적 교체)
+        link = os.path.join(path, f".current-{name}")
+        os.symlink(name, link)
+        os.replace(link, os.path.join(path, "current"))
+
+        # 이전 스냅샷 정리 (이미 memmap으로 연 워커는 삭제 후에도 그대로 읽을 수 있다)
+        for entry in os.listdir(path):
+            if entry != name and (entry.startswith("snap-") or entry.endswith(".tmp")):
+                shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+        return name
+
+    @classmethod
+    def open(cls, path: str, rescore: int = 4) -> Tuple["VectorIndex", Dict[str, Any]]:
+        """
+        스냅샷 디렉터리(snap-*) 열기 (행렬은 memmap). (인덱스, manifest)
+        압축 형식은 1차 검색 행렬만 메모리에 올리고, float32 원본은 재채점할 행만 페이지 인된다.
+        """
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        index = cls(dim=manifest["dim"], dtype=manifest["dtype"], rescore=rescore)
+        matrix = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        if index.dtype == "float32":
+            full = matrix
+        else:
+            matrix = np.ascontiguousarray(matrix)
+            full = np.load(os.path.join(path, "embeddings_full.npy"), mmap_mode="r")
+        scale = np.load(os.path.join(path, "scale.npy")) if index.dtype == "int8" else None
+
+        ids, contents, metadatas = [], [], []
+        with open(os.path.join(path, "docs.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                ids.append(record["id"])
+                contents.append(record["content"])
+                metadatas.append(record["metadata"])
+        if len(ids) != len(matrix):
+            raise ValueError(f"Corrupt vector index snapshot: {len(ids)} docs, {len(matrix)} vectors")
+        if ids:
+            index._append(matrix, scale, full, ids, contents, metadatas)
+        return index, manifest
+
+    # ---------- 검색 ----------
+
+    def _filter_mask(self, spec: Dict[str, Any]) -> np.ndarray:
+        """
+        메타데이터 필터 → 행 마스크.
+        지원: {"key": 값}, {"key": {"$eq": 값}}, {"key": {"$in": [...]}} (여러 키는 AND)
+        그 밖의 연산자는 ValueError (호출자가 PGVector로 검색하도록).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for key, cond in spec.items():
+            if isinstance(cond, dict):
+                if set(cond) == {"$in"}:
+                    values = list(cond["$in"])
+                elif set(cond) == {"$eq"}:
+                    values = [cond["$eq"]]
+                else:
+                    raise ValueError(f"Unsupported filter for vector index: {key}={cond}")
+            else:
+                values = [cond]
+
+            if key == "announcement_id" and all(isinstance(v, int) for v in values):
+                mask &= np.isin(self._announcement_ids, np.array(values, dtype=np.int64))
+            else:
+                allowed = set(values)
+                mask &= np.fromiter((md.get(key) in allowed for md in self._metadata), dtype=bool, count=len(self))
+        return mask
+
+    def _split_rows(self, rows: np.ndarray):
+        """정렬된 전체 행 번호 → (세그먼트, 세그먼트 안의 행 번호) 목록."""
+        for seg in self._segments:
+            lo, hi = np.searchsorted(rows, [seg.offset, seg.offset + len(seg.matrix)])
+            if hi > lo:
+                yield seg, rows[lo:hi] - seg.offset
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[Document, float]]:
+        """질의 임베딩으로 top-k (문서, 코사인 거리)."""
+        if not len(self) or k <= 0:
+            return []
+        query = _normalize(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        if filter:
+            # 필터에 맞는 행만 모아서 계산 (기간 검색처럼 공지 몇 개로 좁히면 전체 스캔이 없다)
+            rows = np.flatnonzero(self._filter_mask(filter))
+            if not len(rows):
+                return []
+            scores = np.concatenate([
+                seg.scores(query, local) for seg, local in self._split_rows(rows)
+            ])
+        else:
+            rows = np.arange(len(self))
+            scores = np.concatenate([s.scores(query) for s in self._segments])
+
+        if self.dtype != "float32" and self.rescore > 0:
+            # 1차(압축) 점수 상위 후보만 float32 원본으로 다시 계산
+            rows = np.sort(rows[_top_k(scores, k * self.rescore)])
+            scores = np.concatenate([
+                np.asarray(seg.full[local], dtype=np.float32) @ query
+                for seg, local in self._split_rows(rows)
+            ])
+
+        results = []
+        for j in _top_k(scores, k):
+            i = rows[j]
+            doc = Document(
+                id=self._ids[i],
+                page_content=self._contents[i],
+                metadata=dict(self._metadata[i]),
+            )
+            results.append((doc, float(1.0 - scores[j])))
+        return results
+
+
+# ========== 프로세스 전역 인덱스 ==========
+
+_index: Optional[VectorIndex] = None
+_snapshot_name: Optional[str] = None  # _index가 기반으로 한 스냅샷 (None이면 저장되지 않은 인덱스)
+_load_task: Optional[asyncio.Task] = None
+_reload_task: Optional[asyncio.Task] = None
+_reload_checked_at = 0.0
+# 이 프로세스 안에서 인덱스 갱신(복사 → 추가 → 저장)을 한 번에 하나씩
+_update_lock: Optional[asyncio.Lock] = None
+_update_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _snapshot_manifest() -> Dict[str, Any]:
+    cfg = get_settings()
+    return {
+        "collection": cfg.collection_name,
+        "embed_model": cfg.embed_model,
+        "dim": cfg.embed_dim,
+        "dtype": cfg.vector_index_dtype,
+    }
+
+
+def _current_snapshot(path: str) -> Optional[str]:
+    """current 링크가 가리키는 스냅샷 이름 (없으면 None)."""
+    try:
+        return os.readlink(os.path.join(path, "current"))
+    except OSError:
+        return None
+
+
+class _snapshot_lock:
+    """스냅샷을 쓰는 프로세스(워커) 간 잠금 (path/.lock에 flock)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._f = open(os.path.join(self.path, ".lock"), "w")
+        fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+
+def _open_snapshot(path: str, name: str) -> Tuple[VectorIndex, Dict[str, Any]]:
+    return VectorIndex.open(os.path.join(path, name), rescore=get_settings().vector_index_rescore)
+
+
+def _build_index() -> Tuple[VectorIndex, Optional[str]]:
+    """
+    스냅샷이 최신(설정과 청크 id 버전이 DB와 같음)이면 memmap으로 열고,
+    아니면 PGVector에서 전체 적재 후 스냅샷 저장. 반환: (인덱스, 스냅샷 이름)
+    """
+    cfg = get_settings()
+    path = cfg.vector_index_path
+    expected = _snapshot_manifest()
+    db_version = collection_embeddings_version(cfg.collection_name)
+
+    name = _current_snapshot(path)
+    if name is not None:
+        try:
+            index, manifest = _open_snapshot(path, name)
+            if all(manifest.get(k) == v for k, v in expected.items()) and manifest.get("version") == db_version:
+                logger.info(f"Vector index snapshot loaded: {len(index)} chunks ({index.dtype}) from {name}")
+                return index, name
+            logger.info(f"Vector index snapshot stale (version {manifest.get('version')} vs {db_version}), rebuilding")
+        except Exception as e:
+            logger.warning(f"Vector index snapshot unreadable, rebuilding: {e}")
+
+    rows = fetch_collection_embeddings(cfg.collection_name)
+    index = VectorIndex.from_rows(
+        rows, dim=cfg.embed_dim, dtype=cfg.vector_index_dtype, rescore=cfg.vector_index_rescore,
+    )
+    logger.info(f"Vector index built from PGVector: {len(index)} chunks ({index.dtype})")
+    try:
+        with _snapshot_lock(path):
+            name = index.save(path, expected)
+    except OSError as e:
+        logger.warning(f"Vector index snapshot not saved: {e}")
+        return index, None
+    # 다시 열어 float32 원본을 memmap으로 (압축 형식이면 메모리에는 압축 행렬만 남음)
+    return _open_snapshot(path, name)[0], name
+
+
+def _on_loaded(task: asyncio.Task) -> None:
+    global _index, _snapshot_name, _load_task
+    if task.cancelled():
+        _load_task = None
+        return
+    if task.exception() is not None:
+        logger.error(f"Vector index load failed, using PGVector: {task.exception()}")
+        _load_task = None  # 다음 호출에서 다시 시도
+        return
+    _index, _snapshot_name = task.result()
+
+
+def _start_load() -> asyncio.Task:
+    global _load_task
+    if _load_task is None:
+        _load_task = asyncio.get_running_loop().create_task(asyncio.to_thread(_build_index))
+        _load_task.add_done_callback(_on_loaded)
+    return _load_task
+
+
+def _maybe_reload() -> None:
+    """다른 워커가 새 스냅샷을 썼으면(current 변경) 백그라운드에서 다시 연다."""
+    global _reload_task, _reload_checked_at
+    interval = get_settings().vector_index_reload_seconds
+    now = time.monotonic()
+    if interval <= 0 or now - _reload_checked_at < interval or _reload_task is not None:
+        return
+    _reload_checked_at = now
+    path = get_settings().vector_index_path
+    name = _current_snapshot(path)
+    # 스냅샷 이름은 생성 시각 순이라, 이 프로세스가 더 최신 스냅샷을 쓴 경우는 건너뛴다
+    if name is None or (_snapshot_name is not None and name <= _snapshot_name):
+        return
+
+    async def reload() -> None:
+        global _index, _snapshot_name, _reload_task
+        try:
+            index, _ = await asyncio.to_thread(_open_snapshot, path, name)
+            if _snapshot_name is None or name > _snapshot_name:
+                _index, _snapshot_name = index, name
+                logger.info(f"Vector index reloaded from {name}: {len(index)} chunks")
+        except Exception as e:
+            logger.warning(f"Vector index reload from {name} failed: {e}")
+        finally:
+            _reload_task = None
+
+    _reload_task = asyncio.get_running_loop().create_task(reload())
+
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """
+    검색에 쓸 수 있는 인덱스. 비활성화됐거나 아직 적재 중이면 None (호출자는 PGVector로 검색).
+    처음 호출될 때 백그라운드 적재를 시작한다.
+    """
+    if not get_settings().vector_index_enabled:
+        return None
+    if _index is None:
+        _start_load()
+    else:
+        _maybe_reload()
+    return _index
+
+
+async def load_vector_index() -> Optional[VectorIndex]:
+    """인덱스 적재를 기다린다 (시작 시 미리 올릴 때). 비활성화 시 None."""
+    if not get_settings().vector_index_enabled:
+        return None
+    if _index is None:
+        await asyncio.shield(_start_load())
+    return _index
+
+
+def _add_and_save(
+    base: VectorIndex,
+    base_name: Optional[str],
+    batch: Tuple[Sequence[str], Sequence[str], Sequence[Optional[Dict[str, Any]]], Sequence[Sequence[float]]],
+) -> Tuple[VectorIndex, Optional[str]]:
+    """
+    (스레드에서) 프로세스 간 잠금 안에서 최신 스냅샷에 청크를 더해 새 스냅샷으로 저장.
+    다른 워커가 그사이 새 스냅샷을 썼으면 그것을 기준으로 삼아 그 워커의 추가분을 잃지 않는다.
+    """
+    path = get_settings().vector_index_path
+    with _snapshot_lock(path):
+        current = _current_snapshot(path)
+        if current is not None and current != base_name:
+            base, _ = _open_snapshot(path, current)
+        index = base.copy()
+        index.add(*batch)
+        try:
+            name = index.save(path, _snapshot_manifest())
+        except OSError as e:
+            logger.warning(f"Vector index snapshot not saved: {e}")
+            return index, base_name
+    return index, name
+
+
+async def add_to_vector_index(
+    ids: Sequence[str],
+    contents: Sequence[str],
+    metadatas: Sequence[Optional[Dict[str, Any]]],
+    embeddings: Sequence[Sequence[float]],
+) -> None:
+    """
+    인제스트가 PGVector에 저장한 청크를 인덱스에 반영하고 스냅샷을 갱신 (적재 전이면 다음 적재 때 DB에서 읽힘).
+    검색 중인 인덱스는 바꾸지 않고 복사본에 추가해 저장한 뒤 교체한다.
+    """
+    global _index, _snapshot_name, _update_lock, _update_lock_loop
+    if _index is None or not ids:
+        return
+    loop = asyncio.get_running_loop()
+    if _update_lock_loop is not loop:
+        # 이벤트 루프가 바뀌면(테스트/벤치의 asyncio.run 반복) 잠금을 새로 만든다
+        _update_lock, _update_lock_loop = asyncio.Lock(), loop
+    async with _update_lock:
+        index, name = await asyncio.to_thread(
+            _add_and_save, _index, _snapshot_name, (ids, contents, metadatas, embeddings),
+        )
+        _index, _snapshot_name = index, name